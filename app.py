@@ -1,15 +1,21 @@
+import json
 import os
+import time
 import streamlit as st
 import pandas as pd
-from typing import List, Dict, Any
-import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from dotenv import load_dotenv
 load_dotenv()  # This loads the .env file
 
-from config import config, LLMProvider
-from llm_service import llm_service
+from config import config, LLMProvider, PROVIDER_MODELS
+from llm_service import SETTINGS_FLAGS, llm_service
+from client_pool import get_runner
+from jobs import JobManager, build_job_manager
+from metrics import start_metrics_server
+from golden import load_golden_standard
+from ingest import DocumentTooLarge, iter_uploads, read_upload
 
 # Set page config
 st.set_page_config(
@@ -40,20 +46,295 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 def read_file(file) -> str:
-    """Read file content with proper encoding handling."""
+    """Read an upload incrementally with encoding detection and the configured size limit."""
     try:
-        return file.getvalue().decode("utf-8")
-    except UnicodeDecodeError:
-        try:
-            return file.getvalue().decode("latin-1")
-        except Exception as e:
-            st.error(f"Error reading file {file.name}: {str(e)}")
-            return ""
+        document = read_upload(file, config.max_document_bytes, config.oversize_policy)
+    except (DocumentTooLarge, OSError) as e:
+        st.error(f"Error reading file {file.name}: {str(e)}")
+        return ""
+    if document.truncated:
+        st.warning(f"{file.name} was truncated to the first {config.max_document_bytes:,} bytes")
+    return document.text
 
-def update_llm_config(provider: str, model: str, temperature: float, max_tokens: int):
+def report_ingestion(skipped: List[Tuple[str, str]], truncated: List[str]):
+    """Tell the user which uploads were skipped or cut short while reading them."""
+    for name, reason in skipped:
+        st.warning(f"Skipping {name}: {reason}")
+    for name in truncated:
+        st.warning(f"{name} was truncated to the first {config.max_document_bytes:,} bytes")
+
+def render_results(container, rows: List[Dict[str, Any]]):
+    """Render the results table into a placeholder, replacing what was there."""
+    container.dataframe(
+        pd.DataFrame(rows),
+        column_config={
+            "Document": "Document",
+            "Verdict": st.column_config.TextColumn("Verdict"),
+            "Confidence": st.column_config.ProgressColumn(
+                "Confidence",
+                min_value=0,
+                max_value=1,
+                format="%.2f"
+            ),
+            "Explanation": "Explanation",
+            "Method": st.column_config.TextColumn(
+                "Method",
+                help="Whether the verdict came from the LLM, a diff-only or retrieved-passages LLM call, the "
+                     "result cache or store, or the local similarity pre-filter"
+            ),
+            "Queue Wait (ms)": st.column_config.NumberColumn(
+                "Queue Wait (ms)",
+                help="Time spent waiting for rate limits and retries before the LLM call",
+                format="%.0f"
+            ),
+            "LLM Latency (ms)": st.column_config.NumberColumn("LLM Latency (ms)", format="%.0f"),
+            "Parse (ms)": st.column_config.NumberColumn("Parse (ms)", format="%.2f"),
+            "Input Tokens": st.column_config.NumberColumn("Input Tokens", format="%d"),
+            "Output Tokens": st.column_config.NumberColumn("Output Tokens", format="%d"),
+            "Cost ($)": st.column_config.NumberColumn(
+                "Cost ($)",
+                help="Estimated from the model's per-token price; cached results cost nothing",
+                format="%.5f"
+            ),
+            "Cascade": st.column_config.TextColumn(
+                "Cascade",
+                help="The first-pass verdict, and the model it was escalated to if it was re-judged"
+            ),
+            "Backend": st.column_config.TextColumn(
+                "Backend",
+                help="The routed backend that produced the verdict"
+            ),
+            "Votes": st.column_config.TextColumn(
+                "Votes",
+                help="Self-consistency samples drawn for the verdict and how many of them agreed"
+            ),
+            "Sent As": st.column_config.TextColumn(
+                "Sent As",
+                help="How a document too large for the model's context window was sent: compressed, section by "
+                     "section, or rejected without a call"
+            ),
+            "Changes": st.column_config.TextColumn(
+                "Changes",
+                help="How a revision differs from the golden standard, when it was judged on the differences alone"
+            )
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+METHOD_LABELS = {"prefilter": "Pre-filter", "store": "Store", "diff": "Diff", "retrieval": "Retrieval"}
+
+def result_row(name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a results table row, including where the evaluation's time and money went."""
+    # Cached results carry the figures of the run that produced them
+    fresh = not result.get("cached")
+    timings = result.get("timings", {}) if fresh else {}
+    usage = result.get("usage", {}) if fresh else {}
+    return {
+        "Document": name,
+        "Verdict": result["verdict"],
+        "Confidence": result["confidence"],
+        "Explanation": result["explanation"],
+        "Method": METHOD_LABELS.get(result.get("method") or "", "Cache" if not fresh else "LLM"),
+        "Queue Wait (ms)": timings.get("queue_wait_ms"),
+        "LLM Latency (ms)": timings.get("llm_latency_ms"),
+        "Parse (ms)": timings.get("parse_ms"),
+        "Input Tokens": usage.get("input_tokens", 0),
+        "Output Tokens": usage.get("output_tokens", 0),
+        "Cost ($)": result.get("cost_usd", 0.0) if fresh else 0.0,
+        "Cascade": cascade_summary(result),
+        "Backend": result.get("backend", ""),
+        "Votes": vote_summary(result),
+        "Sent As": result.get("budget", {}).get("strategy", ""),
+        "Changes": diff_summary(result)
+    }
+
+def diff_summary(result: Dict[str, Any]) -> str:
+    """Describe a diff-based result, e.g. "2 missing, 1 changed, 1 added"."""
+    counts = result.get("diff")
+    if not counts:
+        return ""
+    labels = (
+        ("missing", "missing"), ("changed", "changed"), ("added", "added"),
+        ("missing_sections", "sections missing"), ("extra_sections", "extra sections")
+    )
+    parts = [f"{counts[key]} {label}" for key, label in labels if counts.get(key)]
+    return ", ".join(parts) or "no changes"
+
+def vote_summary(result: Dict[str, Any]) -> str:
+    """Describe a voted result, e.g. "2 Pass / 1 Fail (67% agree)"."""
+    if not result.get("samples"):
+        return ""
+    if result["samples"] == 1:
+        return "1 sample"
+    votes = " / ".join(f"{count} {verdict}" for verdict, count in sorted(result["votes"].items(), key=lambda v: -v[1]))
+    return f"{votes} ({result['agreement']:.0%} agree)"
+
+def cascade_summary(result: Dict[str, Any]) -> str:
+    """Describe a cascaded result, e.g. "gpt-3.5-turbo: Fail (0.55) → gpt-4"."""
+    stages = result.get("cascade")
+    if not stages:
+        return ""
+    first = stages[0]
+    summary = f"{first['model']}: {first['verdict']} ({first['confidence']:.2f})"
+    if len(stages) > 1:
+        summary += f" → {stages[-1]['model']}"
+    return summary
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def project_uploads(upload_ids: Tuple[Tuple[str, int], ...], golden_hashes: Tuple[str, ...], settings: str,
+                    _goldens: List[Tuple[str, Any]], _uploads: List[Any]) -> Dict[str, Any]:
+    """
+    Projected tokens and cost of the uploads against every golden standard.
+    
+    Cached on the upload ids and sizes, the standards' hashes and the
+    settings that change a projection, so reruns (any sidebar click) don't
+    decode and tokenize the whole upload set again.
+    """
+    totals: Dict[str, Any] = {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "strategies": {}}
+    for _, golden in _goldens:
+        # Decoded one upload at a time for each standard, so memory stays flat however many there are
+        documents = iter_uploads(_uploads, config.max_document_bytes, config.oversize_policy, [], [])
+        projection = llm_service.project_batch(golden, documents)
+        for key in ("input_tokens", "output_tokens", "cost_usd"):
+            totals[key] += projection[key]
+        for strategy, count in projection["strategies"].items():
+            totals["strategies"][strategy] = totals["strategies"].get(strategy, 0) + count
+    return totals
+
+def render_projection(goldens: List[Tuple[str, Any]], uploads: List[Any]):
+    """Show the projected tokens and cost of evaluating the uploads, and which documents won't fit the model."""
+    settings = json.dumps([
+        llm_service.current_config["model"], llm_service.current_config["cascade_model"],
+        llm_service.current_config["max_tokens"], [backend["model"] for backend in config.llm_backends],
+        config.tokenizer, config.model_context_windows, config.model_pricing,
+        config.max_document_bytes, config.oversize_policy,
+        config.documents_per_call, config.multi_doc_max_chars, config.diff_mode, config.consistency_samples
+    ], sort_keys=True)
+    totals = project_uploads(
+        tuple((getattr(upload, "file_id", upload.name), upload.size) for upload in uploads),
+        tuple(golden.content_hash for _, golden in goldens),
+        settings,
+        goldens,
+        uploads
+    )
+    
+    labels = {"as-is": "as-is", "compress": "compressed", "chunk": "section by section", "reject": "too large"}
+    strategies = ", ".join(
+        f"{count} {labels[strategy]}" for strategy, count in totals["strategies"].items() if strategy != "as-is"
+    )
+    st.caption(
+        f"Projected: ~{totals['input_tokens']:,} input and ~{totals['output_tokens']:,} output tokens, "
+        f"~${totals['cost_usd']:,.4f} with {llm_service.current_config['model']}"
+        + (f" ({strategies})" if strategies else "")
+    )
+    rejected = totals["strategies"].get("reject", 0)
+    if rejected:
+        st.warning(f"{rejected} evaluation(s) won't fit the model's context window and will fail without a call")
+
+def render_matrix(container, cells: List[Dict[str, Any]]):
+    """Render matrix results as one row per document and one column per golden standard."""
+    grid = pd.DataFrame(cells).pivot_table(index="Document", columns="Golden Standard", values="Result", aggfunc="last")
+    container.dataframe(grid.fillna("…"), use_container_width=True)
+
+def matrix_cell(standard: str, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """A matrix result, with the verdict and confidence combined for the pivoted grid."""
+    if result["success"]:
+        summary = f"{result['verdict']} ({result['confidence']:.2f})"
+    else:
+        summary = "Error"
+    return {
+        "Golden Standard": standard,
+        "Document": name,
+        "Result": summary,
+        "Verdict": result["verdict"],
+        "Confidence": result["confidence"],
+        "Explanation": result["explanation"] if result["success"] else result["error"],
+        "Method": METHOD_LABELS.get(result.get("method") or "", "Cache" if result.get("cached") else "LLM"),
+        "Cost ($)": 0.0 if result.get("cached") else result.get("cost_usd", 0.0)
+    }
+
+def run_matrix(goldens: List[Tuple[str, Any]], documents: List[Tuple[str, str]], max_concurrency: int,
+               documents_per_call: int, reuse_stored: bool):
+    """Evaluate every document against every golden standard, filling in the grid as pairs finish."""
+    total = len(goldens) * len(documents)
+    progress_bar = st.progress(0)
+    st.subheader("📊 Results")
+    grid = st.empty()
+    cells = []
+    for standard, name, result in get_runner().iterate(llm_service.evaluate_matrix(
+        goldens,
+        documents,
+        max_concurrency=max_concurrency,
+        documents_per_call=documents_per_call,
+        reuse_stored=reuse_stored
+    )):
+        cells.append(matrix_cell(standard, name, result))
+        progress_bar.progress(len(cells) / total, text=f"Evaluated {len(cells)} of {total}: {name} vs {standard}")
+        render_matrix(grid, cells)
+    
+    if cells:
+        st.success("✅ Evaluation complete!")
+        st.caption(f"Estimated cost: ${sum(cell['Cost ($)'] for cell in cells):,.4f}")
+        st.download_button(
+            "💾 Download Results",
+            data=pd.DataFrame(cells).drop(columns="Result").to_csv(index=False).encode('utf-8'),
+            file_name="document_evaluation_matrix.csv",
+            mime="text/csv"
+        )
+
+@st.cache_resource
+def start_metrics_endpoint(port: int):
+    """Expose Prometheus metrics once per process (Streamlit reruns the script constantly)."""
+    return start_metrics_server(port)
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """One job manager per process, shared by every browser session."""
+    return build_job_manager(llm_service)
+
+def render_job(job_manager: JobManager, job_id: str):
+    """Show a background job's progress and results, polling until it finishes."""
+    job = job_manager.store.get_job(job_id)
+    if job is None:
+        st.warning(f"Job {job_id} was not found")
+        return
+    
+    st.subheader(f"📊 Job {job_id}")
+    total = job["total"] or 1
+    st.progress(
+        job["completed"] / total,
+        text=f"{job['status'].capitalize()}: {job['completed']} of {job['total']} evaluated"
+    )
+    if job["error"]:
+        st.error(f"Job failed: {job['error']}")
+    
+    rows = []
+    for name, result in job_manager.store.results(job_id):
+        if result["success"]:
+            rows.append(result_row(name, result))
+        else:
+            st.error(f"Error evaluating {name}: {result['error']}")
+    
+    if rows:
+        render_results(st.empty(), rows)
+        st.download_button(
+            "💾 Download Results",
+            data=pd.DataFrame(rows).to_csv(index=False).encode('utf-8'),
+            file_name=f"document_evaluation_{job_id}.csv",
+            mime="text/csv"
+        )
+    
+    if job["status"] in ("queued", "running"):
+        # Poll the job store; the work itself runs on the job manager's workers
+        time.sleep(config.job_poll_interval)
+        st.rerun()
+
+def update_llm_config(provider: str, model: str, temperature: float, max_tokens: int, cascade_model: Optional[str] = None):
     """Update the LLM service with the latest configuration."""
     api_key = os.getenv("OPENAI_API_KEY") if provider == LLMProvider.OPENAI else os.getenv("GROQ_API_KEY")
-    if not api_key:
+    # Routed calls use each backend's own key, checked when LLM_BACKENDS is loaded
+    if not api_key and llm_service.router is None:
         st.error(f"API key not found. Please set the {'OPENAI_API_KEY' if provider == LLMProvider.OPENAI else 'GROQ_API_KEY'} in your .env file.")
         return False
     
@@ -62,11 +343,15 @@ def update_llm_config(provider: str, model: str, temperature: float, max_tokens:
         model=model,
         temperature=temperature,
         max_tokens=max_tokens,
-        api_key=api_key
+        api_key=api_key,
+        cascade_model=cascade_model
     )
     return True
 
 def main():
+    if config.metrics_port:
+        start_metrics_endpoint(config.metrics_port)
+    
     st.title("📝 DocuJudge - AI Document Evaluation")
     st.markdown("Evaluate documents against a golden standard using AI")
     
@@ -82,17 +367,39 @@ def main():
         )
         
         # Model selection based on provider
-        if provider == LLMProvider.OPENAI:
-            model = st.selectbox(
-                "Model",
-                ["gpt-4", "gpt-3.5-turbo"],
-                index=0
+        model = st.selectbox(
+            "Model",
+            PROVIDER_MODELS[provider],
+            index=0
+        )
+        
+        if llm_service.router is not None:
+            st.caption(
+                f"Evaluations are spread over {len(llm_service.router.backends)} configured backends "
+                f"({config.routing_strategy.replace('_', ' ')}) instead of this model."
+            )
+        
+        cascade_enabled = st.checkbox(
+            "Model Cascade",
+            value=bool(config.cascade_model),
+            help="Judge every document with a cheaper model first and re-judge only unclear or low-confidence verdicts with the model above."
+        )
+        cascade_model = None
+        cascade_threshold = config.cascade_threshold
+        if cascade_enabled:
+            first_pass_models = [m for m in models if m != model]
+            cascade_model = st.selectbox(
+                "First-pass Model",
+                first_pass_models,
+                index=first_pass_models.index(config.cascade_model) if config.cascade_model in first_pass_models else 0
             )
-        else:  # GROQ
-            model = st.selectbox(
-                "Model",
-                ["mixtral-8x7b-32768", "llama3-8b-8192"],
-                index=0
+            cascade_threshold = st.slider(
+                "Escalation Threshold",
+                min_value=0.0,
+                max_value=1.0,
+                value=float(config.cascade_threshold),
+                step=0.05,
+                help="First-pass verdicts with a lower confidence are re-judged by the stronger model."
             )
         
         # Advanced settings
@@ -115,10 +422,78 @@ def main():
                 help="Maximum number of tokens to generate in the response."
             )
             
+            max_concurrency = st.number_input(
+                "Max Concurrent Evaluations",
+                min_value=1,
+                max_value=50,
+                value=config.max_concurrency,
+                step=1,
+                help="Maximum number of documents evaluated at the same time."
+            )
+            
+            documents_per_call = st.number_input(
+                "Documents per LLM Call",
+                min_value=1,
+                max_value=20,
+                value=config.documents_per_call,
+                step=1,
+                help="Judge several short documents in one call so the golden standard is only sent once per group."
+            )
+            
+            consistency_samples = st.number_input(
+                "Self-consistency Samples",
+                min_value=1,
+                max_value=9,
+                value=config.consistency_samples,
+                step=1,
+                help="Sample up to this many verdicts per document in parallel and take the majority. A confident "
+                     "first sample is kept on its own, so only borderline documents cost extra calls. Needs a "
+                     "temperature above 0."
+            )
+            
+            stream_results = st.checkbox(
+                "Stream Verdicts",
+                value=config.stream_results,
+                help="Show each verdict as soon as the model produces it, before the explanation is complete."
+            )
+            
+            prefilter_enabled = st.checkbox(
+                "Similarity Pre-filter",
+                value=config.prefilter_enabled,
+                help="Decide near-identical or clearly off-topic documents locally, without an LLM call."
+            )
+            
+            diff_mode = st.checkbox(
+                "Diff-aware Evaluation",
+                value=config.diff_mode,
+                help="Judge revisions of the golden standard from their missing, changed and added bullets per "
+                     "section instead of sending both full texts."
+            )
+            
+            retrieval_enabled = st.checkbox(
+                "Passage Retrieval",
+                value=config.retrieval_enabled,
+                help=f"Judge documents longer than {config.retrieval_min_chars:,} characters from the "
+                     f"{config.retrieval_top_k} passages most similar to each requirement instead of the full text."
+            )
+            
+            reuse_stored = llm_service.store is not None and st.checkbox(
+                "Reuse Unchanged Results",
+                value=True,
+                help="Serve documents that haven't changed since they were last judged, with the same golden "
+                     "standard and model settings, from the result store instead of evaluating them again."
+            )
+            
+            background_jobs = st.checkbox(
+                "Run as Background Job",
+                value=config.background_jobs,
+                help="Queue the evaluation so it keeps running if you reload or close the page."
+            )
+            
             # Update LLM config when settings change
             if st.button("Update Settings"):
                 # Update LLM service with initial config
-                if not update_llm_config(provider, model, temperature, max_tokens):
+                if not update_llm_config(provider, model, temperature, max_tokens, cascade_model):
                     st.error("Failed to initialize LLM service. Please check your API key configuration.")
                     st.stop()  # Stop execution if API key is not configured
                 st.success("LLM settings updated successfully!")
@@ -128,9 +503,18 @@ def main():
     config.llm_model = model
     config.temperature = temperature
     config.max_tokens = max_tokens
+    config.max_concurrency = max_concurrency
+    config.documents_per_call = documents_per_call
+    config.consistency_samples = consistency_samples
+    config.prefilter_enabled = prefilter_enabled
+    config.diff_mode = diff_mode
+    config.retrieval_enabled = retrieval_enabled
+    config.stream_results = stream_results
+    config.background_jobs = background_jobs
+    config.cascade_threshold = cascade_threshold
     
     # Update LLM service with initial config
-    if not update_llm_config(provider, model, temperature, max_tokens):
+    if not update_llm_config(provider, model, temperature, max_tokens, cascade_model):
         st.error("Failed to initialize LLM service. Please check your API key configuration.")
         st.stop()  # Stop execution if API key is not configured
     
@@ -142,11 +526,26 @@ def main():
     
     with col1:
         st.subheader("Golden Standard")
-        golden_standard_file = st.file_uploader(
+        golden_standard_files = st.file_uploader(
             "Upload Golden Standard (Markdown)",
             type=["md", "markdown", "txt"],
-            key="golden_standard"
+            accept_multiple_files=True,
+            key="golden_standard",
+            help="Upload several standards to evaluate every document against each of them."
         )
+        
+        # Parsed once per distinct content and shared by every rerun and session
+        goldens: List[Tuple[str, Any]] = []
+        for golden_standard_file in golden_standard_files or []:
+            golden_text = read_file(golden_standard_file)
+            if golden_text.strip():
+                parsed = load_golden_standard(golden_text)
+                goldens.append((golden_standard_file.name, parsed))
+                st.caption(
+                    f"{golden_standard_file.name}: {len(parsed.sections)} sections, "
+                    f"{len(parsed.requirements)} requirements, ~{parsed.token_count:,} tokens"
+                )
+        golden = goldens[0][1] if len(goldens) == 1 else None
     
     with col2:
         st.subheader("Documents to Evaluate")
@@ -157,9 +556,12 @@ def main():
             key="eval_docs"
         )
     
+    if goldens and eval_docs:
+        render_projection(goldens, eval_docs)
+    
     # Evaluation button
     if st.button("🚀 Evaluate Documents", type="primary"):
-        if not golden_standard_file:
+        if not golden_standard_files:
             st.error("Please upload a golden standard document")
             return
             
@@ -169,70 +571,123 @@ def main():
         
         # Process evaluation
         with st.spinner("Evaluating documents..."):
-            golden_standard = read_file(golden_standard_file)
-            if not golden_standard:
+            if not goldens:
                 st.error("Failed to read golden standard file")
                 return
             
+            skipped: List[Tuple[str, str]] = []
+            truncated: List[str] = []
+            
+            if len(goldens) > 1:
+                # Every standard/document pair shares one concurrency limit
+                if background_jobs:
+                    st.info("Several golden standards are evaluated in this session rather than as a background job")
+                documents = list(iter_uploads(eval_docs, config.max_document_bytes, config.oversize_policy, skipped, truncated))
+                report_ingestion(skipped, truncated)
+                run_matrix(goldens, documents, max_concurrency, documents_per_call, reuse_stored)
+                return
+            
+            # Uploads are decoded only when the batch pulls them, so just the
+            # documents in flight are held as text at any time
+            documents = iter_uploads(eval_docs, config.max_document_bytes, config.oversize_policy, skipped, truncated)
+            
+            if background_jobs:
+                # Jobs persist their documents, so they are read up front
+                documents = list(documents)
+                report_ingestion(skipped, truncated)
+                # Identical queued or running jobs are reused rather than run twice
+                st.query_params["job"] = get_job_manager().submit(golden.text, documents, {
+                    "provider": LLMProvider(provider).value,
+                    "model": model,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "cascade_model": cascade_model,
+                    "max_concurrency": max_concurrency,
+                    "documents_per_call": documents_per_call,
+                    **{flag: getattr(config, flag) for flag in SETTINGS_FLAGS}
+                })
+                st.rerun()
+            
             results = []
+            rows: Dict[str, Dict[str, Any]] = {}
+            token_usage = {"input_tokens": 0, "cached_input_tokens": 0, "saved_input_tokens": 0}
             progress_bar = st.progress(0)
             total_docs = len(eval_docs)
             
-            for i, doc in enumerate(eval_docs):
-                try:
-                    doc_content = read_file(doc)
-                    if not doc_content:
-                        st.warning(f"Skipping empty or unreadable file: {doc.name}")
-                        continue
-                        
-                    # Show progress
-                    progress = (i + 1) / total_docs
-                    progress_bar.progress(progress, text=f"Evaluating {i+1} of {total_docs}: {doc.name}")
-                    
-                    # Evaluate document
-                    result = asyncio.run(
-                        llm_service.evaluate_document(golden_standard, doc_content)
-                    )
-                    
-                    if result["success"]:
-                        results.append({
-                            "Document": doc.name,
-                            "Verdict": result["verdict"],
-                            "Confidence": result["confidence"],
-                            "Explanation": result["explanation"]
-                        })
-                    else:
-                        st.error(f"Error evaluating {doc.name}: {result['error']}")
-                        
-                except Exception as e:
-                    st.error(f"Error processing {doc.name}: {str(e)}")
+            st.subheader("📊 Results")
+            results_table = st.empty()
+            
+            completed = 0
+            # Run on the shared background loop so pooled connections survive reruns
+            for name, result in get_runner().iterate(llm_service.evaluate_batch(
+                golden,
+                documents,
+                max_concurrency=max_concurrency,
+                documents_per_call=documents_per_call,
+                include_partials=stream_results,
+                reuse_stored=reuse_stored
+            )):
+                if result.get("partial"):
+                    # Show a provisional row as soon as the verdict has been streamed
+                    rows[name] = {
+                        "Document": name,
+                        "Verdict": result["verdict"],
+                        "Confidence": result["confidence"],
+                        "Explanation": result["explanation"] or "…",
+                        "Method": "LLM (streaming)"
+                    }
+                    render_results(results_table, list(rows.values()))
+                    continue
+                
+                # Progress reflects finished evaluations, not submitted ones
+                completed += 1
+                evaluable = max(total_docs - len(skipped), completed)
+                progress_bar.progress(
+                    completed / evaluable,
+                    text=f"Evaluated {completed} of {evaluable}: {name}"
+                )
+                
+                if not result.get("cached"):
+                    for key in token_usage:
+                        token_usage[key] += result.get("usage", {}).get(key, 0)
+                
+                if result["success"]:
+                    row = result_row(name, result)
+                    results.append(row)
+                    rows[name] = row
+                else:
+                    rows.pop(name, None)
+                    st.error(f"Error evaluating {name}: {result['error']}")
+                
+                render_results(results_table, list(rows.values()))
+            
+            report_ingestion(skipped, truncated)
             
             # Display results
             if results:
                 st.success("✅ Evaluation complete!")
                 
-                # Create results dataframe
-                df = pd.DataFrame(results)
+                reused = sum(row["Method"] == "Store" for row in results)
+                if reused:
+                    st.caption(f"{reused} of {len(results)} documents unchanged since their last evaluation, served from the result store")
                 
-                # Display results table
-                st.subheader("📊 Results")
-                st.dataframe(
-                    df,
-                    column_config={
-                        "Document": "Document",
-                        "Verdict": st.column_config.TextColumn("Verdict"),
-                        "Confidence": st.column_config.ProgressColumn(
-                            "Confidence",
-                            min_value=0,
-                            max_value=1,
-                            format="%.2f"
-                        ),
-                        "Explanation": "Explanation"
-                    },
-                    hide_index=True,
-                    use_container_width=True
+                if llm_service.cache is not None:
+                    cache_stats = llm_service.cache.stats()
+                    st.caption(
+                        f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                        f"({cache_stats['hit_rate']:.0%} hit rate)"
+                    )
+                
+                st.caption(
+                    f"Estimated cost: ${sum(row['Cost ($)'] for row in results):,.4f}; "
+                    f"input tokens: {token_usage['input_tokens']:,.0f} sent, "
+                    f"{token_usage['cached_input_tokens']:,.0f} served from the provider prompt cache, "
+                    f"~{token_usage['saved_input_tokens']:,.0f} saved by multi-document calls"
                 )
                 
+                # Create results dataframe
+                df = pd.DataFrame(results)
+                
                 # Add download button
                 csv = df.to_csv(index=False).encode('utf-8')
                 st.download_button(
@@ -242,11 +697,67 @@ def main():
                     mime="text/csv"
                 )
 
+    # Jobs are addressed through the URL so progress survives page reloads
+    if "job" in st.query_params:
+        render_job(get_job_manager(), st.query_params["job"])
+    
+    if background_jobs:
+        with st.expander("🗂️ Recent Jobs"):
+            jobs = get_job_manager().store.list_jobs()
+            if jobs:
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Job": job["id"],
+                            "Status": job["status"],
+                            "Progress": f"{job['completed']}/{job['total']}",
+                            "Errors": job["failed"],
+                            "Model": job["settings"].get("model"),
+                            "Submitted": pd.to_datetime(job["created_at"], unit="s")
+                        }
+                        for job in jobs
+                    ]),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.caption("No jobs yet")
+    
+    if llm_service.store is not None:
+        with st.expander("📈 History"):
+            runs = llm_service.store.runs()
+            if runs:
+                history = pd.DataFrame([
+                    {
+                        "Run": run["id"],
+                        "Started": pd.to_datetime(run["started_at"], unit="s"),
+                        "Golden Standard": run["golden_hash"][:12],
+                        "Model": run["settings"].get("model"),
+                        "Documents": run["documents"],
+                        "Reused": run["reused"],
+                        "Pass": run["passed"],
+                        "Fail": run["failed"],
+                        "Errors": run["errors"],
+                        "Pass Rate": run["pass_rate"],
+                        "Cost ($)": run["cost_usd"]
+                    }
+                    for run in runs
+                ])
+                st.line_chart(history.dropna(subset=["Pass Rate"]), x="Started", y="Pass Rate")
+                st.dataframe(history, hide_index=True, use_container_width=True)
+            else:
+                st.caption("No runs yet")
+    
+    if llm_service.router is not None:
+        with st.expander("🔀 Backends"):
+            st.dataframe(pd.DataFrame(llm_service.router.status()), hide_index=True, use_container_width=True)
+    
     # Add usage instructions
     with st.expander("ℹ️ How to use"):
         st.markdown("""
         1. **Upload Documents**:
-           - Golden Standard: Your reference document (Markdown format)
+           - Golden Standard: Your reference document (Markdown format); upload several to get a
+             grid of every document against every standard
            - Documents to Evaluate: One or more documents to compare against the standard
         
         2. **Configure Settings** (optional):
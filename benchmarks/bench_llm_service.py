@@ -0,0 +1,365 @@
+"""
+Offline throughput and latency benchmarks for LLMService.
+
+Every scenario runs in a fresh process against FakeChatModel, so no API
+keys or network access are needed and peak RSS is measured per scenario.
+With ``--transport replay`` the real provider clients are used instead,
+answered from responses recorded earlier with ``--transport record`` (which
+does call the provider), so SDK parsing and recorded latencies are included.
+
+Usage:
+    python benchmarks/bench_llm_service.py --sizes 10,100,1000 --modes batch,document
+    python benchmarks/bench_llm_service.py --compare benchmarks/results/<baseline>.json
+    python benchmarks/bench_llm_service.py --sizes 100 --transport replay --replay-path recordings.sqlite3
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# The fake model never uses these; they let the default client be created if anything asks for it
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("GROQ_API_KEY", "gsk-benchmark")
+
+MODES = ("document", "batch", "stream")
+
+TOPICS = [
+    "authentication", "authorization", "logging", "caching", "storage", "networking",
+    "monitoring", "deployment", "backups", "encryption", "billing", "notifications"
+]
+
+
+def make_golden_standard(sections: int = 6, bullets: int = 5, seed: int = 0) -> str:
+    """Build a synthetic golden standard with ``sections`` headings of requirement bullets."""
+    rng = random.Random(seed)
+    lines = ["# Service Requirements", ""]
+    for topic in rng.sample(TOPICS, min(sections, len(TOPICS))):
+        lines += [f"## {topic.capitalize()}", ""]
+        for i in range(bullets):
+            lines.append(f"- The {topic} component must support requirement {i + 1} with {rng.choice(TOPICS)} integration")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def iter_corpus(golden_standard: str, size: int, doc_chars: int = 2000, seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """Yield ``size`` documents derived from the golden standard, generated lazily."""
+    rng = random.Random(seed)
+    lines = golden_standard.splitlines()
+    for n in range(size):
+        # Drop some bullets so documents differ from each other
+        kept = [line for line in lines if not line.startswith("- ") or rng.random() > 0.2]
+        body = "\n".join(kept)
+        filler = f"\n\nNotes for revision {n}: " + " ".join(rng.choice(TOPICS) for _ in range(doc_chars // 10))
+        yield f"doc_{n:05d}.md", (body + filler)[:max(doc_chars, len(body))]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0-100) of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _drive(service, mode: str, golden_standard: str, documents: Iterator[Tuple[str, str]],
+                 max_concurrency: int, documents_per_call: int) -> Tuple[List[float], List[Dict[str, Any]]]:
+    latencies: List[float] = []
+    results: List[Dict[str, Any]] = []
+
+    if mode == "batch":
+        started: Dict[str, float] = {}
+
+        def stamped() -> Iterator[Tuple[str, str]]:
+            # evaluate_batch pulls documents only when it has capacity
+            for name, content in documents:
+                started[name] = time.perf_counter()
+                yield name, content
+
+        async for name, result in service.evaluate_batch(
+            golden_standard, stamped(), max_concurrency=max_concurrency, documents_per_call=documents_per_call
+        ):
+            latencies.append(time.perf_counter() - started.pop(name))
+            results.append(result)
+        return latencies, results
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(content: str):
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "stream":
+                result = None
+                async for update in service.stream_evaluate_document(golden_standard, content):
+                    result = update
+            else:
+                result = await service.evaluate_document(golden_standard, content)
+            latencies.append(time.perf_counter() - start)
+            results.append(result)
+
+    pending = set()
+    for _, content in documents:
+        if len(pending) >= max_concurrency * 2:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.ensure_future(_one(content)))
+    if pending:
+        await asyncio.wait(pending)
+    return latencies, results
+
+
+def _drop_clients(service):
+    for name in ("llm", "cascade_llm", "router"):
+        service.__dict__.pop(name, None)
+
+
+def run_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one benchmark scenario in the current process and return its metrics."""
+    from config import config
+    from fake_llm import FakeChatModel
+    from llm_service import LLMService
+
+    overrides = {
+        # Measure the service itself, not client-side throttling
+        "rate_limits": {},
+        "llm_max_retries": params["max_retries"],
+        "retry_base_delay": params["retry_base_delay"],
+        "max_concurrency": params["max_concurrency"],
+        "prefilter_enabled": params["prefilter"]
+    }
+    fake = None
+    if params.get("transport", "fake") == "fake":
+        fake = FakeChatModel(
+            latency=params["latency"],
+            distribution=params["distribution"],
+            jitter=params["jitter"],
+            error_rate=params["error_rate"],
+            error_status=params["error_status"],
+            output_tokens=params["output_tokens"],
+            seed=params["seed"]
+        )
+    else:
+        overrides.update({
+            "llm_transport": params["transport"],
+            "replay_path": params["replay_path"],
+            "replay_latency": params.get("replay_latency"),
+            "replay_jitter": 0.0
+        })
+    saved = {name: getattr(config, name) for name in overrides}
+
+    service = LLMService()
+    saved_cache = service.cache
+
+    golden_standard = make_golden_standard(seed=params["seed"])
+    documents = iter_corpus(golden_standard, params["documents"], params["doc_chars"], params["seed"])
+
+    try:
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        # Clients are created on first use, under the transport set above
+        _drop_clients(service)
+        if fake is not None:
+            service.llm = fake
+        if not params["cache"]:
+            service.cache = None
+
+        start = time.perf_counter()
+        latencies, results = asyncio.run(_drive(
+            service, params["mode"], golden_standard, documents,
+            params["max_concurrency"], params["documents_per_call"]
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        # The service and config are process-wide; leave them as we found them
+        for name, value in saved.items():
+            setattr(config, name, value)
+        _drop_clients(service)
+        service.cache = saved_cache
+
+    errors = sum(1 for r in results if not r.get("success"))
+    usage = [r.get("usage", {}) for r in results]
+    return {
+        **params,
+        "elapsed_s": round(elapsed, 4),
+        "docs_per_sec": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(1000 * percentile(latencies, 50), 2),
+            "p95": round(1000 * percentile(latencies, 95), 2),
+            "p99": round(1000 * percentile(latencies, 99), 2),
+            "max": round(1000 * max(latencies), 2) if latencies else 0.0
+        },
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "llm_calls": fake.calls if fake else None,
+        "llm_errors": fake.errors if fake else None,
+        "input_tokens": int(sum(u.get("input_tokens", 0) for u in usage)),
+        "output_tokens": int(sum(u.get("output_tokens", 0) for u in usage)),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def run_isolated(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a scenario in a fresh interpreter so peak RSS is not shared between scenarios."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_scenario, (params,))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe throughput and tail-latency changes for scenarios present in both runs."""
+    def key(s):
+        return (s["mode"], s["documents"])
+
+    previous = {key(s): s for s in baseline["scenarios"]}
+    lines = []
+    for scenario in current["scenarios"]:
+        old = previous.get(key(scenario))
+        if old is None:
+            continue
+        throughput = (scenario["docs_per_sec"] - old["docs_per_sec"]) / old["docs_per_sec"] if old["docs_per_sec"] else 0.0
+        p95 = (scenario["latency_ms"]["p95"] - old["latency_ms"]["p95"]) / old["latency_ms"]["p95"] if old["latency_ms"]["p95"] else 0.0
+        lines.append(
+            f"{scenario['mode']:>8} {scenario['documents']:>6}: docs/sec {throughput:+.1%}, p95 {p95:+.1%}, "
+            f"peak RSS {scenario['peak_rss_mb'] - old['peak_rss_mb']:+.1f} MiB"
+        )
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark LLMService against a fake chat model.")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated corpus sizes (default: 10,100,1000)")
+    parser.add_argument("--modes", default="batch,document", help=f"Comma-separated paths to drive: {', '.join(MODES)}")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--distribution", default="lognormal", help="constant, uniform, exponential or lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread (lognormal sigma or uniform fraction)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake LLM calls that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of simulated failures")
+    parser.add_argument("--output-tokens", type=int, default=60, help="Completion tokens reported per call")
+    parser.add_argument("--doc-chars", type=int, default=2000, help="Approximate characters per document")
+    parser.add_argument("--max-concurrency", type=int, default=20)
+    parser.add_argument("--documents-per-call", type=int, default=1)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--retry-base-delay", type=float, default=0.01)
+    parser.add_argument(
+        "--transport",
+        choices=["fake", "record", "replay"],
+        default="fake",
+        help="Fake chat model, or the real clients recording live calls or replaying a recording (default: fake)"
+    )
+    parser.add_argument(
+        "--replay-path",
+        default=os.path.join(ROOT, ".cache", "bench_replay.sqlite3"),
+        help="Recorded responses for --transport record/replay"
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        help="Fixed replayed response time in seconds (default: each response's recorded latency)"
+    )
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--prefilter", action="store_true", help="Enable the similarity pre-filter")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--in-process", action="store_true", help="Don't isolate scenarios in subprocesses")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            print(f"Unknown mode: {mode}", file=sys.stderr)
+            return 2
+
+    commit = git_commit()
+    report: Dict[str, Any] = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": []
+    }
+
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        for mode in modes:
+            params = {
+                "mode": mode,
+                "documents": size,
+                "latency": args.latency,
+                "distribution": args.distribution,
+                "jitter": args.jitter,
+                "error_rate": args.error_rate,
+                "error_status": args.error_status,
+                "output_tokens": args.output_tokens,
+                "doc_chars": args.doc_chars,
+                "max_concurrency": args.max_concurrency,
+                "documents_per_call": args.documents_per_call,
+                "max_retries": args.max_retries,
+                "retry_base_delay": args.retry_base_delay,
+                "cache": args.cache,
+                "prefilter": args.prefilter,
+                "transport": args.transport,
+                "replay_path": args.replay_path,
+                "replay_latency": args.replay_latency,
+                "seed": args.seed
+            }
+            scenario = run_scenario(params) if args.in_process else run_isolated(params)
+            report["scenarios"].append(scenario)
+            latency = scenario["latency_ms"]
+            print(
+                f"{mode:>8} {size:>6} docs: {scenario['docs_per_sec']:>9.1f} docs/s  "
+                f"p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  p99 {latency['p99']:.1f} ms  "
+                f"errors {scenario['error_rate']:.1%}  tokens in {scenario['input_tokens']:,}  "
+                f"peak RSS {scenario['peak_rss_mb']:.0f} MiB",
+                file=sys.stderr
+            )
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit or 'local'}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit') or args.compare}:", file=sys.stderr)
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark: how long importing the service and creating its first client takes.
+
+Every measurement runs in a fresh interpreter, as a new container or CLI
+run would. Nothing talks to a provider, so placeholder API keys are enough.
+Exits non-zero when importing ``llm_service`` takes longer than
+``--max-import-ms`` (median), so start-up regressions fail CI.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --max-import-ms 500 -o startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that should only be loaded once an LLM call is actually made
+HEAVY_MODULES = ("openai", "groq", "httpx", "langchain", "langchain_core", "langchain_openai", "langchain_groq", "numpy")
+
+SCENARIOS = {
+    "config": "import config",
+    "llm_service": "import llm_service",
+    "cli": "import cli",
+    # Import plus creating the chat model (provider SDK import, client set-up)
+    "first_client": "import llm_service; llm_service.llm_service.llm",
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str) -> Dict[str, Any]:
+    """Run ``statement`` in a fresh interpreter and return its duration and the heavy modules it loaded."""
+    env = {**os.environ, "OPENAI_API_KEY": "sk-benchmark", "GROQ_API_KEY": "gsk-benchmark"}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, statement in SCENARIOS.items():
+        runs = [measure(statement) for _ in range(repeat)]
+        timings = [r["ms"] for r in runs]
+        results.append({
+            "scenario": name,
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+            "heavy_modules": runs[-1]["loaded"]
+        })
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure import time and first-client creation in fresh processes.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per scenario (default: 5)")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=1000.0,
+        help="Fail when importing llm_service takes longer than this, median (default: 1000, 0 disables)"
+    )
+    parser.add_argument("-o", "--output", help="Also write the results as JSON")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    results = run(args.repeat)
+    for result in results:
+        heavy = ", ".join(result["heavy_modules"]) or "-"
+        print(
+            f"{result['scenario']:>12}: median {result['median_ms']:>7.1f} ms  "
+            f"min {result['min_ms']:>7.1f} ms  max {result['max_ms']:>7.1f} ms  heavy modules: {heavy}",
+            file=sys.stderr
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    import_ms = next(r["median_ms"] for r in results if r["scenario"] == "llm_service")
+    if args.max_import_ms and import_ms > args.max_import_ms:
+        print(f"Importing llm_service took {import_ms:.0f} ms, over the {args.max_import_ms:.0f} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+
+def make_cache_key(
+    golden_standard: str,
+    document: str,
+    provider: str,
+    model: str,
+    temperature: float,
+    prompt_version: str
+) -> str:
+    """
+    Build a content-addressed cache key for an evaluation.
+
+    Any change to the inputs, the model settings or the prompt template
+    yields a different key, so stale verdicts are never served.
+    """
+    payload = json.dumps(
+        [golden_standard, document, getattr(provider, "value", provider), model, float(temperature), prompt_version],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """Interface implemented by every cache tier."""
+
+    # Tiers that wait on disk or the network are run off the event loop
+    blocking = True
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with optional TTL."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """Persistent cache stored in a local SQLite database."""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS evaluation_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM evaluation_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM evaluation_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE evaluation_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluation_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used ones above the size limit."""
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM evaluation_cache WHERE created_at < ?", (now - self.ttl,)
+            )
+        self._conn.execute(
+            """DELETE FROM evaluation_cache WHERE key NOT IN (
+                SELECT key FROM evaluation_cache ORDER BY accessed_at DESC LIMIT ?
+            )""",
+            (self.max_entries,)
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM evaluation_cache")
+            self._conn.commit()
+
+
+class RedisCache(CacheBackend):
+    """Shared cache tier backed by Redis (requires the optional ``redis`` package)."""
+
+    def __init__(self, url: str, ttl: Optional[float] = None, prefix: str = "docu-judge:"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "Could not import redis python package. "
+                "Please install it with `pip install redis`."
+            )
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._client.get(self.prefix + key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        ex = int(self.ttl) if self.ttl else None
+        self._client.set(self.prefix + key, json.dumps(value), ex=ex)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+async def _call(method, *args):
+    # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+    return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+
+class ResultCache:
+    """
+    Tiered evaluation cache.
+
+    Lookups go through the tiers in order (fastest first); a hit in a slower
+    tier is written back to the faster ones. Writes go to every tier.
+    """
+
+    def __init__(self, tiers: List[CacheBackend]):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Like ``get``, but SQLite and Redis lookups run in the default executor."""
+        for i, tier in enumerate(self.tiers):
+            value = await _call(tier.get, key) if tier.blocking else tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    if faster.blocking:
+                        await _call(faster.set, key, value)
+                    else:
+                        faster.set(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        """Like ``set``, but SQLite and Redis writes run in the default executor."""
+        for tier in self.tiers:
+            if tier.blocking:
+                await _call(tier.set, key, value)
+            else:
+                tier.set(key, value)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for display or logging."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+def build_cache(settings) -> Optional[ResultCache]:
+    """
+    Create the result cache described by the application config.
+
+    Args:
+        settings: Object exposing ``cache_backends``, ``cache_ttl``,
+            ``cache_max_entries``, ``cache_path`` and ``redis_url``
+
+    Returns:
+        A ResultCache, or None if caching is disabled
+    """
+    tiers: List[CacheBackend] = []
+    ttl = settings.cache_ttl or None
+
+    for backend in settings.cache_backends:
+        if backend == "memory":
+            tiers.append(MemoryCache(max_entries=settings.cache_max_entries, ttl=ttl))
+        elif backend == "sqlite":
+            tiers.append(SQLiteCache(settings.cache_path, max_entries=settings.cache_max_entries, ttl=ttl))
+        elif backend == "redis":
+            tiers.append(RedisCache(settings.redis_url, ttl=ttl))
+        else:
+            raise ValueError(f"Unsupported cache backend: {backend}")
+
+    return ResultCache(tiers) if tiers else None
@@ -0,0 +1,125 @@
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Iterator, List, Set, Tuple, Union
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+# Words that say nothing about what a section covers ("Security Requirements"
+# and "Security" should match)
+HEADING_STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on",
+    "requirement", "requirements", "target", "targets", "section", "overview", "spec", "specs"
+}
+
+
+@dataclass
+class Section:
+    """A markdown section: a heading and the text beneath it."""
+    heading: str
+    level: int
+    body: str
+
+    @property
+    def text(self) -> str:
+        """The section rendered back as markdown, heading included."""
+        if not self.heading:
+            return self.body
+        return f"{'#' * self.level} {self.heading}\n{self.body}".rstrip()
+
+    @cached_property
+    def keywords(self) -> Set[str]:
+        return heading_keywords(self.heading)
+
+
+def iter_sections(source: Union[str, Iterable[str]], max_level: int = 2) -> Iterator[Section]:
+    """
+    Split markdown into sections on headings up to ``max_level``.
+
+    Works on a string or any iterable of lines (e.g. an open file), yielding
+    each section as soon as the next heading is seen, so large documents are
+    never held in memory more than one section at a time. Deeper headings
+    stay inside their parent section.
+
+    Args:
+        source: Markdown text or an iterable of lines
+        max_level: Deepest heading level that starts a new section
+
+    Yields:
+        Section objects in document order; text before the first heading is
+        yielded with an empty heading
+    """
+    lines = source.splitlines() if isinstance(source, str) else source
+    heading, level = "", 0
+    body: List[str] = []
+    in_code_block = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.lstrip().startswith("```"):
+            in_code_block = not in_code_block
+
+        match = None if in_code_block else HEADING_PATTERN.match(line)
+        if match and len(match.group(1)) <= max_level:
+            if heading or any(l.strip() for l in body):
+                yield Section(heading, level, "\n".join(body).strip())
+            heading, level, body = match.group(2), len(match.group(1)), []
+        else:
+            body.append(line)
+
+    if heading or any(l.strip() for l in body):
+        yield Section(heading, level, "\n".join(body).strip())
+
+
+def heading_keywords(heading: str) -> Set[str]:
+    """Normalize a heading into a set of meaningful lowercase words."""
+    words = re.findall(r"[a-z0-9]+", heading.lower())
+    return {w.rstrip("s") if len(w) > 3 else w for w in words if w not in HEADING_STOPWORDS}
+
+
+def heading_similarity(a: Set[str], b: Set[str]) -> float:
+    """Overlap coefficient between two heading keyword sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def match_sections(
+    golden_sections: List[Section],
+    document_sections: List[Section],
+    threshold: float = 0.5
+) -> List[Tuple[Section, List[Section]]]:
+    """
+    Pair every golden-standard section with the document sections that cover it.
+
+    A document section is matched to the golden section whose heading it
+    resembles most. Golden sections left without a match fall back to the
+    document sections nobody claimed, since the content may live under an
+    unexpected heading.
+
+    Args:
+        golden_sections: Sections of the golden standard (empty bodies skipped)
+        document_sections: Sections of the document being evaluated
+        threshold: Minimum heading similarity to count as a match
+
+    Returns:
+        List of (golden_section, matching_document_sections) pairs
+    """
+    golden = [s for s in golden_sections if s.body]
+    matches: List[List[Section]] = [[] for _ in golden]
+    unclaimed: List[Section] = []
+
+    for section in document_sections:
+        if not section.body:
+            continue
+        scores = [heading_similarity(g.keywords, section.keywords) for g in golden]
+        best = max(range(len(scores)), key=scores.__getitem__) if scores else -1
+        if best >= 0 and scores[best] >= threshold:
+            matches[best].append(section)
+        else:
+            unclaimed.append(section)
+
+    return [
+        (section, matched or unclaimed)
+        for section, matched in zip(golden, matches)
+    ]
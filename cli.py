@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+import sys
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config import config, LLMProvider, PROVIDER_MODELS
+from llm_service import llm_service
+from golden import GoldenStandard, load_golden_standard
+from ingest import DocumentTooLarge, read_path
+from result_store import ResultStore
+
+DOCUMENT_EXTENSIONS = (".md", ".markdown", ".txt")
+
+OUTPUT_FIELDS = ["document", "verdict", "confidence", "explanation", "method", "cached", "success", "error"]
+
+
+def read_text(path: str) -> str:
+    """
+    Read a file from disk incrementally, detecting its encoding.
+
+    Files above ``config.max_document_bytes`` raise DocumentTooLarge, or are
+    cut to the limit with a warning when ``config.oversize_policy`` is
+    ``truncate``.
+    """
+    document = read_path(path, config.max_document_bytes, config.oversize_policy)
+    if document.truncated:
+        print(f"Truncated {path} to the first {config.max_document_bytes:,} bytes", file=sys.stderr)
+    return document.text
+
+
+def iter_document_paths(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Expand files, directories and glob patterns into document paths, lazily.
+
+    Directories are walked recursively for markdown and text files; paths are
+    yielded in a stable sorted order within each directory so reruns line up.
+    """
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(item):
+            yield item
+        else:
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield path
+
+
+def iter_documents(paths: Iterable[str], skip: Set[str]) -> Iterator[Tuple[str, str]]:
+    """Yield (path, content) pairs, reading each file only when it is needed."""
+    for path in paths:
+        if path in skip:
+            continue
+        try:
+            content = read_text(path)
+        except DocumentTooLarge as e:
+            print(f"Skipping oversized file: {e}", file=sys.stderr)
+            continue
+        except OSError as e:
+            print(f"Skipping unreadable file {path}: {e}", file=sys.stderr)
+            continue
+        if not content.strip():
+            print(f"Skipping empty file {path}", file=sys.stderr)
+            continue
+        yield path, content
+
+
+def _json_rows(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Decode JSONL rows, skipping lines that aren't complete JSON objects."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            # A run killed mid-write leaves a truncated last line
+            continue
+        if isinstance(row, dict):
+            yield row
+
+
+def _ends_mid_line(path: str) -> bool:
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) not in (b"\n", b"\r")
+
+
+def completed_documents(output: str, output_format: str) -> Set[str]:
+    """Names of documents already evaluated successfully in an existing output file."""
+    if not os.path.exists(output):
+        return set()
+
+    done = set()
+    with open(output, newline="", encoding="utf-8") as f:
+        if output_format == "csv":
+            rows: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        else:
+            rows = _json_rows(f)
+        for row in rows:
+            if str(row.get("success")).lower() == "true":
+                done.add(row["document"])
+    return done
+
+
+class ResultWriter:
+    """Append results to a CSV or JSONL file, flushing after every row."""
+
+    def __init__(self, path: str, output_format: str):
+        self.output_format = output_format
+        write_header = output_format == "csv" and (not os.path.exists(path) or os.path.getsize(path) == 0)
+        unfinished = _ends_mid_line(path)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if unfinished:
+            # Start on a new line rather than after what a killed run left half-written
+            self._file.write("\n")
+        if output_format == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+            if write_header:
+                self._writer.writeheader()
+
+    def write(self, name: str, result: Dict[str, Any]):
+        row = {
+            "document": name,
+            "verdict": result.get("verdict", ""),
+            "confidence": result.get("confidence", 0.0),
+            "explanation": result.get("explanation", ""),
+            "method": result.get("method", "llm"),
+            "cached": bool(result.get("cached")),
+            "success": bool(result.get("success")),
+            "error": result.get("error"),
+        }
+        if result.get("cascade"):
+            # Every model's verdict is kept in JSONL output; CSV has the final one only
+            row["cascade"] = [
+                {key: stage.get(key) for key in ("model", "verdict", "confidence", "explanation")}
+                for stage in result["cascade"]
+            ]
+        if result.get("diff"):
+            row["diff"] = result["diff"]
+        if result.get("retrieval"):
+            row["retrieval"] = result["retrieval"]
+        if result.get("samples"):
+            row.update(samples=result["samples"], votes=result["votes"], agreement=result["agreement"])
+        if self.output_format == "csv":
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+async def run_batch(
+    golden_standard: Union[str, GoldenStandard],
+    documents: Iterable[Tuple[str, str]],
+    writer: ResultWriter,
+    max_concurrency: Optional[int] = None,
+    documents_per_call: Optional[int] = None,
+    quiet: bool = False,
+    reuse_stored: bool = True
+) -> Dict[str, int]:
+    """Evaluate documents and write each result as soon as it completes."""
+    counts = {"evaluated": 0, "failed": 0, "reused": 0}
+    async for name, result in llm_service.evaluate_batch(
+        golden_standard,
+        documents,
+        max_concurrency=max_concurrency,
+        documents_per_call=documents_per_call,
+        reuse_stored=reuse_stored
+    ):
+        writer.write(name, result)
+        counts["evaluated"] += 1
+        if result.get("method") == "store":
+            counts["reused"] += 1
+        if not result["success"]:
+            counts["failed"] += 1
+        if not quiet:
+            status = f"{result['verdict']} ({result['confidence']:.2f})" if result["success"] else f"error: {result['error']}"
+            print(f"[{counts['evaluated']}] {name}: {status}", file=sys.stderr)
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="docu-judge",
+        description="Evaluate documents against a golden standard without the Streamlit UI."
+    )
+    parser.add_argument("golden_standard", help="Path to the golden standard document")
+    parser.add_argument(
+        "documents",
+        nargs="+",
+        help="Documents to evaluate: files, directories (searched recursively) or glob patterns"
+    )
+    parser.add_argument("-o", "--output", default="results.jsonl", help="Output file (default: results.jsonl)")
+    parser.add_argument(
+        "-f", "--format",
+        choices=["jsonl", "csv"],
+        help="Output format (default: inferred from the output file extension)"
+    )
+    parser.add_argument("--provider", choices=[p.value for p in LLMProvider], help="LLM provider override")
+    parser.add_argument("--model", help="Model override")
+    parser.add_argument(
+        "--cascade-model",
+        help="Cheaper model that judges every document first; only unclear verdicts are re-judged by --model"
+    )
+    parser.add_argument(
+        "--cascade-threshold",
+        type=float,
+        help="Confidence below which a first-pass verdict is escalated (default: CASCADE_CONFIDENCE_THRESHOLD)"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        help="Self-consistency samples per verdict, taking the majority (default: CONSISTENCY_SAMPLES)"
+    )
+    parser.add_argument("--max-concurrency", type=int, help="Maximum number of in-flight LLM calls")
+    parser.add_argument("--documents-per-call", type=int, help="Short documents judged together per LLM call")
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Re-evaluate documents already present in the output file"
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Judge revisions of the golden standard from their section-level differences (default: DIFF_MODE)"
+    )
+    parser.add_argument(
+        "--retrieval",
+        action="store_true",
+        help="Judge long documents from the passages most similar to each requirement (default: RETRIEVAL_ENABLED)"
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="Record the run in the result store and re-evaluate only changed documents (default: RESULT_STORE_ENABLED)"
+    )
+    parser.add_argument(
+        "--no-reuse",
+        action="store_true",
+        help="Evaluate every document again even if the result store has an unchanged result"
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Print the projected tokens and cost of the batch and exit without evaluating"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["live", "record", "replay"],
+        help="Call the provider, record its responses or replay recorded ones offline (default: LLM_TRANSPORT)"
+    )
+    parser.add_argument("--replay-path", help="Recorded responses file (default: REPLAY_PATH)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print per-document progress")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.max_concurrency is not None and args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    if args.cascade_threshold is not None:
+        config.cascade_threshold = args.cascade_threshold
+    if args.diff:
+        config.diff_mode = True
+    if args.retrieval:
+        config.retrieval_enabled = True
+    if args.samples is not None:
+        config.consistency_samples = args.samples
+    if args.transport:
+        config.llm_transport = args.transport
+    if args.replay_path:
+        config.replay_path = args.replay_path
+
+    if args.provider or args.model or args.cascade_model:
+        provider = args.provider or config.llm_provider
+        model = args.model
+        if model is None:
+            # The configured model belongs to the configured provider; another one starts from its default
+            model = config.llm_model if provider == config.llm_provider else PROVIDER_MODELS[provider][0]
+        api_key = os.getenv("OPENAI_API_KEY") if provider == LLMProvider.OPENAI else os.getenv("GROQ_API_KEY")
+        llm_service.update_config(
+            provider=provider,
+            model=model,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            api_key=api_key,
+            cascade_model=args.cascade_model or config.cascade_model
+        )
+
+    if args.store and llm_service.store is None:
+        llm_service.store = ResultStore(config.result_store_path)
+
+    try:
+        golden_text = read_text(args.golden_standard)
+    except DocumentTooLarge as e:
+        print(f"Golden standard rejected: {e}", file=sys.stderr)
+        return 2
+    if not golden_text.strip():
+        print(f"Golden standard {args.golden_standard} is empty", file=sys.stderr)
+        return 2
+    golden_standard = load_golden_standard(golden_text)
+
+    if args.estimate:
+        projection = llm_service.project_batch(
+            golden_standard, iter_documents(iter_document_paths(args.documents), set()), args.documents_per_call
+        )
+        strategies = ", ".join(f"{count} {strategy}" for strategy, count in projection["strategies"].items())
+        print(
+            f"{projection['documents']} documents ({strategies or 'none'}) in {projection['calls']} calls: "
+            f"~{projection['input_tokens']:,} input and "
+            f"~{projection['output_tokens']:,} output tokens, ~${projection['cost_usd']:,.4f} "
+            f"with {llm_service.current_config['model']}",
+            file=sys.stderr
+        )
+        return 0
+
+    skip = set() if args.no_resume else completed_documents(args.output, output_format)
+    if skip:
+        print(f"Resuming: skipping {len(skip)} documents already in {args.output}", file=sys.stderr)
+
+    writer = ResultWriter(args.output, output_format)
+    try:
+        counts = asyncio.run(run_batch(
+            golden_standard,
+            iter_documents(iter_document_paths(args.documents), skip),
+            writer,
+            max_concurrency=args.max_concurrency,
+            documents_per_call=args.documents_per_call,
+            quiet=args.quiet,
+            reuse_stored=not args.no_reuse
+        ))
+    finally:
+        writer.close()
+
+    reused = f", {counts['reused']} unchanged and served from the result store" if counts["reused"] else ""
+    print(
+        f"Evaluated {counts['evaluated']} documents ({counts['failed']} errors{reused}); results in {args.output}",
+        file=sys.stderr
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
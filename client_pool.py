@@ -0,0 +1,185 @@
+import asyncio
+import queue
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Dict, Iterator, Optional, Tuple
+
+from config import config, LLMProvider
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class AsyncRunner:
+    """
+    A long-lived event loop on a daemon thread.
+
+    Streamlit reruns the script on every interaction, and ``asyncio.run``
+    creates (and closes) a fresh loop each time, which throws away every
+    pooled HTTP connection. Submitting work to one persistent loop instead
+    keeps keep-alive connections and TLS sessions warm across reruns and
+    sessions.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="docu-judge-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def iterate(self, agen: AsyncIterator[Any]) -> Iterator[Any]:
+        """
+        Consume an async iterator on the shared loop from synchronous code.
+
+        Items are handed back to the calling thread as they are produced, so
+        callers (e.g. the Streamlit script thread) can update the UI per item.
+        Closing the returned generator early cancels the async iterator.
+        """
+        items: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(("item", item))
+            except BaseException as e:
+                items.put(("error", e))
+                raise
+            finally:
+                items.put(("done", None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                kind, value = items.get()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    if not isinstance(value, asyncio.CancelledError):
+                        raise value
+                else:
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+
+class ClientPool:
+    """
+    Long-lived LLM clients keyed by their settings.
+
+    One httpx connection pool is shared per provider and API key, and chat
+    model instances are reused whenever the same settings come back (e.g.
+    switching models in the sidebar and back again), instead of being
+    rebuilt with cold connections.
+
+    The HTTP library and provider SDKs are imported when the first client
+    is created rather than at import time, which keeps process start-up
+    fast and only ever loads the SDK of a provider that is actually used.
+    """
+
+    def __init__(self, max_clients: int = 16):
+        self.max_clients = max_clients
+        self._http_clients: Dict[Tuple[str, str, str], "httpx.AsyncClient"] = {}
+        self._llms: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_http_client(self, provider: str, api_key: str) -> "httpx.AsyncClient":
+        """Return the shared async HTTP client for a provider and key."""
+        key = (LLMProvider(provider).value, api_key, config.llm_transport)
+        with self._lock:
+            client = self._http_clients.get(key)
+            if client is None:
+                import httpx
+
+                limits = httpx.Limits(
+                    max_connections=config.http_max_connections,
+                    max_keepalive_connections=config.http_max_connections,
+                    keepalive_expiry=config.http_keepalive_expiry
+                )
+                transport = None
+                if config.llm_transport != "live":
+                    from replay import build_transport
+                    transport = build_transport(limits)
+                client = httpx.AsyncClient(
+                    limits=limits, timeout=httpx.Timeout(config.http_timeout), transport=transport
+                )
+                self._http_clients[key] = client
+            return client
+
+    def get_llm(self, provider: str, model: str, temperature: float, max_tokens: int, api_key: str):
+        """Return a chat model for these settings, creating it on first use."""
+        key = (LLMProvider(provider).value, model, float(temperature), int(max_tokens), api_key, config.llm_transport)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is not None:
+                self._llms.move_to_end(key)
+                return llm
+
+        llm = self._create_llm(provider, model, temperature, max_tokens, api_key)
+
+        with self._lock:
+            self._llms[key] = llm
+            while len(self._llms) > self.max_clients:
+                self._llms.popitem(last=False)
+        return llm
+
+    def _create_llm(self, provider: str, model: str, temperature: float, max_tokens: int, api_key: str):
+        from langchain_core.pydantic_v1 import SecretStr
+
+        http_client = self.get_http_client(provider, api_key)
+
+        if provider == LLMProvider.OPENAI:
+            import openai
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=SecretStr(api_key),
+                # Retries are handled by rate_limiter so 429s adapt concurrency
+                max_retries=0,
+                async_client=openai.AsyncOpenAI(
+                    api_key=api_key, http_client=http_client, max_retries=0
+                ).chat.completions
+            )
+        elif provider == LLMProvider.GROQ:
+            import groq
+            from langchain_groq import ChatGroq
+
+            return ChatGroq(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=SecretStr(api_key),
+                max_retries=0,
+                async_client=groq.AsyncGroq(
+                    api_key=api_key, http_client=http_client, max_retries=0
+                ).chat.completions
+            )
+        else:
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> AsyncRunner:
+    """Return the process-wide event loop runner, starting it on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+        return _runner
+
+
+# Global instance
+client_pool = ClientPool()
@@ -1,5 +1,6 @@
+import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 from enum import Enum
 
@@ -10,35 +11,260 @@ class LLMProvider(str, Enum):
     OPENAI = "openai"
     GROQ = "groq"
 
+# Models offered for each provider; the first is its default
+PROVIDER_MODELS = {
+    LLMProvider.OPENAI.value: ["gpt-4", "gpt-3.5-turbo"],
+    LLMProvider.GROQ.value: ["mixtral-8x7b-32768", "llama3-8b-8192"],
+}
+
+# Stands in for a missing API key when replaying, since no request reaches the provider
+REPLAY_API_KEY = "replay"
+
 class Config:
     def __init__(self):
         self.llm_provider = os.getenv("LLM_PROVIDER", "openai").lower()
         self.llm_model = os.getenv("LLM_MODEL", "gpt-4")
         self.temperature = float(os.getenv("LLM_TEMPERATURE", 0.3))
         self.max_tokens = int(os.getenv("MAX_TOKENS", 2000))
+        self.max_concurrency = int(os.getenv("MAX_CONCURRENCY", 5))
+        self.stream_results = os.getenv("STREAM_RESULTS", "true").lower() in ("1", "true", "yes")
+        
+        # Client-side rate limits per provider (0 = unlimited) and retry policy
+        self.rate_limits = {
+            LLMProvider.OPENAI.value: {
+                "rpm": float(os.getenv("OPENAI_RPM", 500)),
+                "tpm": float(os.getenv("OPENAI_TPM", 150000)),
+            },
+            LLMProvider.GROQ.value: {
+                "rpm": float(os.getenv("GROQ_RPM", 30)),
+                "tpm": float(os.getenv("GROQ_TPM", 15000)),
+            },
+        }
+        self.llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", 5))
+        self.retry_base_delay = float(os.getenv("RETRY_BASE_DELAY", 1.0))
+        self.retry_max_delay = float(os.getenv("RETRY_MAX_DELAY", 60.0))
+        
+        # Shared HTTP connection pool per provider/API key
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", 120))
+        
+        # Multi-document mode: judge up to N short documents per LLM call
+        self.documents_per_call = int(os.getenv("DOCUMENTS_PER_CALL", 1))
+        self.multi_doc_max_chars = int(os.getenv("MULTI_DOC_MAX_CHARS", 4000))
+        
+        # Input size limit in bytes (0 = none) and what to do above it: reject or truncate
+        self.max_document_bytes = int(os.getenv("MAX_DOCUMENT_BYTES", 10_000_000))
+        self.oversize_policy = os.getenv("OVERSIZE_POLICY", "reject").lower()
+        
+        # Golden standard + document above this size is evaluated section by section
+        self.chunk_threshold_chars = int(os.getenv("CHUNK_THRESHOLD_CHARS", 24000))
+        
+        # Local similarity pre-filter that settles clear-cut documents without an LLM call
+        self.prefilter_enabled = os.getenv("PREFILTER_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.prefilter_pass_threshold = float(os.getenv("PREFILTER_PASS_THRESHOLD", 0.9))
+        self.prefilter_fail_threshold = float(os.getenv("PREFILTER_FAIL_THRESHOLD", 0.1))
+        
+        # Result cache: comma-separated tiers, fastest first ("none" disables caching)
+        self.cache_backends = [
+            b.strip().lower() for b in os.getenv("CACHE_BACKEND", "memory").split(",")
+            if b.strip() and b.strip().lower() != "none"
+        ]
+        self.cache_ttl = float(os.getenv("CACHE_TTL", 86400))
+        self.cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", 1000))
+        self.cache_path = os.getenv("CACHE_PATH", ".cache/docu_judge.sqlite3")
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        
+        # Result store: every run's per-document results, kept for trend analysis
+        # and so re-uploaded corpora only re-evaluate documents that changed
+        self.result_store_enabled = os.getenv("RESULT_STORE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.result_store_path = os.getenv("RESULT_STORE_PATH", ".cache/results.sqlite3")
+        
+        # Model cascade: judge with CASCADE_MODEL first and re-judge with LLM_MODEL
+        # only when the verdict is missing or less confident than the threshold
+        self.cascade_model = os.getenv("CASCADE_MODEL") or None
+        self.cascade_threshold = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", 0.8))
+        
+        # Diff-aware mode: judge revisions of the golden standard from their
+        # section-level differences instead of the full texts
+        self.diff_mode = os.getenv("DIFF_MODE", "false").lower() in ("1", "true", "yes")
+        self.diff_min_coverage = float(os.getenv("DIFF_MIN_COVERAGE", 0.5))
+        
+        # Retrieval: judge long documents from the passages most similar to each
+        # requirement (hashed n-gram vectors) instead of the full text
+        self.retrieval_enabled = os.getenv("RETRIEVAL_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.retrieval_top_k = int(os.getenv("RETRIEVAL_TOP_K", 3))
+        self.retrieval_passage_chars = int(os.getenv("RETRIEVAL_PASSAGE_CHARS", 800))
+        self.retrieval_min_chars = int(os.getenv("RETRIEVAL_MIN_CHARS", 12000))
+        
+        # Self-consistency: up to N samples per verdict with a majority vote (1 = a
+        # single call); a first sample at least this confident is kept on its own
+        self.consistency_samples = int(os.getenv("CONSISTENCY_SAMPLES", 1))
+        self.consistency_threshold = float(os.getenv("CONSISTENCY_CONFIDENCE_THRESHOLD", 0.9))
+        
+        # How verdicts are requested: provider tool calling, JSON mode or plain text
+        self.output_mode = os.getenv("OUTPUT_MODE", "function_calling").lower()
+        
+        # Instrumentation: Prometheus endpoint port (0 disables) and per-model
+        # price overrides as JSON, e.g. {"gpt-4": [30, 60]} (USD per million input/output tokens)
+        self.metrics_port = int(os.getenv("METRICS_PORT", 0))
+        self.model_pricing = json.loads(os.getenv("MODEL_PRICING") or "{}")
+        
+        # Token budgeting: how prompts are counted (tiktoken when available, or
+        # ~4 characters per token) and per-model context window overrides as
+        # JSON, e.g. {"gpt-4": 8192}
+        self.tokenizer = os.getenv("TOKENIZER", "auto").lower()
+        self.model_context_windows = json.loads(os.getenv("MODEL_CONTEXT_WINDOWS") or "{}")
+        
+        # Background jobs: persisted queue shared by every session in the process
+        self.background_jobs = os.getenv("BACKGROUND_JOBS", "false").lower() in ("1", "true", "yes")
+        self.jobs_db_path = os.getenv("JOBS_DB_PATH", ".cache/jobs.sqlite3")
+        self.job_workers = int(os.getenv("JOB_WORKERS", 2))
+        self.job_poll_interval = float(os.getenv("JOB_POLL_INTERVAL", 2.0))
+        
+        # Provider transport: live calls, record them (REPLAY_PATH) or replay
+        # recorded responses offline; replayed latency is the recorded one
+        # ("recorded") or fixed seconds, spread by REPLAY_JITTER (a fraction)
+        self.llm_transport = os.getenv("LLM_TRANSPORT", "live").lower()
+        self.replay_path = os.getenv("REPLAY_PATH", ".cache/replay.sqlite3")
+        replay_latency = os.getenv("REPLAY_LATENCY", "recorded").lower()
+        self.replay_latency = None if replay_latency == "recorded" else float(replay_latency)
+        self.replay_jitter = float(os.getenv("REPLAY_JITTER", 0.0))
+        self.replay_seed = int(os.getenv("REPLAY_SEED", 0))
         
         # Provider-specific API keys
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         
+        # Multi-backend routing: a JSON list of backends (provider, model and
+        # optionally name, api_key_env, weight, rpm, tpm); empty uses the single
+        # provider and model above
+        self.llm_backends = self._load_backends(os.getenv("LLM_BACKENDS") or "[]")
+        self.routing_strategy = os.getenv("ROUTING_STRATEGY", "weighted").lower()
+        
         self._validate()
     
+    def _load_backends(self, raw: str) -> List[Dict[str, Any]]:
+        """Parse LLM_BACKENDS, resolving each backend's API key from its environment variable."""
+        backends = []
+        for i, entry in enumerate(json.loads(raw)):
+            provider = str(entry.get("provider", "")).lower()
+            if provider not in [p.value for p in LLMProvider]:
+                raise ValueError(f"Unsupported LLM provider for backend {i + 1}: {provider}")
+            if not entry.get("model"):
+                raise ValueError(f"Backend {i + 1} needs a model")
+            
+            key_env = entry.get("api_key_env") or ("OPENAI_API_KEY" if provider == LLMProvider.OPENAI else "GROQ_API_KEY")
+            api_key = os.getenv(key_env) or (REPLAY_API_KEY if self.llm_transport == "replay" else None)
+            if not api_key:
+                raise ValueError(f"API key for backend {i + 1} is missing: set {key_env}")
+            
+            backends.append({
+                "name": entry.get("name") or f"{provider}:{entry['model']}:{key_env}",
+                "provider": provider,
+                "model": entry["model"],
+                "api_key": api_key,
+                "weight": float(entry.get("weight", 1.0)),
+                "limits": {limit: float(entry[limit]) for limit in ("rpm", "tpm") if limit in entry}
+            })
+        
+        names = [backend["name"] for backend in backends]
+        if len(set(names)) != len(names):
+            raise ValueError("LLM backend names must be unique")
+        return backends
+    
     def _validate(self):
-        """Validate the configuration."""
+        """
+        Validate the configuration.
+        
+        API keys are not required here: a missing key is reported when the
+        LLM client is first created, so importing the app, CLI or tests works
+        without one.
+        """
         if self.llm_provider not in [p.value for p in LLMProvider]:
             raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
         
-        if self.llm_provider == LLMProvider.OPENAI and not self.openai_api_key:
-            raise ValueError("OpenAI API key is required when using OpenAI provider")
-            
-        if self.llm_provider == LLMProvider.GROQ and not self.groq_api_key:
-            raise ValueError("Groq API key is required when using Groq provider")
-        
         if not 0.0 <= self.temperature <= 1.0:
             raise ValueError("Temperature must be between 0.0 and 1.0")
         
         if self.max_tokens <= 0:
             raise ValueError("Max tokens must be greater than 0")
+        
+        if self.max_concurrency <= 0:
+            raise ValueError("Max concurrency must be greater than 0")
+        
+        if self.llm_max_retries < 0:
+            raise ValueError("LLM max retries must not be negative")
+        
+        if self.http_max_connections <= 0:
+            raise ValueError("HTTP max connections must be greater than 0")
+        
+        if self.documents_per_call <= 0:
+            raise ValueError("Documents per call must be greater than 0")
+        
+        if self.max_document_bytes < 0:
+            raise ValueError("Max document bytes must not be negative")
+        
+        if self.oversize_policy not in ("reject", "truncate"):
+            raise ValueError(f"Unsupported oversize policy: {self.oversize_policy}")
+        
+        if self.chunk_threshold_chars <= 0:
+            raise ValueError("Chunk threshold must be greater than 0")
+        
+        if not 0.0 <= self.prefilter_fail_threshold < self.prefilter_pass_threshold <= 1.0:
+            raise ValueError("Pre-filter thresholds must satisfy 0 <= fail < pass <= 1")
+        
+        for backend in self.cache_backends:
+            if backend not in ("memory", "sqlite", "redis"):
+                raise ValueError(f"Unsupported cache backend: {backend}")
+        
+        if self.cache_ttl < 0:
+            raise ValueError("Cache TTL must not be negative")
+        
+        if self.cache_max_entries <= 0:
+            raise ValueError("Cache max entries must be greater than 0")
+        
+        if not 0.0 <= self.cascade_threshold <= 1.0:
+            raise ValueError("Cascade confidence threshold must be between 0.0 and 1.0")
+        
+        if not 0.0 <= self.diff_min_coverage <= 1.0:
+            raise ValueError("Diff minimum coverage must be between 0.0 and 1.0")
+        
+        if self.retrieval_top_k <= 0:
+            raise ValueError("Retrieval top-k must be greater than 0")
+        
+        if self.retrieval_passage_chars <= 0:
+            raise ValueError("Retrieval passage size must be greater than 0")
+        
+        if self.consistency_samples <= 0:
+            raise ValueError("Consistency samples must be greater than 0")
+        
+        if not 0.0 <= self.consistency_threshold <= 1.0:
+            raise ValueError("Consistency confidence threshold must be between 0.0 and 1.0")
+        
+        if self.tokenizer not in ("auto", "heuristic"):
+            raise ValueError(f"Unsupported tokenizer: {self.tokenizer}")
+        
+        if self.output_mode not in ("text", "function_calling", "json_mode"):
+            raise ValueError(f"Unsupported output mode: {self.output_mode}")
+        
+        if self.job_workers <= 0:
+            raise ValueError("Job workers must be greater than 0")
+        
+        if self.llm_transport not in ("live", "record", "replay"):
+            raise ValueError(f"Unsupported LLM transport: {self.llm_transport}")
+        
+        if self.replay_latency is not None and self.replay_latency < 0:
+            raise ValueError("Replay latency must not be negative")
+        
+        if not 0.0 <= self.replay_jitter <= 1.0:
+            raise ValueError("Replay jitter must be between 0.0 and 1.0")
+        
+        if self.routing_strategy not in ("weighted", "least_latency"):
+            raise ValueError(f"Unsupported routing strategy: {self.routing_strategy}")
+        
+        if any(backend["weight"] <= 0 for backend in self.llm_backends):
+            raise ValueError("Backend weights must be greater than 0")
     
     def get_llm_config(self) -> Dict[str, Any]:
         """Get the configuration for the selected LLM provider."""
@@ -0,0 +1,203 @@
+import difflib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from chunking import Section, heading_keywords, heading_similarity, iter_sections
+from golden import BULLET_PATTERN, GoldenStandard, iter_bullets, normalize_text
+
+# Heading similarity at which a document section counts as a golden section's revision
+HEADING_MATCH_THRESHOLD = 0.5
+
+# Text similarity (0-1) at which a bullet counts as a reworded requirement
+# rather than a removed one plus an unrelated addition
+CHANGED_SIMILARITY = 0.5
+
+# Sections the golden standard doesn't have are shown in full up to this length
+MAX_EXTRA_SECTION_CHARS = 2000
+
+
+def _key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _prose(body: str) -> List[str]:
+    """Non-empty lines of a section body that aren't list items."""
+    return [line.strip() for line in body.splitlines() if line.strip() and not BULLET_PATTERN.match(line)]
+
+
+def _similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, _key(a), _key(b)).ratio()
+
+
+@dataclass
+class SectionDiff:
+    """How the document's version of one golden-standard section differs from it."""
+    heading: str
+    level: int
+    document_headings: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    changed: List[Tuple[str, str]] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    prose: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def absent(self) -> bool:
+        """The document has no section for this one."""
+        return not self.document_headings
+
+    @property
+    def has_changes(self) -> bool:
+        return self.absent or bool(self.missing or self.changed or self.extra or self.prose)
+
+    def render(self) -> str:
+        title = f"{'#' * max(self.level, 1)} {self.heading}" if self.heading else "(Text before the first heading)"
+        if self.absent:
+            lines = [f"{title} - MISSING FROM THE DOCUMENT"]
+            lines.extend(f"- {requirement}" for requirement in self.missing)
+            return "\n".join(lines)
+
+        renamed = [h for h in self.document_headings if _key(h) != _key(self.heading)]
+        if renamed:
+            title += " (in the document: " + ", ".join(f'"{h}"' for h in renamed) + ")"
+        lines = [title]
+        lines.extend(f"MISSING: {requirement}" for requirement in self.missing)
+        lines.extend(f'CHANGED: "{before}" -> "{after}"' for before, after in self.changed)
+        lines.extend(f"ADDED: {bullet}" for bullet in self.extra)
+        if self.prose:
+            lines.append("TEXT CHANGES:")
+            lines.extend(self.prose)
+        if self.unchanged:
+            lines.append(f"({self.unchanged} other requirement{'s' if self.unchanged != 1 else ''} unchanged)")
+        return "\n".join(lines)
+
+
+@dataclass
+class DocumentDiff:
+    """
+    Section-level differences between a document and the golden standard.
+
+    ``coverage`` is the share of golden-standard sections the document has a
+    matching section for; a document with high coverage is treated as a
+    revision of the standard and can be judged from the differences alone.
+    """
+    sections: List[SectionDiff]
+    extra_sections: List[Section]
+    coverage: float
+
+    def section(self, heading: str) -> SectionDiff:
+        """The diff of the golden-standard section with this heading."""
+        for section in self.sections:
+            if section.heading == heading:
+                return section
+        raise KeyError(heading)
+
+    @property
+    def identical(self) -> bool:
+        """True if every section and requirement matches (ignoring case and whitespace)."""
+        return not self.extra_sections and not any(s.has_changes for s in self.sections)
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of each kind of difference, for display."""
+        present = [s for s in self.sections if not s.absent]
+        return {
+            "missing": sum(len(s.missing) for s in present),
+            "changed": sum(len(s.changed) for s in present),
+            "added": sum(len(s.extra) for s in present),
+            "missing_sections": sum(s.absent for s in self.sections),
+            "extra_sections": len(self.extra_sections),
+            "unchanged_sections": sum(not s.has_changes for s in self.sections)
+        }
+
+    def render(self) -> str:
+        """The differences as prompt text, with unchanged sections listed by heading only."""
+        parts = [s.render() for s in self.sections if s.has_changes]
+        for section in self.extra_sections:
+            body = section.body
+            if len(body) > MAX_EXTRA_SECTION_CHARS:
+                body = body[:MAX_EXTRA_SECTION_CHARS] + "\n[...]"
+            title = f"{'#' * max(section.level, 1)} {section.heading}" if section.heading else "(Text before the first heading)"
+            parts.append(f"{title} - NOT IN THE GOLDEN STANDARD\n{body}".rstrip())
+
+        unchanged = [s.heading or "(text before the first heading)" for s in self.sections if not s.has_changes]
+        if unchanged:
+            parts.append("UNCHANGED SECTIONS: " + "; ".join(unchanged))
+        return "\n\n".join(parts)
+
+
+def _pair_bullets(section: SectionDiff, golden_bullets: List[str], document_bullets: List[str]):
+    """Sort bullets into unchanged, reworded, missing and added ones."""
+    remaining = list(document_bullets)
+    unmatched = []
+    for bullet in golden_bullets:
+        key = _key(bullet)
+        exact = next((i for i, candidate in enumerate(remaining) if _key(candidate) == key), None)
+        if exact is None:
+            unmatched.append(bullet)
+        else:
+            remaining.pop(exact)
+            section.unchanged += 1
+
+    for bullet in unmatched:
+        scores = [_similarity(bullet, candidate) for candidate in remaining]
+        best = max(range(len(scores)), key=scores.__getitem__) if scores else -1
+        if best >= 0 and scores[best] >= CHANGED_SIMILARITY:
+            section.changed.append((bullet, remaining.pop(best)))
+        else:
+            section.missing.append(bullet)
+    section.extra.extend(remaining)
+
+
+def diff_document(golden: GoldenStandard, document: str) -> DocumentDiff:
+    """
+    Compare a document with the golden standard section by section.
+
+    Document sections are matched to golden sections by heading (the same
+    keyword similarity the chunked evaluation uses, so "Security" revises
+    "Security Requirements"). Within a matched section, list items are
+    paired as unchanged, changed (reworded) or missing, leftovers count as
+    added, and other lines are compared with a line diff.
+
+    Args:
+        golden: The parsed golden standard
+        document: Document text
+
+    Returns:
+        The document's differences from the golden standard
+    """
+    golden_sections = [s for s in golden.sections if s.heading or s.body]
+    keywords = [s.keywords for s in golden_sections]
+    matched: List[List[Section]] = [[] for _ in golden_sections]
+    extra_sections: List[Section] = []
+
+    for section in iter_sections(normalize_text(document)):
+        if section.heading:
+            section_keywords = heading_keywords(section.heading)
+            scores = [heading_similarity(k, section_keywords) for k in keywords]
+        else:
+            scores = [1.0 if not g.heading else 0.0 for g in golden_sections]
+        best = max(range(len(scores)), key=scores.__getitem__) if scores else -1
+        if best >= 0 and scores[best] >= HEADING_MATCH_THRESHOLD:
+            matched[best].append(section)
+        elif section.body:
+            extra_sections.append(section)
+
+    sections = []
+    for golden_section, document_sections in zip(golden_sections, matched):
+        diff = SectionDiff(golden_section.heading, golden_section.level, [s.heading for s in document_sections])
+        golden_bullets = [r.text for r in golden_section.requirements]
+        if not document_sections:
+            diff.missing = golden_bullets
+        else:
+            _pair_bullets(diff, golden_bullets, [b for s in document_sections for b in iter_bullets(s.body)])
+            document_prose = [line for s in document_sections for line in _prose(s.body)]
+            diff.prose = [
+                line for line in difflib.ndiff(_prose(golden_section.body), document_prose)
+                if line.startswith(("- ", "+ "))
+            ]
+        sections.append(diff)
+
+    # Title-only sections (e.g. the document's H1) don't say whether it is a revision
+    substantive = [(s, d) for s, d in zip(golden_sections, sections) if s.body]
+    coverage = sum(not d.absent for _, d in substantive) / len(substantive) if substantive else 0.0
+    return DocumentDiff(sections, extra_sections, coverage)
@@ -0,0 +1,119 @@
+import asyncio
+import math
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+class FakeLLMError(Exception):
+    """Simulated provider failure; carries an HTTP status like the real SDK errors."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Simulated provider error (HTTP {status_code})")
+        self.status_code = status_code
+
+
+class FakeChatModel:
+    """
+    Offline stand-in for a LangChain chat model.
+
+    Responds in the evaluation format after a simulated delay, reports token
+    usage in the same ``response_metadata`` shape as the OpenAI/Groq
+    integrations, and fails a configurable share of calls. Used by the
+    benchmark suite and tests to exercise the service without network access.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        distribution: str = "lognormal",
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        output_tokens: int = 60,
+        pass_rate: float = 0.7,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency: Mean response time in seconds
+            distribution: One of constant, uniform, exponential or lognormal
+            jitter: Spread of the distribution (uniform half-width as a fraction
+                of the mean, or the lognormal sigma)
+            error_rate: Probability (0-1) that a call raises FakeLLMError
+            error_status: HTTP status carried by simulated errors (429 and 5xx are retried)
+            output_tokens: Completion tokens reported per call
+            pass_rate: Probability that the verdict is Pass
+            seed: Seed for reproducible runs
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unsupported latency distribution: {distribution}")
+        self.latency = latency
+        self.distribution = distribution
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.output_tokens = output_tokens
+        self.pass_rate = pass_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    def sample_latency(self) -> float:
+        """Draw one response time from the configured distribution."""
+        if self.latency <= 0:
+            return 0.0
+        if self.distribution == "constant":
+            return self.latency
+        if self.distribution == "uniform":
+            spread = self.latency * min(self.jitter, 1.0)
+            return self._random.uniform(self.latency - spread, self.latency + spread)
+        if self.distribution == "exponential":
+            return self._random.expovariate(1 / self.latency)
+        # lognormal with the requested mean
+        mu = math.log(self.latency) - self.jitter ** 2 / 2
+        return self._random.lognormvariate(mu, self.jitter)
+
+    def _respond(self, messages: List[Any]) -> str:
+        verdict = "Pass" if self._random.random() < self.pass_rate else "Fail"
+        confidence = round(self._random.uniform(0.6, 0.99), 2)
+        # Multi-document prompts number their documents "DOCUMENT n:"
+        count = len(re.findall(r"^DOCUMENT \d+:", str(getattr(messages[-1], "content", "")), re.MULTILINE))
+        if count:
+            return "\n\n".join(
+                f"DOCUMENT: {i}\nVERDICT: {verdict}\nCONFIDENCE: {confidence}\nEXPLANATION: Simulated verdict."
+                for i in range(1, count + 1)
+            )
+        return f"VERDICT: {verdict}\nCONFIDENCE: {confidence}\nEXPLANATION: Simulated verdict."
+
+    def _usage(self, messages: List[Any]) -> Dict[str, Any]:
+        prompt_tokens = sum(len(str(getattr(m, "content", ""))) // 4 for m in messages)
+        return {
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.output_tokens,
+                "total_tokens": prompt_tokens + self.output_tokens
+            },
+            "model_name": "fake"
+        }
+
+    async def _call(self, messages: List[Any]) -> str:
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.sample_latency()))
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError(self.error_status)
+        return self._respond(messages)
+
+    async def ainvoke(self, messages: List[Any], **kwargs) -> AIMessage:
+        content = await self._call(messages)
+        return AIMessage(content=content, response_metadata=self._usage(messages))
+
+    async def astream(self, messages: List[Any], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        content = await self._call(messages)
+        for line in content.splitlines(keepends=True):
+            yield AIMessageChunk(content=line)
@@ -0,0 +1,172 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from chunking import Section, iter_sections
+from tokens import estimate_tokens
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric words, as used by the similarity signals."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def iter_bullets(text: str):
+    """Yield the text of every markdown list item in ``text``."""
+    for line in text.splitlines():
+        match = BULLET_PATTERN.match(line)
+        if match and match.group(1).strip():
+            yield match.group(1).strip()
+
+
+def bullet_tokens(text: str) -> List[List[str]]:
+    """Token lists of the list items in ``text`` (items without words are skipped)."""
+    return [tokens for tokens in (tokenize(bullet) for bullet in iter_bullets(text)) if tokens]
+
+
+def normalize_text(text: str) -> str:
+    """Unify line endings, drop trailing whitespace and collapse runs of blank lines."""
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _slug(heading: str) -> str:
+    return "-".join(tokenize(heading)) or "section"
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """One requirement bullet of the golden standard."""
+    id: str
+    section_id: str
+    text: str
+    tokens: Tuple[str, ...]
+
+
+@dataclass
+class GoldenSection(Section):
+    """A golden-standard section with its id, requirements and token count."""
+    id: str = ""
+    requirements: Tuple[Requirement, ...] = ()
+    token_count: int = 0
+
+
+class GoldenStandard:
+    """
+    A golden standard parsed once and shared by every evaluation against it.
+
+    Holds the normalized text and its content hash, the sections and
+    requirement bullets (with ids that stay the same as long as their text
+    does), token estimates, and the token lists used by the pre-filter.
+    Prompt builders can memoize further artifacts with ``derived``.
+
+    Use ``load_golden_standard`` rather than the constructor so identical
+    content is parsed only once per process.
+    """
+
+    def __init__(self, text: str):
+        self.text = normalize_text(text)
+        self.content_hash = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        self.token_count = estimate_tokens(self.text)
+
+        sections: List[GoldenSection] = []
+        seen_ids: Dict[str, int] = {}
+        for section in iter_sections(self.text):
+            section_id = _slug(section.heading) if section.heading else "preamble"
+            seen_ids[section_id] = seen_ids.get(section_id, 0) + 1
+            if seen_ids[section_id] > 1:
+                section_id = f"{section_id}-{seen_ids[section_id]}"
+
+            requirements = []
+            requirement_ids: Dict[str, int] = {}
+            for bullet in iter_bullets(section.body):
+                digest = hashlib.sha1(f"{section_id}\n{bullet.lower()}".encode("utf-8")).hexdigest()[:8]
+                requirement_ids[digest] = requirement_ids.get(digest, 0) + 1
+                requirement_id = f"{section_id}/{digest}"
+                if requirement_ids[digest] > 1:
+                    requirement_id = f"{requirement_id}-{requirement_ids[digest]}"
+                requirements.append(Requirement(requirement_id, section_id, bullet, tuple(tokenize(bullet))))
+
+            sections.append(GoldenSection(
+                heading=section.heading,
+                level=section.level,
+                body=section.body,
+                id=section_id,
+                requirements=tuple(requirements),
+                token_count=estimate_tokens(section.text)
+            ))
+
+        self.sections: Tuple[GoldenSection, ...] = tuple(sections)
+        self.requirements: Tuple[Requirement, ...] = tuple(r for s in sections for r in s.requirements)
+
+        # Pre-filter inputs, computed once instead of per batch window
+        self.tokens: List[str] = tokenize(self.text)
+        self.bullets: List[List[str]] = [list(r.tokens) for r in self.requirements if r.tokens]
+        self.heading_keywords = [s.keywords for s in sections if s.heading and s.body and s.keywords]
+
+        self._derived: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __repr__(self) -> str:
+        return (
+            f"GoldenStandard({self.content_hash[:12]}, {len(self.sections)} sections, "
+            f"{len(self.requirements)} requirements, ~{self.token_count} tokens)"
+        )
+
+    def section(self, section_id: str) -> GoldenSection:
+        for section in self.sections:
+            if section.id == section_id:
+                return section
+        raise KeyError(section_id)
+
+    def derived(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Return a value computed from this standard, building it on first use."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory()
+            return self._derived[key]
+
+
+_loaded: "OrderedDict[str, GoldenStandard]" = OrderedDict()
+_loaded_lock = threading.Lock()
+MAX_LOADED = 32
+
+
+def load_golden_standard(text: str) -> GoldenStandard:
+    """
+    Parse a golden standard, reusing the parsed object for content seen before.
+
+    Entries are keyed by the content hash of the normalized text, so
+    whitespace-only differences share one entry; the least recently used of
+    more than ``MAX_LOADED`` standards are dropped.
+    """
+    key = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    with _loaded_lock:
+        golden = _loaded.get(key)
+        if golden is not None:
+            _loaded.move_to_end(key)
+            return golden
+
+    golden = GoldenStandard(text)
+    with _loaded_lock:
+        golden = _loaded.setdefault(key, golden)
+        _loaded.move_to_end(key)
+        while len(_loaded) > MAX_LOADED:
+            _loaded.popitem(last=False)
+    return golden
+
+
+def as_golden_standard(golden_standard: Union[str, GoldenStandard]) -> GoldenStandard:
+    """Accept either raw text or an already parsed GoldenStandard."""
+    if isinstance(golden_standard, GoldenStandard):
+        return golden_standard
+    return load_golden_standard(golden_standard)
@@ -0,0 +1,181 @@
+import codecs
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+# Read size for incremental decoding; large enough to amortise call overhead
+CHUNK_SIZE = 64 * 1024
+
+OVERSIZE_POLICIES = ("reject", "truncate")
+
+# Byte-order marks, longest first so UTF-32 isn't mistaken for UTF-16
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Decodes any byte sequence, so it is the last resort
+FALLBACK_ENCODING = "latin-1"
+
+
+class DocumentTooLarge(ValueError):
+    """Raised for inputs above the size limit when the policy is ``reject``."""
+
+    def __init__(self, name: str, size: Optional[int], max_bytes: int):
+        if size is None:
+            super().__init__(f"{name} is above the {max_bytes:,} byte limit")
+        else:
+            super().__init__(f"{name} is {size:,} bytes, above the {max_bytes:,} byte limit")
+        self.name = name
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class IngestedText:
+    """Decoded text of one input, with how it was read."""
+    name: str
+    text: str
+    encoding: str
+    size_bytes: int
+    truncated: bool = False
+
+
+def sniff_encoding(head: bytes) -> str:
+    """
+    Guess the encoding from the first chunk of a file.
+
+    A byte-order mark wins; otherwise UTF-8 if the chunk decodes as UTF-8
+    (an incomplete sequence cut off at the end is fine), else latin-1.
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def _decode(stream: BinaryIO, encoding: str, head: bytes, limit: Optional[int], chunk_size: int) -> Tuple[str, int, bool]:
+    """Decode ``head`` plus the rest of ``stream`` chunk by chunk, stopping after ``limit`` bytes."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts: List[str] = []
+    read = 0
+    chunk = head
+    while chunk:
+        if limit is not None and read + len(chunk) > limit:
+            # Keep what fits; a character split at the cut is dropped by the decoder
+            parts.append(decoder.decode(chunk[:limit - read], final=False))
+            return "".join(parts), limit, True
+        read += len(chunk)
+        parts.append(decoder.decode(chunk, final=False))
+        chunk = stream.read(chunk_size)
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), read, False
+
+
+def read_stream(
+    stream: BinaryIO,
+    name: str,
+    size: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    policy: str = "reject",
+    chunk_size: int = CHUNK_SIZE
+) -> IngestedText:
+    """
+    Read and decode a binary stream incrementally.
+
+    The encoding is detected from the first chunk and the rest is decoded as
+    it is read, so no full copy of the raw bytes is ever held. If a file that
+    looked like UTF-8 turns out not to be, it is re-read once as latin-1
+    (which requires a seekable stream).
+
+    Args:
+        stream: Binary file-like object positioned at the start
+        name: Name used in errors
+        size: Total size in bytes if known, so oversized inputs are rejected
+            before anything is read
+        max_bytes: Size limit in bytes (None or 0 for no limit)
+        policy: ``reject`` raises DocumentTooLarge over the limit;
+            ``truncate`` keeps the first ``max_bytes`` bytes
+        chunk_size: Bytes read per step
+
+    Returns:
+        The decoded text and how it was read
+
+    Raises:
+        DocumentTooLarge: If the input is over the limit and the policy is ``reject``
+    """
+    if policy not in OVERSIZE_POLICIES:
+        raise ValueError(f"Unsupported oversize policy: {policy}")
+    max_bytes = max_bytes or None
+    if max_bytes is not None and size is not None and size > max_bytes and policy == "reject":
+        raise DocumentTooLarge(name, size, max_bytes)
+
+    head = stream.read(chunk_size)
+    encoding = sniff_encoding(head)
+    try:
+        text, read, truncated = _decode(stream, encoding, head, max_bytes, chunk_size)
+    except UnicodeDecodeError:
+        stream.seek(0)
+        encoding = FALLBACK_ENCODING
+        text, read, truncated = _decode(stream, encoding, stream.read(chunk_size), max_bytes, chunk_size)
+
+    if truncated and max_bytes is not None and policy == "reject":
+        # Streams of unknown size are only found to be too large part-way through
+        raise DocumentTooLarge(name, size, max_bytes)
+    return IngestedText(name, text, encoding, size if size is not None else read, truncated)
+
+
+def read_path(path: str, max_bytes: Optional[int] = None, policy: str = "reject") -> IngestedText:
+    """Read a file from disk with ``read_stream``, checking its size before opening it."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return read_stream(f, path, size=size, max_bytes=max_bytes, policy=policy)
+
+
+def read_upload(upload, max_bytes: Optional[int] = None, policy: str = "reject") -> IngestedText:
+    """
+    Read a Streamlit ``UploadedFile`` (or any named binary file-like object).
+
+    The upload is read through its file interface instead of ``getvalue()``,
+    which would copy the whole payload first.
+    """
+    upload.seek(0)
+    return read_stream(upload, upload.name, size=getattr(upload, "size", None), max_bytes=max_bytes, policy=policy)
+
+
+def iter_uploads(
+    uploads: Iterable,
+    max_bytes: Optional[int] = None,
+    policy: str = "reject",
+    skipped: Optional[List[Tuple[str, str]]] = None,
+    truncated: Optional[List[str]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily yield (name, text) for uploads, decoding each only when it is pulled.
+
+    Paired with ``LLMService.evaluate_batch``, at most the in-flight documents
+    are decoded at any time. Oversized, unreadable and empty uploads are
+    skipped and reported as (name, reason) in ``skipped``; the names of
+    truncated uploads are added to ``truncated``.
+    """
+    for upload in uploads:
+        try:
+            document = read_upload(upload, max_bytes, policy)
+        except (DocumentTooLarge, OSError) as e:
+            if skipped is not None:
+                skipped.append((upload.name, str(e)))
+            continue
+        if not document.text.strip():
+            if skipped is not None:
+                skipped.append((upload.name, "empty file"))
+            continue
+        if document.truncated and truncated is not None:
+            truncated.append(document.name)
+        yield document.name, document.text
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import config
+from client_pool import AsyncRunner, get_runner
+
+# Job lifecycle: queued -> running -> completed | failed
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobStore:
+    """SQLite persistence for jobs and their per-document results."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                golden_standard TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint, status);
+            CREATE TABLE IF NOT EXISTS job_documents (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                content TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, position)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def create_job(
+        self,
+        fingerprint: str,
+        golden_standard: str,
+        documents: List[Tuple[str, str]],
+        settings: Dict[str, Any]
+    ) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, fingerprint, status, settings, golden_standard, total, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, fingerprint, json.dumps(settings), golden_standard, len(documents), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_documents (job_id, position, name, content, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, i, name, content, now) for i, (name, content) in enumerate(documents)]
+            )
+            self._conn.commit()
+        return job_id
+
+    def find_active(self, fingerprint: str) -> Optional[str]:
+        """Id of a queued or running job with the same inputs, if there is one."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE fingerprint = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (fingerprint, *ACTIVE_STATUSES)
+            ).fetchone()
+        return row["id"] if row else None
+
+    def active_job_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, settings, total, completed, failed, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        jobs = (self.get_job(row["id"]) for row in rows)
+        return [job for job in jobs if job is not None]
+
+    def golden_standard(self, job_id: str) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT golden_standard FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["golden_standard"]
+
+    def pending_documents(self, job_id: str) -> List[Tuple[int, str, str]]:
+        """(position, name, content) of documents that still need a result."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT position, name, content FROM job_documents "
+                "WHERE job_id = ? AND status = 'pending' ORDER BY position",
+                (job_id,)
+            ).fetchall()
+        return [(row["position"], row["name"], row["content"]) for row in rows]
+
+    def results(self, job_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """(name, result) for every finished document, in submission order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, result FROM job_documents "
+                "WHERE job_id = ? AND status != 'pending' ORDER BY position",
+                (job_id,)
+            ).fetchall()
+        return [(row["name"], json.loads(row["result"])) for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def record_result(self, job_id: str, position: int, result: Dict[str, Any]):
+        """Store one document's result and bump the job's progress counters."""
+        status = "done" if result.get("success") else "error"
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_documents SET status = ?, result = ?, updated_at = ? WHERE job_id = ? AND position = ?",
+                (status, json.dumps(result), now, job_id, position)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET completed = completed + 1, failed = failed + ?, updated_at = ? WHERE id = ?",
+                (0 if status == "done" else 1, now, job_id)
+            )
+            self._conn.commit()
+
+
+class _PositionedName(str):
+    """A document name that also remembers the document's position in its job."""
+
+    position: int
+
+    def __new__(cls, name: str, position: int):
+        instance = super().__new__(cls, name)
+        instance.position = position
+        return instance
+
+
+def job_fingerprint(golden_standard: str, documents: List[Tuple[str, str]], settings: Dict[str, Any]) -> str:
+    """Hash of everything that determines a job's results, used to spot duplicate submissions."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    digest.update(golden_standard.encode("utf-8"))
+    for name, content in documents:
+        digest.update(b"\0" + name.encode("utf-8") + b"\0" + content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class JobManager:
+    """
+    Runs evaluation batches in the background, independently of any browser session.
+
+    Submitted jobs are persisted before they run, executed by a small pool
+    of worker threads on the shared event loop, and record each document's
+    result as it completes. Jobs still queued or running when the process
+    stops are picked up again on the next start.
+    """
+
+    def __init__(self, store: JobStore, service, workers: int = 2, runner: Optional[AsyncRunner] = None):
+        self.store = store
+        self.service = service
+        self.runner = runner or get_runner()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+
+        for job_id in store.active_job_ids():
+            self._queue.put(job_id)
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"docu-judge-job-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, golden_standard: str, documents: List[Tuple[str, str]], settings: Dict[str, Any]) -> str:
+        """
+        Queue a batch for evaluation.
+
+        Args:
+            golden_standard: The golden standard content
+            documents: List of (name, content) pairs
+            settings: Model and batch settings (provider, model, temperature,
+                max_tokens, cascade_model, max_concurrency, documents_per_call)
+                and the evaluation flags in ``llm_service.SETTINGS_FLAGS``; API
+                keys are read from the environment when the job runs, never stored
+
+        Returns:
+            The job id; an identical queued or running job is reused rather
+            than evaluated twice
+        """
+        fingerprint = job_fingerprint(golden_standard, documents, settings)
+        existing = self.store.find_active(fingerprint)
+        if existing is not None:
+            return existing
+
+        job_id = self.store.create_job(fingerprint, golden_standard, documents, settings)
+        self._queue.put(job_id)
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                self.store.set_status(job_id, "failed", error=str(e))
+
+    def _run(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return
+
+        # Each job gets its own service, so changes made in the UI while it's
+        # queued or running don't switch its model or evaluation flags
+        settings = job["settings"]
+        service = self.service.with_settings(settings)
+
+        self.store.set_status(job_id, "running")
+        self.runner.run(self._evaluate(service, job_id, settings))
+        self.store.set_status(job_id, "completed")
+
+    async def _evaluate(self, service, job_id: str, settings: Dict[str, Any]):
+        # The runner loop is shared with every session, so the job store is used from the executor
+        loop = asyncio.get_running_loop()
+        golden_standard = await loop.run_in_executor(None, self.store.golden_standard, job_id)
+        pending = await loop.run_in_executor(None, self.store.pending_documents, job_id)
+        # Names carry their position, so documents uploaded under the same name stay apart
+        documents = ((_PositionedName(name, position), content) for position, name, content in pending)
+
+        async for name, result in service.evaluate_batch(
+            golden_standard,
+            documents,
+            max_concurrency=settings.get("max_concurrency"),
+            documents_per_call=settings.get("documents_per_call")
+        ):
+            await loop.run_in_executor(None, self.store.record_result, job_id, name.position, result)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = 0.05) -> Optional[Dict[str, Any]]:
+        """Block until a job leaves the active states (mainly for scripts and tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.store.get_job(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds")
+            time.sleep(poll_interval)
+
+
+def build_job_manager(service) -> JobManager:
+    """Create the job manager described by the application config."""
+    return JobManager(JobStore(config.jobs_db_path), service, workers=config.job_workers)
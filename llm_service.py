@@ -1,144 +1,1669 @@
-from typing import Dict, Any, List, Optional
-from langchain.schema import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
-from config import config, LLMProvider
+import asyncio
+import copy
+import sys
+import time
+import warnings
+from collections import Counter, deque
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, AsyncContextManager, Dict, Any, Callable, List, Optional, Iterable, Iterator, Set, Tuple, AsyncIterator, Union
+from config import Config, config, LLMProvider, REPLAY_API_KEY
+from client_pool import client_pool
+from cache import ResultCache, build_cache, make_cache_key
+from result_store import ResultStore, build_result_store, document_hash
+from chunking import iter_sections, match_sections
+from diffing import DocumentDiff, diff_document
+from rate_limiter import get_limiter, is_retryable
+from router import Router, build_router, should_fail_over
+from metrics import estimate_cost, evaluation_metrics
+from golden import GoldenStandard, as_golden_standard
+from tokens import (
+    EXPECTED_OUTPUT_TOKENS, ContextWindowExceeded, TokenBudget, compress_text, context_window, estimate_tokens
+)
+from parsing import (
+    VERDICTS, evaluation_schema, from_structured, parse_evaluation, parse_multi_evaluation,
+    tool_call_arguments, validate_evaluation
+)
 import os
 
+if TYPE_CHECKING:
+    from langchain_core.messages import SystemMessage
+    from retrieval import Evidence
+
+# Bump whenever the prompt template or response parsing changes so cached
+# verdicts produced by an older prompt are not reused.
+PROMPT_VERSION = "3"
+
+SYSTEM_PROMPT = """You are a judge and your task is to evaluate documents based on the provided golden standard.
+Analyze the content thoroughly and provide a verdict with confidence score.
+"""
+
+RESPONSE_FORMAT = """For each document, please provide:
+1. A verdict (Pass/Fail) based on the document's alignment with the golden standard
+2. A confidence score between 0 and 1 (1 being most confident)
+3. A brief explanation for your verdict
+
+Format your response as:
+VERDICT: [Pass/Fail]
+CONFIDENCE: [0-1]
+EXPLANATION: [Your explanation]"""
+
+DIFF_SYSTEM_PROMPT = """You are a judge and your task is to evaluate a revised document against the golden standard it was derived from.
+You are shown only how the document differs from the golden standard, section by section; anything not listed matches it exactly.
+Decide whether the document still satisfies the golden standard and provide a verdict with confidence score.
+"""
+
+RETRIEVAL_INSTRUCTIONS = """The document is too long to show in full. Below are the passages retrieved as most relevant to each requirement of the golden standard, followed by which passages were retrieved for which requirement.
+A requirement with no matching passage is most likely not covered by the document. Judge the document from these passages."""
+
+JSON_RESPONSE_FORMAT = """For each document, please provide:
+1. A verdict (Pass/Fail) based on the document's alignment with the golden standard
+2. A confidence score between 0 and 1 (1 being most confident)
+3. A brief explanation for your verdict
+
+Respond with a JSON object with the keys "verdict" ("Pass" or "Fail"),
+"confidence" (a number between 0 and 1) and "explanation" (a string)."""
+
+
+def _system_message(content: str) -> "SystemMessage":
+    # LangChain's message classes are imported on first use to keep start-up fast
+    from langchain_core.messages import SystemMessage
+    return SystemMessage(content=content)
+
+
+def _human_message(content: str):
+    from langchain_core.messages import HumanMessage
+    return HumanMessage(content=content)
+
+
+# Room left in a shared call's prompt for its instructions and per-document headers
+MULTI_DOC_OVERHEAD_TOKENS = 64
+
+# Evaluation settings a background job fixes when it's submitted (see LLMService.with_settings)
+SETTINGS_FLAGS = (
+    "diff_mode", "retrieval_enabled", "consistency_samples", "prefilter_enabled", "cascade_threshold"
+)
+
+
 class LLMService:
+    """
+    Evaluates documents against golden standards with the configured LLM.
+    
+    Constructing the service is cheap: the chat models (and the provider SDKs
+    behind them) are created on first use, so importing this module or
+    starting the app doesn't wait on, or require, provider clients.
+    """
+    
     _instance = None
+    config: Config
+    current_config: Dict[str, Any]
+    cache: Optional[ResultCache]
+    store: Optional[ResultStore]
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LLMService, cls).__new__(cls)
-            cls._instance.llm = None
+            cls._instance.config = config
             cls._instance.current_config = {
                 "provider": config.llm_provider,
                 "model": config.llm_model,
                 "temperature": config.temperature,
                 "max_tokens": config.max_tokens,
-                "api_key": os.getenv("OPENAI_API_KEY") if config.llm_provider == LLMProvider.OPENAI else os.getenv("GROQ_API_KEY")
+                "api_key": os.getenv("OPENAI_API_KEY") if config.llm_provider == LLMProvider.OPENAI else os.getenv("GROQ_API_KEY"),
+                "cascade_model": config.cascade_model
             }
+            cls._instance.cache = build_cache(config)
+            cls._instance.store = build_result_store(config)
         return cls._instance
     
-    def __init__(self):
-        if not hasattr(self, 'initialized'):
-            self.llm = self._initialize_llm()
-            self.initialized = True
+    @cached_property
+    def llm(self):
+        """The chat model for the current config, created on first use."""
+        return self._initialize_llm()
+    
+    @cached_property
+    def cascade_llm(self):
+        """The cascade's first-pass model (None when the cascade is off), created on first use."""
+        return self._initialize_cascade_llm()
+    
+    @cached_property
+    def router(self) -> Optional[Router]:
+        """The multi-backend router (None without ``LLM_BACKENDS``), created on first use."""
+        return self._initialize_router()
     
-    def update_config(self, provider: str, model: str, temperature: float, max_tokens: int, api_key: str):
-        """Update the LLM configuration and reinitialize if needed."""
+    def update_config(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        api_key: Optional[str],
+        cascade_model: Optional[str] = None
+    ):
+        """
+        Update the LLM configuration and reinitialize if needed.
+        
+        ``cascade_model`` enables the model cascade: documents are judged by
+        that (cheaper) model first and only re-judged by ``model`` when the
+        first verdict is missing or below ``config.cascade_threshold``.
+        A missing ``api_key`` only fails once a client is needed, so routed
+        and replayed runs can be configured without one.
+        """
         new_config = {
             "provider": provider,
             "model": model,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "api_key": api_key
+            "api_key": api_key,
+            "cascade_model": cascade_model or None
         }
         
         # Only reinitialize if config has changed
         if new_config != self.current_config:
             self.current_config = new_config
-            self.llm = self._initialize_llm()
+            # Clients for the new settings are created when next needed
+            for name in ("llm", "cascade_llm", "router"):
+                self.__dict__.pop(name, None)
+    
+    def with_settings(self, settings: Dict[str, Any]) -> "LLMService":
+        """
+        A separate service for the given model settings and feature flags.
+        
+        The new service has its own copy of the configuration, so a background
+        job keeps the model and flags (``SETTINGS_FLAGS``) it was submitted
+        with even when the UI changes them while it runs. Flags missing from
+        ``settings`` keep their current values. The result cache, result
+        store and pooled clients are shared.
+        
+        Args:
+            settings: provider, model, temperature, max_tokens and
+                cascade_model, plus any of ``SETTINGS_FLAGS``; the API key is
+                read from the environment
+        """
+        service = super(LLMService, LLMService).__new__(LLMService)
+        service.config = copy.copy(self.config)
+        for name in SETTINGS_FLAGS:
+            if settings.get(name) is not None:
+                setattr(service.config, name, settings[name])
+        service.cache = self.cache
+        service.store = self.store
+        
+        provider = settings["provider"]
+        service.current_config = {}
+        service.update_config(
+            provider=provider,
+            model=settings["model"],
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            api_key=os.getenv("OPENAI_API_KEY") if provider == LLMProvider.OPENAI else os.getenv("GROQ_API_KEY"),
+            cascade_model=settings.get("cascade_model")
+        )
+        return service
     
     def _initialize_llm(self):
-        """Initialize the LLM based on the current config."""
+        """Get the LLM for the current config from the shared client pool."""
         provider = self.current_config["provider"]
-        model = self.current_config["model"]
-        temperature = self.current_config["temperature"]
-        max_tokens = self.current_config["max_tokens"]
-        api_key = self.current_config["api_key"]
+        api_key = self._api_key()
         
         if not api_key:
             raise ValueError(f"API key not configured for provider: {provider}")
         
-        if provider == LLMProvider.OPENAI:
-            return ChatOpenAI(
-                model_name=model,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                api_key=api_key
-            )
-        elif provider == LLMProvider.GROQ:
-            return ChatGroq(
-                model_name=model,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                groq_api_key=api_key
-            )
-        else:
+        if provider not in [p.value for p in LLMProvider]:
             raise ValueError(f"Unsupported LLM provider: {provider}")
+        
+        return client_pool.get_llm(
+            provider=provider,
+            model=self.current_config["model"],
+            temperature=self.current_config["temperature"],
+            max_tokens=self.current_config["max_tokens"],
+            api_key=api_key
+        )
     
-    async def evaluate_document(self, golden_standard: str, document: str) -> Dict[str, Any]:
+    def _initialize_cascade_llm(self):
+        """Get the first-pass model of the cascade, or None when the cascade is off."""
+        cascade_model = self.current_config.get("cascade_model")
+        if not cascade_model or cascade_model == self.current_config["model"]:
+            return None
+        
+        return client_pool.get_llm(
+            provider=self.current_config["provider"],
+            model=cascade_model,
+            temperature=self.current_config["temperature"],
+            max_tokens=self.current_config["max_tokens"],
+            api_key=self._api_key()
+        )
+    
+    def _api_key(self) -> Optional[str]:
+        """The configured API key; replayed runs never reach the provider, so they don't need one."""
+        if not self.current_config["api_key"] and self.config.llm_transport == "replay":
+            return REPLAY_API_KEY
+        return self.current_config["api_key"]
+    
+    def _initialize_router(self) -> Optional[Router]:
+        """
+        Route calls over the ``LLM_BACKENDS`` when configured, else None.
+        
+        The backends replace the single provider and model for every call
+        except the cascade's first pass.
+        """
+        if not self.config.llm_backends:
+            return None
+        
+        return build_router(
+            self.config.llm_backends,
+            strategy=self.config.routing_strategy,
+            temperature=self.current_config["temperature"],
+            max_tokens=self.current_config["max_tokens"],
+            max_retries=self.config.llm_max_retries,
+            base_delay=self.config.retry_base_delay,
+            max_delay=self.config.retry_max_delay
+        )
+    
+    def _structured_llm(self, llm=None):
+        """
+        Return a runnable producing schema-validated output, or None to parse text.
+        
+        Structured output is only available on LangChain chat models; anything
+        else (including test doubles) goes through the text parser.
+        """
+        llm = llm or self.llm
+        mode = self.config.output_mode
+        # No LangChain chat model can exist before its base class module is loaded
+        if mode == "text" or "langchain_core.language_models.chat_models" not in sys.modules:
+            return None
+        from langchain_core.language_models.chat_models import BaseChatModel
+        if not isinstance(llm, BaseChatModel):
+            return None
+        
+        # One runnable per model, so the cascade's two tiers don't rebuild each other's
+        structured = self.__dict__.setdefault("_structured", {})
+        cached = structured.get(id(llm))
+        if cached is None or cached[0] is not llm or cached[1] != mode:
+            from langchain_core._api import LangChainBetaWarning
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", LangChainBetaWarning)
+                runnable = llm.with_structured_output(evaluation_schema(), method=mode, include_raw=True)
+            cached = structured[id(llm)] = (llm, mode, runnable)
+        return cached[2]
+    
+    def _cache_key(self, golden: GoldenStandard, document: str, variant: str = "") -> str:
+        """Build the result cache key for a document under the current LLM self.config."""
+        if self.cascade_llm is not None:
+            # A cascaded verdict depends on the first-pass model and when it escalates
+            variant += f"-cascade:{self.current_config['cascade_model']}@{self.config.cascade_threshold:g}"
+        if self.router is not None:
+            # Any of the routed models may answer, so they all identify the result
+            variant += "-routed:" + ",".join(sorted({f"{b.provider}/{b.model}" for b in self.router.backends}))
+        return make_cache_key(
+            golden.content_hash,
+            document,
+            provider=self.current_config["provider"],
+            model=self.current_config["model"],
+            temperature=self.current_config["temperature"],
+            prompt_version=(
+                PROMPT_VERSION + variant + ("-diff" if self.config.diff_mode else "")
+                + self._voting_variant() + self._retrieval_variant()
+            )
+        )
+    
+    def _retrieval_variant(self) -> str:
+        """Retrieval settings as a cache-key suffix; empty when retrieval is off."""
+        if not self.config.retrieval_enabled:
+            return ""
+        return f"-retrieval:{self.config.retrieval_top_k}/{self.config.retrieval_passage_chars}@{self.config.retrieval_min_chars}"
+    
+    def _voting_variant(self) -> str:
+        """Self-consistency settings as a cache-key suffix; empty with single samples."""
+        if self.config.consistency_samples <= 1:
+            return ""
+        return f"-vote:{self.config.consistency_samples}@{self.config.consistency_threshold:g}"
+    
+    def _result_settings(self) -> Dict[str, Any]:
+        """Settings that decide a verdict, identifying results in the result store."""
+        settings = {
+            "provider": LLMProvider(self.current_config["provider"]).value,
+            "model": self.current_config["model"],
+            "temperature": self.current_config["temperature"],
+            "prompt_version": PROMPT_VERSION
+        }
+        if self.cascade_llm is not None:
+            settings["cascade"] = f"{self.current_config['cascade_model']}@{self.config.cascade_threshold:g}"
+        if self.router is not None:
+            settings["backends"] = sorted({f"{b.provider}/{b.model}" for b in self.router.backends})
+        if self.config.prefilter_enabled:
+            settings["prefilter"] = [self.config.prefilter_pass_threshold, self.config.prefilter_fail_threshold]
+        if self.config.diff_mode:
+            settings["diff"] = self.config.diff_min_coverage
+        if self.config.consistency_samples > 1:
+            settings["consistency"] = [self.config.consistency_samples, self.config.consistency_threshold]
+        if self.config.retrieval_enabled:
+            settings["retrieval"] = [self.config.retrieval_top_k, self.config.retrieval_passage_chars, self.config.retrieval_min_chars]
+        return settings
+    
+    async def evaluate_document(self, golden_standard: Union[str, GoldenStandard], document: str) -> Dict[str, Any]:
         """
         Evaluate a document against the golden standard using the configured LLM.
         
+        Results are served from the result cache when the same golden standard,
+        document, model settings and prompt version have been evaluated before.
+        With retrieval enabled, long documents are judged from the passages
+        most similar to each requirement rather than their full text.
+        
         Args:
-            golden_standard: The golden standard content
+            golden_standard: The golden standard text or a parsed GoldenStandard
             document: The document content to evaluate
             
         Returns:
             Dict containing the evaluation results
         """
-        system_prompt = """You are a judge and your task is to evaluate documents based on the provided golden standard.
-        Analyze the content thoroughly and provide a verdict with confidence score.
+        golden = as_golden_standard(golden_standard)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(golden, document)
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return self._record({**cached, "cached": True})
+        
+        plan = await self._plan(golden, document)
+        result = plan.annotate(await self._execute(golden, plan))
+        
+        await self._store_result(cache_key, result)
+        return self._record({**result, "cached": False})
+    
+    async def stream_evaluate_document(
+        self,
+        golden_standard: Union[str, GoldenStandard],
+        document: str
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
+        Evaluate a document, yielding partial results while the response streams in.
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"""
-            GOLDEN STANDARD:
-            {golden_standard}
+        A partial update (``partial: True``) is yielded whenever a complete
+        VERDICT or CONFIDENCE line arrives, so callers can show the verdict
+        before the explanation has finished. The last item is the final
+        result, with the same shape as ``evaluate_document``. Cached,
+        cascaded, voted, diff-based, retrieval-based and section-by-section
+        evaluations yield only the final result.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            document: The document content to evaluate
             
-            DOCUMENT TO EVALUATE:
-            {document}
+        Yields:
+            Partial result dicts followed by the final result dict
+        """
+        golden = as_golden_standard(golden_standard)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(golden, document)
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                yield self._record({**cached, "cached": True})
+                return
+        
+        plan = await self._plan(golden, document)
+        result: Optional[Dict[str, Any]] = None
+        # A cascade's first-pass verdict or a vote's first sample may still be overturned, so neither is streamed out
+        if plan.route != "single" or self.cascade_llm is not None or self.config.consistency_samples > 1:
+            result = await self._execute(golden, plan)
+        else:
+            async for update in self._stream_with_llm(golden, plan.document):
+                if update.get("partial"):
+                    yield update
+                else:
+                    result = update
+        if result is None:
+            result = self._error_result("The evaluation stream ended without a result")
+        result = plan.annotate(result)
+        
+        await self._store_result(cache_key, result)
+        yield self._record({**result, "cached": False})
+    
+    async def _plan(self, golden: GoldenStandard, document: str) -> "_Plan":
+        """
+        Decide how a document that missed the cache will be evaluated.
+        
+        A revision of an earlier document is judged from its diff, a long one
+        from retrieved passages when retrieval is on, and anything else
+        within the token budget: rejected, sent section by section, or sent
+        in a single call (compressed if it had to be).
+        """
+        diff = self._revision_diff(golden, document)
+        if diff is not None:
+            return _Plan("diff", document, diff=diff)
+        evidence = await self._retrieved_evidence(golden, document)
+        if evidence is not None:
+            return _Plan("retrieved", document, evidence=evidence)
+        
+        budget = self.plan_document(golden, document)
+        if budget.strategy == "reject":
+            route = "reject"
+        elif budget.strategy == "chunk" or len(golden) + len(budget.document) > self.config.chunk_threshold_chars:
+            route = "chunked"
+        else:
+            route = "single"
+        return _Plan(route, budget.document, budget=budget)
+    
+    async def _execute(self, golden: GoldenStandard, plan: "_Plan") -> Dict[str, Any]:
+        """Evaluate a planned document without streaming."""
+        if plan.diff is not None:
+            return await self._evaluate_diff(golden, plan.document, plan.diff)
+        if plan.evidence is not None:
+            return await self._evaluate_retrieved(golden, plan.document, plan.evidence)
+        if plan.budget is not None and plan.route == "reject":
+            return self._error_result(plan.budget.exceeded())
+        if plan.route == "chunked":
+            return await self.evaluate_document_chunked(golden, plan.document)
+        return await self._evaluate_single(golden, plan.document)
+    
+    def _record(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a final per-document result to the process-wide metrics and return it."""
+        evaluation_metrics.record(result, model=result.get("model") or self.current_config["model"])
+        return result
+    
+    def _finish_result(
+        self,
+        result: Dict[str, Any],
+        usage: Dict[str, float],
+        timings: Dict[str, float],
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Validate a freshly parsed result and attach token usage, timings and estimated cost."""
+        validate_evaluation(result)
+        result["usage"] = usage
+        result["timings"] = {key: round(value, 3) for key, value in timings.items()}
+        result["cost_usd"] = estimate_cost(model or self.current_config["model"], usage, self.config.model_pricing)
+        return result
+    
+    async def _store_result(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """Cache a fresh result; errors and parse misses are left to be retried."""
+        if self.cache is not None and cache_key is not None and result["success"] and result["verdict"]:
+            await self.cache.aset(cache_key, result)
+    
+    def _build_prefix(self, golden: GoldenStandard, json_output: bool = False) -> "SystemMessage":
+        """
+        Build the shared leading message for every call against a golden standard.
+        
+        The system prompt, golden standard and response format are kept
+        byte-identical across documents and placed first, so providers with
+        automatic prompt caching can reuse the prefix for the whole batch.
+        JSON mode needs the response format spelled out as JSON; function
+        calling keeps the text format so its prefix matches other calls.
+        The message is built once per golden standard and reused.
+        """
+        return golden.derived(("prefix", json_output), lambda: _system_message(f"""{SYSTEM_PROMPT}
+GOLDEN STANDARD:
+{golden.text}
+
+{JSON_RESPONSE_FORMAT if json_output else RESPONSE_FORMAT}"""))
+    
+    def _build_messages(
+        self,
+        golden: GoldenStandard,
+        document: str,
+        json_output: bool = False,
+        diff: Optional[DocumentDiff] = None,
+        evidence: Optional["Evidence"] = None
+    ) -> List[Any]:
+        """Build the messages for a single-document evaluation, or for judging only ``diff`` or ``evidence``."""
+        if diff is not None:
+            return [
+                _system_message(f"{DIFF_SYSTEM_PROMPT}\n{JSON_RESPONSE_FORMAT if json_output else RESPONSE_FORMAT}"),
+                _human_message(f"DOCUMENT CHANGES AGAINST THE GOLDEN STANDARD:\n{diff.render()}")
+            ]
+        if evidence is not None:
+            # Same prefix as a full evaluation, so prompt caching still applies
+            return [
+                self._build_prefix(golden, json_output),
+                _human_message(f"{RETRIEVAL_INSTRUCTIONS}\n\nDOCUMENT PASSAGES:\n{evidence.render()}")
+            ]
+        return [
+            self._build_prefix(golden, json_output),
+            _human_message(f"DOCUMENT TO EVALUATE:\n{document}")
+        ]
+    
+    async def _evaluate_with_llm(
+        self,
+        golden: GoldenStandard,
+        document: str,
+        llm=None,
+        model: Optional[str] = None,
+        diff: Optional[DocumentDiff] = None,
+        evidence: Optional["Evidence"] = None
+    ) -> Dict[str, Any]:
+        """Run a single uncached evaluation against the LLM (or ``llm``, priced as ``model``)."""
+        try:
+            # Also creates the client on first use, which fails without an API key
+            structured = self._structured_llm(llm) is not None
+            json_output = structured and self.config.output_mode == "json_mode"
+            messages = self._build_messages(golden, document, json_output, diff, evidence)
             
-            Please provide:
-            1. A verdict (Pass/Fail) based on the document's alignment with the golden standard
-            2. A confidence score between 0 and 1 (1 being most confident)
-            3. A brief explanation for your verdict
+            timings: Dict[str, float] = {}
+            route: Dict[str, Any] = {}
+            output = await self._invoke(messages, timings, llm=llm, structured=structured, route=route)
+            if isinstance(output, dict):
+                response = output["raw"]
+                parse_started = time.perf_counter()
+                result = self._parse_structured(output)
+            else:
+                response = output
+                parse_started = time.perf_counter()
+                result = self._parse_response(response.content)
+            timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+            self._finish_result(result, self._extract_usage(response), timings, model or route.get("model"))
+            result.update(route)
+            return result
             
-            Format your response as:
-            VERDICT: [Pass/Fail]
-            CONFIDENCE: [0-1]
-            EXPLANATION: [Your explanation]
-            """)
-        ]
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def _evaluate_single(
+        self,
+        golden: GoldenStandard,
+        document: str,
+        diff: Optional[DocumentDiff] = None,
+        evidence: Optional["Evidence"] = None
+    ) -> Dict[str, Any]:
+        """Judge one document (or section, diff or evidence) with the configured model, or through the cascade."""
+        if self.cascade_llm is None:
+            return await self._evaluate_voted(golden, document, diff, evidence)
         
+        first = await self._evaluate_with_llm(
+            golden, document, self.cascade_llm, self.current_config["cascade_model"], diff=diff, evidence=evidence
+        )
+        return await self._escalate(golden, document, first, diff, evidence)
+    
+    async def _evaluate_voted(
+        self,
+        golden: GoldenStandard,
+        document: str,
+        diff: Optional[DocumentDiff] = None,
+        evidence: Optional["Evidence"] = None
+    ) -> Dict[str, Any]:
+        """
+        Judge with the configured model by self-consistency voting.
+        
+        The first sample is kept on its own when it has a clear verdict with
+        at least ``config.consistency_threshold`` confidence. Otherwise the
+        remaining samples (up to ``config.consistency_samples`` in all) are
+        drawn in parallel, and the calls still running are cancelled as soon
+        as one verdict has a majority of all the samples. With a single
+        sample configured this is one plain call.
+        """
+        samples = [await self._evaluate_with_llm(golden, document, diff=diff, evidence=evidence)]
+        total = self.config.consistency_samples
+        if total <= 1:
+            return samples[0]
+        if self._escalation_reason(samples[0]) is None and samples[0]["confidence"] >= self.config.consistency_threshold:
+            return self._vote(samples)
+        
+        majority = total // 2 + 1
+        pending = [
+            asyncio.ensure_future(self._evaluate_with_llm(golden, document, diff=diff, evidence=evidence))
+            for _ in range(total - 1)
+        ]
         try:
-            response = await self.llm.ainvoke(messages)
-            
-            # Parse the response
+            for next_sample in asyncio.as_completed(pending):
+                samples.append(await next_sample)
+                votes = Counter(s["verdict"] for s in samples if s["success"] and s["verdict"] in VERDICTS)
+                if votes and max(votes.values()) >= majority:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._vote(samples)
+    
+    def _vote(self, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine self-consistency samples into one result by majority vote.
+        
+        The confidence is the winning samples' mean confidence scaled by the
+        share of samples that agree with them, so a split vote is reported as
+        less certain than a unanimous one. Ties go to the verdict with the
+        higher total confidence. The result carries the combined usage and
+        cost of every sample, plus ``samples``, ``votes`` and ``agreement``.
+        """
+        usage, timings, cost = self._combine_costs(samples)
+        valid = [s for s in samples if s["success"] and s["verdict"] in VERDICTS]
+        votes = Counter(s["verdict"] for s in valid)
+        if not valid:
+            return {
+                **samples[0], "usage": usage, "timings": timings, "cost_usd": cost,
+                "samples": len(samples), "votes": {}, "agreement": 0.0
+            }
+        
+        winner = max(votes, key=lambda verdict: (votes[verdict], sum(s["confidence"] for s in valid if s["verdict"] == verdict)))
+        agreeing = [s for s in valid if s["verdict"] == winner]
+        agreement = len(agreeing) / len(valid)
+        confidence = sum(s["confidence"] for s in agreeing) / len(agreeing) * agreement
+        return {
+            **max(agreeing, key=lambda s: s["confidence"]),
+            "confidence": round(confidence, 3),
+            "usage": usage,
+            "timings": timings,
+            "cost_usd": cost,
+            "samples": len(samples),
+            "votes": dict(votes),
+            "agreement": round(agreement, 3)
+        }
+    
+    def _revision_diff(self, golden: GoldenStandard, document: str) -> Optional[DocumentDiff]:
+        """
+        The document's differences from the golden standard, if it should be judged on them alone.
+        
+        Only in diff mode, and only for revisions: documents with a section
+        for at least ``config.diff_min_coverage`` of the standard's sections
+        whose differences are shorter than the texts they replace.
+        """
+        if not self.config.diff_mode:
+            return None
+        diff = diff_document(golden, document)
+        if diff.coverage < self.config.diff_min_coverage:
+            return None
+        if not diff.identical and len(diff.render()) >= len(golden) + len(document):
+            return None
+        return diff
+    
+    async def _evaluate_diff(self, golden: GoldenStandard, document: str, diff: DocumentDiff) -> Dict[str, Any]:
+        """Judge a revision from its differences; one without any passes without an LLM call."""
+        if diff.identical:
             result = {
-                "verdict": "",
-                "confidence": 0.0,
-                "explanation": "",
+                "verdict": "Pass",
+                "confidence": 1.0,
+                "explanation": "The document matches the golden standard section by section.",
                 "success": True,
-                "error": None
+                "error": None,
+                "usage": {},
+                "timings": {},
+                "cost_usd": 0.0
             }
+        else:
+            result = await self._evaluate_single(golden, document, diff)
+        return {**result, "method": "diff", "diff": diff.summary()}
+    
+    async def _retrieved_evidence(self, golden: GoldenStandard, document: str) -> Optional["Evidence"]:
+        """
+        The passages of a long document most relevant to each requirement, if it should be judged on them.
+        
+        Only with retrieval enabled, for documents of at least
+        ``config.retrieval_min_chars`` against a golden standard with
+        requirement bullets, and only when the retrieved passages are
+        shorter than the document itself.
+        """
+        if not self.config.retrieval_enabled or len(document) < self.config.retrieval_min_chars or not golden.requirements:
+            return None
+        # numpy is only imported when retrieval is used
+        from retrieval import retrieve
+        # Embedding a long document takes a while; keep the event loop free for other calls
+        evidence = await asyncio.get_running_loop().run_in_executor(
+            None, retrieve, golden, document, self.config.retrieval_top_k, self.config.retrieval_passage_chars
+        )
+        if evidence is None or len(evidence.render()) >= len(document):
+            return None
+        return evidence
+    
+    async def _evaluate_retrieved(self, golden: GoldenStandard, document: str, evidence: "Evidence") -> Dict[str, Any]:
+        """Judge a long document from the passages retrieved for each requirement."""
+        result = await self._evaluate_single(golden, document, evidence=evidence)
+        return {**result, "method": "retrieval", "retrieval": evidence.summary()}
+    
+    def _escalation_reason(self, result: Dict[str, Any]) -> Optional[str]:
+        """Why a first-pass result should be re-judged by the stronger model, or None to keep it."""
+        if not result["success"] or result["verdict"] not in VERDICTS:
+            return "no clear verdict"
+        if result["confidence"] < self.config.cascade_threshold:
+            return "low confidence"
+        return None
+    
+    async def _escalate(
+        self,
+        golden: GoldenStandard,
+        document: str,
+        first: Dict[str, Any],
+        diff: Optional[DocumentDiff] = None,
+        evidence: Optional["Evidence"] = None
+    ) -> Dict[str, Any]:
+        """
+        Finish a cascaded evaluation from the first-pass result.
+        
+        Confident first-pass verdicts are kept; the rest are re-judged by the
+        configured model, whose verdict wins. Either way the result lists
+        every model's result under ``cascade`` and, when re-judged, carries
+        the combined usage, timings and cost of both calls.
+        """
+        stages = [{"model": self.current_config["cascade_model"], **first}]
+        reason = self._escalation_reason(first)
+        if reason is None:
+            return {**first, "model": stages[0]["model"], "escalated": False, "cascade": stages}
+        
+        second = await self._evaluate_voted(golden, document, diff, evidence)
+        stages.append({"model": self.current_config["model"], **second})
+        usage, timings, cost = self._combine_costs(stages)
+        return {
+            **second,
+            "model": stages[-1]["model"],
+            "escalated": True,
+            "escalation_reason": reason,
+            "usage": usage,
+            "timings": timings,
+            "cost_usd": cost,
+            "cascade": stages
+        }
+    
+    def _estimate_request_tokens(self, messages: List[Any]) -> int:
+        """
+        Tokens a request may consume: prompt count plus the output cap.
+        
+        Raises:
+            ContextWindowExceeded: If that is more than the smallest context
+                window among the models the request may go to
+        """
+        estimated = sum(estimate_tokens(m.content) for m in messages) + self.current_config["max_tokens"]
+        window = self._context_window()
+        if window is not None and estimated > window:
+            raise ContextWindowExceeded(estimated, window)
+        return estimated
+    
+    def _context_window(self) -> Optional[int]:
+        """The smallest known context window among the models a call may go to, or None."""
+        if self.router is not None:
+            models = [backend.model for backend in self.router.backends]
+        else:
+            models = [self.current_config["model"]]
+        if self.cascade_llm is not None:
+            models.append(self.current_config["cascade_model"])
+        windows = [window for window in map(context_window, models) if window]
+        return min(windows) if windows else None
+    
+    def _prefix_tokens(self, golden: GoldenStandard) -> int:
+        """Tokens in the shared prompt prefix for the configured model."""
+        model = self.current_config["model"]
+        # Counted without building the message, so projections don't need LangChain
+        return golden.derived(
+            ("prefix_tokens", model),
+            lambda: estimate_tokens(f"{SYSTEM_PROMPT}\nGOLDEN STANDARD:\n{golden.text}\n\n{RESPONSE_FORMAT}", model)
+        )
+    
+    def plan_document(self, golden_standard: Union[str, GoldenStandard], document: str) -> TokenBudget:
+        """
+        Decide how a document will be sent, from its token count, before any call is made.
+        
+        A prompt that fits the model's context window (leaving room for
+        ``max_tokens`` of output) is sent as-is. One that doesn't is sent with
+        whitespace and markdown boilerplate removed if that makes it fit,
+        judged section by section if the golden standard has several
+        sections, and otherwise rejected without a call.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            document: The document content
+            
+        Returns:
+            The chosen strategy, the prompt's token count and the text to send
+        """
+        golden = as_golden_standard(golden_standard)
+        model = self.current_config["model"]
+        window = self._context_window()
+        output_tokens = self.current_config["max_tokens"]
+        prefix_tokens = self._prefix_tokens(golden)
+        
+        def _budget(strategy: str, text: str) -> TokenBudget:
+            tokens = prefix_tokens + estimate_tokens(f"DOCUMENT TO EVALUATE:\n{text}", model)
+            return TokenBudget(strategy, tokens, output_tokens, window, text)
+        
+        budget = _budget("as-is", document)
+        if budget.fits:
+            return budget
+        compressed = _budget("compress", compress_text(document))
+        if compressed.fits:
+            return compressed
+        if sum(1 for section in golden.sections if section.heading) > 1:
+            return TokenBudget("chunk", budget.input_tokens, output_tokens, window, document)
+        return TokenBudget("reject", budget.input_tokens, output_tokens, window, document)
+    
+    def project_batch(
+        self,
+        golden_standard: Union[str, GoldenStandard],
+        documents: Iterable[Tuple[str, str]],
+        documents_per_call: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Project a batch's tokens and cost from ``plan_document``, before evaluating it.
+        
+        Documents are grouped into calls as ``evaluate_batch`` would group
+        them, each answer taking a typical number of tokens; cached,
+        pre-filtered, cascaded and voted evaluations will differ. Rejected
+        documents are counted but not priced. Documents are consumed one at
+        a time, so ``documents`` can be a generator over a large upload.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            documents: (name, content) pairs
+            documents_per_call: Documents judged together in one call
+                (defaults to ``config.documents_per_call``)
+            
+        Returns:
+            Dict with ``documents``, ``calls``, ``input_tokens``,
+            ``output_tokens``, ``cost_usd`` and the number of documents per
+            ``strategies``
+        """
+        golden = as_golden_standard(golden_standard)
+        grouper = _CallGrouper(self, golden, self._group_size(documents_per_call))
+        strategies: Counter = Counter()
+        usage: Dict[str, float] = {"input_tokens": 0, "output_tokens": 0}
+        calls = 0
+        
+        def _count(group: List[Tuple[str, str]], tokens: Optional[int]):
+            nonlocal calls
+            if tokens is None:
+                budget = self.plan_document(golden, group[0][1])
+                strategies[budget.strategy] += 1
+                if budget.strategy == "reject":
+                    return
+                tokens = budget.input_tokens
+            else:
+                strategies["as-is"] += len(group)
+            calls += 1
+            usage["input_tokens"] += tokens
+            usage["output_tokens"] += EXPECTED_OUTPUT_TOKENS * len(group)
+        
+        for name, content in documents:
+            for group, tokens in grouper.add(name, content):
+                _count(group, tokens)
+        for group, tokens in grouper.flush():
+            _count(group, tokens)
+        
+        return {
+            "documents": sum(strategies.values()),
+            "calls": calls,
+            **usage,
+            "cost_usd": estimate_cost(self.current_config["model"], usage, self.config.model_pricing),
+            "strategies": dict(strategies)
+        }
+    
+    async def _invoke(
+        self,
+        messages: List[Any],
+        timings: Optional[Dict[str, float]] = None,
+        llm=None,
+        structured: bool = False,
+        route: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Call the LLM under the provider's rate limiter, retrying transient failures.
+        
+        If ``timings`` is given, ``queue_wait_ms`` (rate-limit waits, failovers
+        and earlier failed attempts) and ``llm_latency_ms`` (the successful
+        attempt) are written into it. ``llm`` replaces the configured chat
+        model, e.g. with the cascade's first pass. With ``structured`` the
+        call goes through the model's structured-output chain, which returns
+        a dict whose ``raw`` message carries the token usage.
+        
+        When routing is configured (and no ``llm`` is given) the call goes to
+        one of the router's backends and fails over to the others; the
+        backend and model that answered are written into ``route``.
+        """
+        estimated = self._estimate_request_tokens(messages)
+        started = time.perf_counter()
+        attempt_started = started
+        
+        def _runnable(model):
+            return (self._structured_llm(model) if structured else None) or model
+        
+        if llm is None and self.router is not None:
+            async def _routed_attempt(backend):
+                nonlocal attempt_started
+                attempt_started = time.perf_counter()
+                return await _runnable(backend.llm).ainvoke(messages)
             
-            for line in response.content.split('\n'):
-                line = line.strip()
-                if line.startswith("VERDICT:"):
-                    result["verdict"] = line.split(":", 1)[1].strip()
-                elif line.startswith("CONFIDENCE:"):
-                    try:
-                        result["confidence"] = float(line.split(":", 1)[1].strip())
-                    except (ValueError, IndexError):
-                        result["confidence"] = 0.0
-                elif line.startswith("EXPLANATION:"):
-                    result["explanation"] = line.split(":", 1)[1].strip()
+            backend, response = await self.router.call(_routed_attempt, estimated)
+            limiter = backend.limiter
+            if route is not None:
+                route.update(backend=backend.name, model=backend.model)
+        else:
+            limiter = get_limiter(self.current_config["provider"])
+            runnable = _runnable(llm or self.llm)
             
-            return result
+            async def _attempt():
+                nonlocal attempt_started
+                attempt_started = time.perf_counter()
+                return await runnable.ainvoke(messages)
             
-        except Exception as e:
-            return {
-                "verdict": "Error",
-                "confidence": 0.0,
-                "explanation": str(e),
-                "success": False,
-                "error": str(e)
-            }
+            response = await limiter.call(_attempt, estimated)
+        
+        if timings is not None:
+            finished = time.perf_counter()
+            timings["queue_wait_ms"] = (attempt_started - started) * 1000
+            timings["llm_latency_ms"] = (finished - attempt_started) * 1000
+        
+        # Return the unused part of the reservation so quota isn't wasted
+        usage = self._extract_usage(response["raw"] if isinstance(response, dict) else response)
+        if usage["input_tokens"]:
+            limiter.refund_tokens(estimated - usage["input_tokens"] - usage["output_tokens"])
+        return response
+    
+    async def _stream_with_llm(self, golden: GoldenStandard, document: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a single uncached evaluation, yielding partials then the final result."""
+        messages = self._build_messages(golden, document)
+        limiter = get_limiter(self.current_config["provider"]) if self.router is None else None
+        estimated = self._estimate_request_tokens(messages)
+        attempt = 0
+        tried: List[str] = []
+        error: Optional[BaseException] = None
+        started = time.perf_counter()
+        
+        while True:
+            aggregate = None
+            last_seen = None
+            backend = None
+            slot: AsyncContextManager[Any]
+            try:
+                if self.router is not None:
+                    backend = self.router.choose(tried)
+                    if backend is None:
+                        # Every backend failed this round: wait for one to recover
+                        await self.router.wait_for_backend(attempt, error)
+                        attempt += 1
+                        tried = []
+                        continue
+                    llm, slot = backend.llm, self.router.use(backend, estimated)
+                else:
+                    llm, slot = self.llm, get_limiter(self.current_config["provider"]).slot(estimated)
+                
+                async with slot:
+                    attempt_started = time.perf_counter()
+                    async for chunk in llm.astream(messages):
+                        aggregate = chunk if aggregate is None else aggregate + chunk
+                        # Only complete lines can be parsed reliably
+                        if "\n" not in chunk.content:
+                            continue
+                        content = aggregate.content
+                        partial = self._parse_response(content[:content.rfind("\n")])
+                        if partial["verdict"] and (partial["verdict"], partial["confidence"]) != last_seen:
+                            last_seen = (partial["verdict"], partial["confidence"])
+                            yield {**partial, "partial": True}
+                break
+                
+            except Exception as e:
+                # Retrying is only safe before anything has been streamed out
+                if aggregate is None and backend is not None and should_fail_over(e):
+                    tried.append(backend.name)
+                    error = e
+                    continue
+                if aggregate is None and limiter is not None and attempt < limiter.max_retries and is_retryable(e):
+                    await limiter.backoff(attempt, e)
+                    attempt += 1
+                    continue
+                yield self._error_result(e)
+                return
+        
+        timings = {
+            "queue_wait_ms": (attempt_started - started) * 1000,
+            "llm_latency_ms": (time.perf_counter() - attempt_started) * 1000
+        }
+        content = aggregate.content if aggregate is not None else ""
+        parse_started = time.perf_counter()
+        result = self._parse_response(content)
+        timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+        
+        model = backend.model if backend else self.current_config["model"]
+        usage = self._extract_usage(aggregate)
+        usage_estimated = not usage["input_tokens"] and not usage["output_tokens"]
+        if usage_estimated:
+            # The OpenAI and Groq integrations don't report usage on streamed
+            # chunks, so count the prompt and the reply ourselves
+            usage["input_tokens"] = sum(estimate_tokens(m.content, model) for m in messages)
+            usage["output_tokens"] = estimate_tokens(content, model)
+        self._finish_result(result, usage, timings, model)
+        if usage_estimated:
+            result["usage_estimated"] = True
+        if backend is not None:
+            result.update(backend=backend.name, model=backend.model)
+        yield result
+    
+    async def evaluate_document_chunked(
+        self,
+        golden_standard: Union[str, GoldenStandard],
+        document: str
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a large document section by section and reduce to one verdict.
+        
+        Both texts are split on markdown headings; each golden-standard section
+        is judged only against the document sections whose headings match it,
+        with the section calls running concurrently. The document passes only
+        if every section passes.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            document: The document content to evaluate
+            
+        Returns:
+            Dict containing the evaluation results, plus a ``sections`` list
+            with the per-section verdicts
+        """
+        golden = as_golden_standard(golden_standard)
+        pairs = match_sections(list(golden.sections), list(iter_sections(document)))
+        if not pairs:
+            return await self._evaluate_single(golden, document)
+        
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        
+        async def _evaluate_section(golden_section, document_sections) -> Dict[str, Any]:
+            if not document_sections:
+                result = {
+                    "verdict": "Fail",
+                    "confidence": 1.0,
+                    "explanation": "No matching section found in the document.",
+                    "success": True,
+                    "error": None
+                }
+            else:
+                async with semaphore:
+                    result = await self._evaluate_single(
+                        golden.derived(("section", golden_section.id), lambda: GoldenStandard(golden_section.text)),
+                        "\n\n".join(section.text for section in document_sections)
+                    )
+            return {"section": golden_section.heading, **result}
+        
+        sections = await asyncio.gather(*(
+            _evaluate_section(golden_section, document_sections)
+            for golden_section, document_sections in pairs
+        ))
+        return self._reduce_sections(list(sections))
+    
+    def _reduce_sections(self, sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-section results into a single document verdict."""
+        failed = [s for s in sections if not s["success"]]
+        if failed:
+            errors = "; ".join(f"{s['section']}: {s['error']}" for s in failed)
+            return {**self._error_result(errors), "sections": sections}
+        
+        failing = [s for s in sections if s["verdict"].lower() != "pass"]
+        if failing:
+            # As sure as the most confident section-level failure
+            verdict = "Fail"
+            confidence = max(s["confidence"] for s in failing)
+        else:
+            # A pass is only as strong as the weakest section
+            verdict = "Pass"
+            confidence = min(s["confidence"] for s in sections)
+        
+        # Section calls overlap, so the timings are totals rather than wall time
+        usage, timings, cost = self._combine_costs(sections)
+        
+        return {
+            "verdict": verdict,
+            "confidence": confidence,
+            "explanation": "; ".join(
+                f"{s['section']}: {s['verdict']} - {s['explanation']}" for s in sections
+            ),
+            "success": True,
+            "error": None,
+            "usage": usage,
+            "timings": timings,
+            "cost_usd": cost,
+            "sections": sections
+        }
+    
+    def _combine_costs(self, results: List[Dict[str, Any]]) -> Tuple[Dict[str, float], Dict[str, float], float]:
+        """Sum the token usage, timings and estimated cost of several LLM results."""
+        usage: Dict[str, float] = {}
+        timings: Dict[str, float] = {}
+        for result in results:
+            for key, value in result.get("usage", {}).items():
+                usage[key] = usage.get(key, 0) + value
+            for key, value in result.get("timings", {}).items():
+                timings[key] = timings.get(key, 0) + value
+        return usage, timings, sum(result.get("cost_usd", 0.0) for result in results)
+    
+    async def evaluate_documents_together(
+        self,
+        golden_standard: Union[str, GoldenStandard],
+        documents: List[Tuple[str, str]]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Judge several short documents in a single LLM call.
+        
+        The golden standard prefix is sent once for the whole group instead of
+        once per document, and the model returns one verdict block per document.
+        With the cascade enabled the group goes to the first-pass model, and
+        documents it isn't confident about are re-judged one at a time.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            documents: List of (name, content) pairs to evaluate together
+            
+        Returns:
+            List of (name, result) tuples in the same order as ``documents``
+        """
+        golden = as_golden_standard(golden_standard)
+        results: Dict[int, Dict[str, Any]] = {}
+        to_send: List[int] = []
+        cache_keys: Dict[int, str] = {}
+        
+        for i, (_, content) in enumerate(documents):
+            if self.cache is not None:
+                cache_keys[i] = self._cache_key(golden, content, variant="-multi")
+                cached = await self.cache.aget(cache_keys[i])
+                if cached is not None:
+                    results[i] = self._record({**cached, "cached": True})
+                    continue
+            to_send.append(i)
+        
+        if len(to_send) == 1:
+            i = to_send[0]
+            results[i] = await self.evaluate_document(golden, documents[i][1])
+        elif to_send:
+            prefix = self._build_prefix(golden)
+            body = "\n\n".join(
+                f"DOCUMENT {n}:\n{documents[i][1]}" for n, i in enumerate(to_send, start=1)
+            )
+            messages = [
+                prefix,
+                _human_message(f"""Evaluate each of the following {len(to_send)} documents independently.
+Start each evaluation with a line "DOCUMENT: <number>" followed by the VERDICT, CONFIDENCE and EXPLANATION lines.
+
+{body}""")
+            ]
+            
+            first_pass = self.cascade_llm is not None
+            model = self.current_config["cascade_model"] if first_pass else None
+            
+            try:
+                timings: Dict[str, float] = {}
+                route: Dict[str, Any] = {}
+                response = await self._invoke(messages, timings, llm=self.cascade_llm, route=route)
+                model = model or route.get("model")
+                parse_started = time.perf_counter()
+                verdicts = self._parse_multi_response(response.content)
+                # The documents shared one call, so they share its timings
+                timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+                usage = self._extract_usage(response)
+                share = len(to_send)
+                # Every document after the first would otherwise have re-sent the prefix
+                saved = golden.derived("prefix_tokens", lambda: estimate_tokens(str(prefix.content))) * (share - 1)
+                
+                finished: List[Dict[str, Any]] = []
+                for n, i in enumerate(to_send, start=1):
+                    result = verdicts.get(n)
+                    if result is None:
+                        result = self._error_result(f"No verdict returned for document {n} of the group")
+                    self._finish_result(result, {
+                        "input_tokens": usage["input_tokens"] / share,
+                        "output_tokens": usage["output_tokens"] / share,
+                        "cached_input_tokens": usage["cached_input_tokens"] / share,
+                        "saved_input_tokens": saved / share
+                    }, timings, model)
+                    result.update(route)
+                    finished.append(result)
+                
+                if first_pass:
+                    finished = list(await asyncio.gather(*(
+                        self._escalate(golden, documents[i][1], result) for i, result in zip(to_send, finished)
+                    )))
+                
+                for i, result in zip(to_send, finished):
+                    await self._store_result(cache_keys.get(i), result)
+                    results[i] = self._record({**result, "cached": False})
+                    
+            except ContextWindowExceeded:
+                # The token estimates were off and the group doesn't fit after all
+                singles = await asyncio.gather(*(self.evaluate_document(golden, documents[i][1]) for i in to_send))
+                results.update(zip(to_send, singles))
+            except Exception as e:
+                for i in to_send:
+                    results[i] = self._record({**self._error_result(e), "cached": False})
+        
+        return [(documents[i][0], results[i]) for i in range(len(documents))]
+    
+    def _parse_response(self, content: str) -> Dict[str, Any]:
+        """Parse a VERDICT/CONFIDENCE/EXPLANATION (or JSON) response into a result dict."""
+        return parse_evaluation(content)
+    
+    def _parse_multi_response(self, content: str) -> Dict[int, Dict[str, Any]]:
+        """Split a multi-document response on DOCUMENT markers and parse each block."""
+        return parse_multi_evaluation(content)
+    
+    def _parse_structured(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Read the result of a structured-output call.
+        
+        Falls back to the tolerant text parser over the tool-call arguments or
+        message content when the provider's output didn't match the schema,
+        so a formatting slip doesn't cost another call.
+        """
+        if output.get("parsed") is not None:
+            return from_structured(output["parsed"])
+        
+        raw = output.get("raw")
+        for arguments in tool_call_arguments(raw):
+            result = parse_evaluation(arguments)
+            if result["verdict"]:
+                return result
+        return parse_evaluation(getattr(raw, "content", "") or "")
+    
+    def _extract_usage(self, response) -> Dict[str, float]:
+        """Read token counts from the LangChain response metadata, if the provider reports them."""
+        metadata = getattr(response, "response_metadata", None)
+        token_usage = metadata.get("token_usage") if isinstance(metadata, dict) else None
+        if not isinstance(token_usage, dict):
+            token_usage = {}
+        
+        details = token_usage.get("prompt_tokens_details") or {}
+        return {
+            "input_tokens": token_usage.get("prompt_tokens", 0) or 0,
+            "output_tokens": token_usage.get("completion_tokens", 0) or 0,
+            "cached_input_tokens": details.get("cached_tokens", 0) or 0,
+            "saved_input_tokens": 0
+        }
+    
+    def _error_result(self, error: Any) -> Dict[str, Any]:
+        """Build the result dict returned when an evaluation fails."""
+        return {
+            "verdict": "Error",
+            "confidence": 0.0,
+            "explanation": str(error),
+            "success": False,
+            "error": str(error)
+        }
+
+    def _work_units(
+        self,
+        golden: GoldenStandard,
+        documents: Iterable[Tuple[str, str]],
+        documents_per_call: int,
+        lookup: Optional[Callable[[str, str], Optional[Dict[str, Any]]]] = None
+    ) -> Iterator[Tuple[str, List[Tuple[str, Any]]]]:
+        """
+        Lazily turn a document stream into units of work for ``evaluate_batch``.
+        
+        Yields ``("decided", [(name, result)])`` for documents that ``lookup``
+        found a stored result for or the similarity pre-filter settled
+        locally, and ``("evaluate", [(name, content), ...])`` for groups that
+        need an LLM call. Documents are grouped by ``_CallGrouper``.
+        """
+        reused: deque = deque()
+        if lookup is not None:
+            def _not_stored(documents):
+                for name, content in documents:
+                    stored = lookup(name, content)
+                    if stored is None:
+                        yield name, content
+                    else:
+                        reused.append((name, stored))
+            documents = _not_stored(documents)
+        
+        if self.config.prefilter_enabled:
+            # numpy is only imported when the pre-filter is used
+            from prefilter import screen_documents
+            screened = screen_documents(
+                golden,
+                documents,
+                pass_threshold=self.config.prefilter_pass_threshold,
+                fail_threshold=self.config.prefilter_fail_threshold
+            )
+        else:
+            screened = ((name, content, None) for name, content in documents)
+        
+        grouper = _CallGrouper(self, golden, documents_per_call)
+        for name, content, decision in screened:
+            while reused:
+                yield "decided", [reused.popleft()]
+            if decision is not None:
+                yield "decided", [(name, decision)]
+            else:
+                for group, _ in grouper.add(name, content):
+                    yield "evaluate", group
+        while reused:
+            yield "decided", [reused.popleft()]
+        for group, _ in grouper.flush():
+            yield "evaluate", group
+
+    def _concurrency_limit(self, max_concurrency: Optional[int]) -> int:
+        """The in-flight call limit for a batch; only None falls back to the config."""
+        limit = self.config.max_concurrency if max_concurrency is None else max_concurrency
+        if limit < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {limit}")
+        return limit
+    
+    def _group_size(self, documents_per_call: Optional[int]) -> int:
+        """How many short documents a batch may judge in one call."""
+        # Revisions are judged from their own diff and voted verdicts need
+        # separate samples, so neither can share a prompt
+        if self.config.diff_mode or self.config.consistency_samples > 1:
+            return 1
+        return documents_per_call or self.config.documents_per_call
+    
+    async def evaluate_batch(
+        self,
+        golden_standard: Union[str, GoldenStandard],
+        documents: Iterable[Tuple[str, str]],
+        max_concurrency: Optional[int] = None,
+        documents_per_call: Optional[int] = None,
+        include_partials: bool = False,
+        reuse_stored: bool = True
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Evaluate many documents concurrently against the same golden standard.
+        
+        Documents are pulled lazily from ``documents`` so that at most
+        ``max_concurrency`` LLM calls are in flight at any time, and results
+        are yielded in completion order rather than submission order. When
+        the pre-filter is enabled, clear-cut documents are decided locally
+        and marked with ``method: "prefilter"``.
+        
+        With the result store enabled, the batch is recorded as a run and
+        documents whose content, golden standard and model settings match a
+        stored result are not sent to the LLM again; they are marked with
+        ``method: "store"`` and ``evaluated_at``.
+        
+        Args:
+            golden_standard: The golden standard text or a parsed GoldenStandard
+            documents: Iterable of (name, content) pairs to evaluate
+            max_concurrency: Maximum number of in-flight LLM calls
+                (defaults to ``config.max_concurrency``)
+            documents_per_call: Number of short documents judged together in
+                one call (defaults to ``config.documents_per_call``; always 1
+                in diff mode and with self-consistency voting)
+            include_partials: Stream single-document responses and also yield
+                their partial results (marked ``partial: True``) ahead of the
+                final result for that document
+            reuse_stored: Serve unchanged documents from the result store
+                (when it is enabled) instead of evaluating them again
+            
+        Yields:
+            (name, result) tuples, where result has the same shape as the
+            dict returned by ``evaluate_document``
+        """
+        limit = self._concurrency_limit(max_concurrency)
+        group_size = self._group_size(documents_per_call)
+        # Parse the golden standard once for the whole batch
+        golden = as_golden_standard(golden_standard)
+        
+        run = _BatchRun(self, golden, reuse_stored)
+        units = _tagged(run, self._work_units(golden, documents, group_size, run.lookup))
+        try:
+            async for _, name, result in self._schedule(units, limit, include_partials):
+                yield name, result
+        finally:
+            run.close()
+    
+    async def evaluate_matrix(
+        self,
+        golden_standards: Iterable[Tuple[str, Union[str, GoldenStandard]]],
+        documents: Iterable[Tuple[str, str]],
+        max_concurrency: Optional[int] = None,
+        documents_per_call: Optional[int] = None,
+        reuse_stored: bool = True
+    ) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Evaluate every document against every golden standard in one pool.
+        
+        All standard/document pairs share a single set of at most
+        ``max_concurrency`` in-flight LLM calls, with work taken from each
+        standard in turn, so the matrix takes about as long as its slowest
+        pairs rather than one batch after another. Each standard is parsed
+        once (keeping its cached prompt prefix) and each document is read
+        once and shared by every standard. Per standard, the pre-filter,
+        result store and multi-document grouping work as in ``evaluate_batch``.
+        
+        Args:
+            golden_standards: (name, text or GoldenStandard) pairs
+            documents: (name, content) pairs; read once up front
+            max_concurrency: Maximum number of in-flight LLM calls across the
+                whole matrix (defaults to ``config.max_concurrency``)
+            documents_per_call: Number of short documents judged together in
+                one call (defaults to ``config.documents_per_call``)
+            reuse_stored: Serve unchanged documents from the result store
+            
+        Yields:
+            (standard name, document name, result) in completion order
+        """
+        limit = self._concurrency_limit(max_concurrency)
+        group_size = self._group_size(documents_per_call)
+        documents = list(documents)
+        
+        runs = [
+            _BatchRun(self, as_golden_standard(golden_standard), reuse_stored, label=name)
+            for name, golden_standard in golden_standards
+        ]
+        units = _interleave([
+            _tagged(run, self._work_units(run.golden, documents, group_size, run.lookup)) for run in runs
+        ])
+        try:
+            async for run, name, result in self._schedule(units, limit):
+                yield run.label, name, result
+        finally:
+            for run in runs:
+                run.close()
+    
+    async def _raise_concurrency(self, limit: int):
+        """Let the provider limiters (or every routed backend's) allow ``limit`` calls in flight."""
+        if self.router is not None:
+            limiters = [backend.limiter for backend in self.router.backends]
+        else:
+            limiters = [get_limiter(self.current_config["provider"])]
+        for limiter in limiters:
+            await limiter.concurrency.raise_maximum(limit)
+    
+    async def _schedule(
+        self,
+        units: Iterator[Tuple["_BatchRun", str, List[Tuple[str, Any]]]],
+        limit: int,
+        include_partials: bool = False
+    ) -> AsyncIterator[Tuple["_BatchRun", str, Dict[str, Any]]]:
+        """
+        Run work units from ``_work_units`` (tagged with their batch run) with at most ``limit`` in flight.
+        
+        Units are pulled lazily, in the executor since producing one may read
+        the result store, decode an upload or run the pre-filter, and results
+        are yielded in completion order, after being recorded in their run.
+        With ``include_partials``,
+        streamed partial results are yielded too, ahead of the final result.
+        """
+        async def _evaluate(run: _BatchRun, group: List[Tuple[str, str]]) -> List[Tuple[_BatchRun, str, Dict[str, Any]]]:
+            if len(group) == 1:
+                name, content = group[0]
+                if not include_partials:
+                    return [(run, name, await self.evaluate_document(run.golden, content))]
+                
+                result: Optional[Dict[str, Any]] = None
+                async for update in self.stream_evaluate_document(run.golden, content):
+                    if update.get("partial"):
+                        partials.put_nowait((run, name, update))
+                    else:
+                        result = update
+                if result is None:
+                    result = self._error_result("The evaluation stream ended without a result")
+                return [(run, name, result)]
+            return [(run, name, result) for name, result in await self.evaluate_documents_together(run.golden, group)]
+        
+        # Limiters outlive batches on a persistent loop; don't let an earlier, smaller batch cap this one
+        await self._raise_concurrency(limit)
+        
+        loop = asyncio.get_running_loop()
+        partials: asyncio.Queue = asyncio.Queue()
+        pending: Set[asyncio.Future] = set()
+        exhausted = False
+        
+        try:
+            while True:
+                # Top up the in-flight set before waiting on the next completion
+                while not exhausted and len(pending) < limit:
+                    unit = await loop.run_in_executor(None, next, units, None)
+                    if unit is None:
+                        exhausted = True
+                        break
+                    run, kind, group = unit
+                    if kind == "decided":
+                        for name, result in group:
+                            yield run, name, await run.finished(name, self._record(result))
+                        continue
+                    pending.add(asyncio.ensure_future(_evaluate(run, group)))
+                
+                if not pending:
+                    break
+                
+                waiters = set(pending)
+                partial_waiter = None
+                if include_partials:
+                    # Wake up for streamed partials as well as finished documents
+                    partial_waiter = asyncio.ensure_future(partials.get())
+                    waiters.add(partial_waiter)
+                
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                
+                if partial_waiter is not None:
+                    if partial_waiter in done:
+                        yield partial_waiter.result()
+                    else:
+                        partial_waiter.cancel()
+                    # A document's partials are queued before its task completes
+                    while not partials.empty():
+                        yield partials.get_nowait()
+                
+                for task in done:
+                    if task is partial_waiter:
+                        continue
+                    pending.discard(task)
+                    for run, name, result in task.result():
+                        yield run, name, await run.finished(name, result)
+        finally:
+            # Consumer stopped early or was cancelled: don't leak running calls
+            for task in pending:
+                task.cancel()
+
+
+@dataclass
+class _Plan:
+    """How ``LLMService`` will evaluate one document; see ``LLMService._plan``."""
+    route: str
+    document: str
+    diff: Optional[DocumentDiff] = None
+    evidence: Optional["Evidence"] = None
+    budget: Optional[TokenBudget] = None
+    
+    def annotate(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Note on the result when the document didn't fit its budget as it was."""
+        if self.budget is None or self.budget.strategy == "as-is":
+            return result
+        return {**result, "budget": self.budget.summary()}
+
+
+class _CallGrouper:
+    """
+    Pack short documents into shared calls without overflowing the context window.
+    
+    Documents longer than ``config.multi_doc_max_chars``, or that don't fit
+    the window as they are, are always sent on their own so that one long
+    document can't crowd out the others. A group is closed when it reaches
+    ``documents_per_call`` or when the next document would push its prompt
+    (plus ``max_tokens`` of output) past the window.
+    
+    ``add`` and ``flush`` return the finished groups as (documents, input
+    tokens) pairs; the tokens are None for documents sent on their own,
+    which ``LLMService.plan_document`` budgets when they're evaluated.
+    """
+    
+    def __init__(self, service: LLMService, golden: GoldenStandard, documents_per_call: int):
+        self.service = service
+        self.golden = golden
+        self.documents_per_call = documents_per_call
+        self.prefix_tokens = service._prefix_tokens(golden) + MULTI_DOC_OVERHEAD_TOKENS
+        window = service._context_window()
+        self.room = None if window is None else window - service.current_config["max_tokens"] - self.prefix_tokens
+        self.group: List[Tuple[str, str]] = []
+        self.tokens = 0
+    
+    def add(self, name: str, content: str) -> List[Tuple[List[Tuple[str, str]], Optional[int]]]:
+        if self.documents_per_call <= 1 or len(content) > self.service.config.multi_doc_max_chars:
+            return [([(name, content)], None)]
+        budget = self.service.plan_document(self.golden, content)
+        tokens = budget.input_tokens - self.service._prefix_tokens(self.golden)
+        if budget.strategy != "as-is" or (self.room is not None and tokens > self.room):
+            return [([(name, content)], None)]
+        
+        finished = []
+        if self.room is not None and self.tokens + tokens > self.room:
+            finished = self.flush()
+        self.group.append((name, content))
+        self.tokens += tokens
+        if len(self.group) >= self.documents_per_call:
+            finished.extend(self.flush())
+        return finished
+    
+    def flush(self) -> List[Tuple[List[Tuple[str, str]], Optional[int]]]:
+        if not self.group:
+            return []
+        # A group of one goes through evaluate_document like any single document
+        tokens = self.prefix_tokens + self.tokens if len(self.group) > 1 else None
+        finished = [(self.group, tokens)]
+        self.group, self.tokens = [], 0
+        return finished
+
+
+class _BatchRun:
+    """
+    One golden standard's share of a batch: its parsed standard and result-store run.
+    
+    Without a result store, ``lookup`` is None and ``finished`` passes
+    results through unchanged.
+    """
+    
+    def __init__(self, service: LLMService, golden: GoldenStandard, reuse_stored: bool = True, label: str = ""):
+        self.golden = golden
+        self.label = label
+        self.store = service.store
+        self.reuse_stored = reuse_stored
+        self.hashes: Dict[str, str] = {}
+        self.run_id = None
+        self.lookup: Optional[Callable[[str, str], Optional[Dict[str, Any]]]] = None
+        if self.store is not None:
+            self.settings = service._result_settings()
+            self.run_id = self.store.start_run(golden.content_hash, self.settings)
+            self.lookup = self._lookup
+    
+    def _lookup(self, name: str, content: str) -> Optional[Dict[str, Any]]:
+        """A stored result for an unchanged document, remembering its hash for ``finished``."""
+        self.hashes[name] = document_hash(content)
+        if not self.reuse_stored or self.store is None:
+            return None
+        stored = self.store.lookup(self.hashes[name], self.golden.content_hash, self.settings)
+        if stored is None:
+            return None
+        return {**stored, "cached": True, "method": "store"}
+    
+    async def finished(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a document's final result in the store (off the event loop) and return it."""
+        store, run_id = self.store, self.run_id
+        if store is not None and run_id is not None and name in self.hashes:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: store.record(
+                run_id, name, self.hashes[name], self.golden.content_hash, self.settings, result,
+                reused=result.get("method") == "store"
+            ))
+        return result
+    
+    def close(self):
+        if self.run_id is not None:
+            self.store.finish_run(self.run_id)
+
+
+def _tagged(run: _BatchRun, units: Iterator[Tuple[str, Any]]) -> Iterator[Tuple[_BatchRun, str, Any]]:
+    for kind, group in units:
+        yield run, kind, group
+
+
+def _interleave(iterators: List[Iterator[Any]]) -> Iterator[Any]:
+    """Take one item from each iterator in turn until all are exhausted."""
+    active = deque(iterators)
+    while active:
+        iterator = active.popleft()
+        try:
+            yield next(iterator)
+        except StopIteration:
+            continue
+        active.append(iterator)
 
 # Global instance
 llm_service = LLMService()
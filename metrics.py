@@ -0,0 +1,240 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# USD per million tokens (input, output); override or extend with MODEL_PRICING
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-3.5-turbo": (0.5, 1.5),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "llama3-8b-8192": (0.05, 0.08),
+}
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PARSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+
+def estimate_cost(model: str, usage: Dict[str, float], pricing: Optional[Dict[str, Sequence[float]]] = None) -> float:
+    """
+    Estimate the USD cost of a call from its token usage.
+
+    Args:
+        model: Model name as configured
+        usage: Dict with ``input_tokens`` and ``output_tokens``
+        pricing: Per-model (input, output) USD per million tokens; entries
+            override the built-in table
+
+    Returns:
+        Estimated cost in USD, or 0.0 for models without a known price
+    """
+    prices = (pricing or {}).get(model) or MODEL_PRICING.get(model)
+    if not prices:
+        return 0.0
+    input_price, output_price = prices
+    return (usage.get("input_tokens", 0) * input_price + usage.get("output_tokens", 0) * output_price) / 1_000_000
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # label values -> (per-bucket counts with a trailing +Inf slot, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels: Any) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, 'le="%g"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                cumulative += counts[-1]
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class EvaluationMetrics:
+    """Process-wide evaluation counters and latency histograms."""
+
+    def __init__(self):
+        self.evaluations = Counter(
+            "docujudge_evaluations_total", "Documents evaluated", ("model", "method", "outcome")
+        )
+        self.cache_hits = Counter("docujudge_cache_hits_total", "Results served from the result cache", ("model",))
+        self.tokens = Counter("docujudge_tokens_total", "Tokens used by LLM calls", ("model", "kind"))
+        self.cost = Counter("docujudge_cost_usd_total", "Estimated LLM spend in USD", ("model",))
+        self.cascade = Counter(
+            "docujudge_cascade_total", "Cascaded evaluations by first-pass model and whether they escalated",
+            ("model", "escalated")
+        )
+        self.consistency = Counter(
+            "docujudge_consistency_votes_total", "Self-consistency votes by model and number of samples drawn",
+            ("model", "samples")
+        )
+        self.backend_calls = Counter(
+            "docujudge_backend_calls_total", "Routed LLM calls by backend and outcome", ("backend", "outcome")
+        )
+        self.queue_wait = Histogram(
+            "docujudge_queue_wait_seconds", "Time waiting for rate limits and retries before the LLM call",
+            LATENCY_BUCKETS, ("model",)
+        )
+        self.llm_latency = Histogram(
+            "docujudge_llm_latency_seconds", "LLM response time", LATENCY_BUCKETS, ("model",)
+        )
+        self.parse_time = Histogram(
+            "docujudge_parse_seconds", "Time spent parsing LLM responses", PARSE_BUCKETS, ("model",)
+        )
+
+    def record(self, result: Dict[str, Any], model: str):
+        """Add one document's final result to the aggregates."""
+        method = result.get("method", "llm")
+        if not result.get("success"):
+            outcome = "error"
+        else:
+            outcome = str(result.get("verdict") or "unparsed").lower()
+        self.evaluations.inc(model=model, method=method, outcome=outcome)
+
+        if result.get("cached"):
+            # Tokens, time and money were spent by the run that produced it
+            self.cache_hits.inc(model=model)
+            return
+
+        if result.get("samples"):
+            self.consistency.inc(model=model, samples=str(result["samples"]))
+
+        stages = result.get("cascade")
+        if stages:
+            self.cascade.inc(model=stages[0]["model"], escalated=str(len(stages) > 1).lower())
+            # Each call is counted against the model that made it
+            for stage in stages:
+                self._record_call(stage, stage["model"])
+        else:
+            self._record_call(result, model)
+
+    def _record_call(self, result: Dict[str, Any], model: str):
+        usage = result.get("usage") or {}
+        for kind in ("input_tokens", "output_tokens", "cached_input_tokens"):
+            if usage.get(kind):
+                self.tokens.inc(usage[kind], model=model, kind=kind[:-len("_tokens")])
+        if result.get("cost_usd"):
+            self.cost.inc(result["cost_usd"], model=model)
+
+        timings = result.get("timings") or {}
+        if "queue_wait_ms" in timings:
+            self.queue_wait.observe(timings["queue_wait_ms"] / 1000, model=model)
+        if "llm_latency_ms" in timings:
+            self.llm_latency.observe(timings["llm_latency_ms"] / 1000, model=model)
+        if "parse_ms" in timings:
+            self.parse_time.observe(timings["parse_ms"] / 1000, model=model)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in (
+            self.evaluations, self.cache_hits, self.tokens, self.cost, self.cascade, self.consistency, self.backend_calls,
+            self.queue_wait, self.llm_latency, self.parse_time
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = evaluation_metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve ``/metrics`` for Prometheus on a daemon thread (once per process).
+
+    Streamlit can't mount extra routes, so metrics get their own port.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="docu-judge-metrics", daemon=True).start()
+        return _server
+
+
+# Global instance
+evaluation_metrics = EvaluationMetrics()
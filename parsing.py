@@ -0,0 +1,185 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+OUTPUT_MODES = ("text", "function_calling", "json_mode")
+
+VERDICTS = ("Pass", "Fail")
+
+# A field label at the start of a line, tolerating markdown decoration and
+# list markers: "VERDICT: Pass", "**Verdict**: pass", "2. Confidence - 85%"
+FIELD_PATTERN = re.compile(
+    r"^[ \t>*#_\-\d.)]*(verdict|confidence|explanation|reasoning|rationale)[ \t*_]*[:=\-][ \t*_]*",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# A line holding only a multi-document header: "DOCUMENT: 2", "**Document 2**"
+DOCUMENT_PATTERN = re.compile(r"^[ \t>*#_\-]*document[ \t]*:?[ \t]*(\d+)[ \t*_:]*$", re.IGNORECASE | re.MULTILINE)
+
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+CONFIDENCE_WORDS = {"very high": 0.95, "high": 0.85, "medium": 0.6, "moderate": 0.6, "low": 0.3, "very low": 0.1}
+
+PARSE_ERROR = "Could not read a Pass/Fail verdict from the model response"
+
+
+@lru_cache(maxsize=None)
+def evaluation_schema() -> type:
+    """
+    The ``Evaluation`` model for structured output.
+
+    Defined on first use so that importing this module doesn't import pydantic.
+    """
+    from langchain_core.pydantic_v1 import BaseModel, Field
+
+    class Evaluation(BaseModel):
+        """Schema handed to the provider for structured (function-calling / JSON) output."""
+
+        verdict: str = Field(description='Either "Pass" or "Fail"')
+        confidence: float = Field(description="Confidence in the verdict, between 0 and 1")
+        explanation: str = Field(description="A brief explanation for the verdict")
+
+    return Evaluation
+
+
+def normalize_verdict(value: Any) -> str:
+    """Map free-form verdict text ("**PASS**", "passed", "Fail.") to Pass/Fail, or '' if unclear."""
+    text = str(value or "").strip().strip("*_`[]().").lower()
+    if text in ("pass", "passed", "passes", "yes", "true"):
+        return "Pass"
+    if text in ("fail", "failed", "fails", "no", "false"):
+        return "Fail"
+    words = set(re.findall(r"[a-z]+", text))
+    has_pass = bool(words & {"pass", "passed", "passes"})
+    has_fail = bool(words & {"fail", "failed", "fails"})
+    if has_pass != has_fail:
+        return "Pass" if has_pass else "Fail"
+    return ""
+
+
+def normalize_confidence(value: Any) -> float:
+    """Read a confidence as a 0-1 float from numbers, percentages, "8/10" or words."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+        return min(1.0, max(0.0, number / 100 if 1 < number <= 100 else number))
+
+    text = str(value or "").strip().lower()
+    match = NUMBER_PATTERN.search(text)
+    if match is None:
+        for words, score in CONFIDENCE_WORDS.items():
+            if text.startswith(words):
+                return score
+        return 0.0
+
+    number = float(match.group())
+    rest = text[match.end():].lstrip()
+    if rest.startswith("%"):
+        number /= 100
+    elif rest.startswith("/"):
+        denominator = NUMBER_PATTERN.match(rest[1:].lstrip())
+        if denominator and float(denominator.group()):
+            number /= float(denominator.group())
+    elif 1 < number <= 100:
+        number /= 100
+    return min(1.0, max(0.0, number))
+
+
+def _parse_json(content: str) -> Optional[Dict[str, Any]]:
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):] if "{" in text else text
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text[:text.rfind("}") + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {str(key).lower(): value for key, value in data.items()}
+
+
+def parse_evaluation(content: str) -> Dict[str, Any]:
+    """
+    Parse a model response into a result dict in a single pass.
+
+    Accepts the VERDICT/CONFIDENCE/EXPLANATION format with loose casing and
+    markdown decoration, multi-line explanations, and JSON objects with the
+    same keys. Missing fields are left empty ('' verdict, 0.0 confidence);
+    use ``validate_evaluation`` to reject responses without a verdict.
+    """
+    result = {
+        "verdict": "",
+        "confidence": 0.0,
+        "explanation": "",
+        "success": True,
+        "error": None
+    }
+    content = content or ""
+
+    data = _parse_json(content)
+    if data is not None:
+        result["verdict"] = normalize_verdict(data.get("verdict"))
+        result["confidence"] = normalize_confidence(data.get("confidence"))
+        result["explanation"] = str(data.get("explanation") or data.get("reasoning") or "").strip()
+        return result
+
+    matches = list(FIELD_PATTERN.finditer(content))
+    seen = set()
+    for i, match in enumerate(matches):
+        field = match.group(1).lower()
+        if field in ("reasoning", "rationale"):
+            field = "explanation"
+        if field in seen:
+            continue
+        seen.add(field)
+
+        # A field runs until the next label; only the explanation may span lines
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        value = content[match.end():end].strip()
+        if field == "verdict":
+            result["verdict"] = normalize_verdict(value.split("\n", 1)[0])
+        elif field == "confidence":
+            result["confidence"] = normalize_confidence(value.split("\n", 1)[0])
+        else:
+            result["explanation"] = "\n".join(line.strip() for line in value.splitlines()).strip()
+
+    return result
+
+
+def parse_multi_evaluation(content: str) -> Dict[int, Dict[str, Any]]:
+    """Split a multi-document response on its DOCUMENT headers and parse each block."""
+    headers = list(DOCUMENT_PATTERN.finditer(content or ""))
+    results: Dict[int, Dict[str, Any]] = {}
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        results.setdefault(int(header.group(1)), parse_evaluation(content[header.end():end]))
+    return results
+
+
+def from_structured(parsed: Any) -> Dict[str, Any]:
+    """Turn a schema instance (or dict) from ``with_structured_output`` into a result dict."""
+    data = parsed.dict() if hasattr(parsed, "dict") else dict(parsed)
+    return {
+        "verdict": normalize_verdict(data.get("verdict")),
+        "confidence": normalize_confidence(data.get("confidence")),
+        "explanation": str(data.get("explanation") or "").strip(),
+        "success": True,
+        "error": None
+    }
+
+
+def tool_call_arguments(message: Any) -> List[str]:
+    """Raw JSON argument strings of any tool calls on a chat message."""
+    tool_calls = (getattr(message, "additional_kwargs", None) or {}).get("tool_calls") or []
+    return [call.get("function", {}).get("arguments", "") for call in tool_calls if isinstance(call, dict)]
+
+
+def validate_evaluation(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Mark a successful-looking result as failed if it has no usable verdict."""
+    if result.get("success") and result.get("verdict") not in VERDICTS:
+        result["success"] = False
+        result["error"] = PARSE_ERROR
+    return result
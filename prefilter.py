@@ -0,0 +1,231 @@
+from collections import Counter
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from chunking import iter_sections, heading_keywords, heading_similarity
+from golden import GoldenStandard, as_golden_standard, bullet_tokens, tokenize
+
+# Relative weight of each signal in the combined score
+WEIGHTS = {"headings": 0.3, "tfidf": 0.4, "bullets": 0.3}
+
+
+def _vocabulary(token_lists: Iterable[List[str]]) -> Dict[str, int]:
+    vocab: Dict[str, int] = {}
+    for tokens in token_lists:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+    return vocab
+
+
+@dataclass
+class TfidfModel:
+    """IDF weights fitted on a golden standard, and the standard's own weighted vector."""
+    vocab: Dict[str, int]
+    idf: np.ndarray
+    unseen_idf: float
+    golden: np.ndarray
+
+
+def tfidf_model(golden: GoldenStandard) -> TfidfModel:
+    """
+    The golden standard's TF-IDF model, fitted once per standard.
+
+    Document frequencies come from the standard's sections, so words every
+    section uses count for little. Words the standard never uses get the
+    highest weight; they only lower a document's similarity.
+    """
+    def _build() -> TfidfModel:
+        sections = [tokenize(section.text) for section in golden.sections]
+        sections = [tokens for tokens in sections if tokens] or [golden.tokens]
+        vocab = _vocabulary([golden.tokens])
+
+        df = np.zeros(len(vocab))
+        for tokens in sections:
+            df[[vocab[t] for t in set(tokens) if t in vocab]] += 1
+        idf = np.log((1 + len(sections)) / (1 + df)) + 1
+
+        weights = _weigh(Counter(golden.tokens), vocab, idf)
+        norm = np.linalg.norm(weights)
+        return TfidfModel(vocab, idf, float(np.log(1 + len(sections)) + 1), weights / (norm or 1))
+    return golden.derived("tfidf_model", _build)
+
+
+def _weigh(counts: Counter, vocab: Dict[str, int], idf: np.ndarray) -> np.ndarray:
+    weights = np.zeros(len(vocab))
+    for token, count in counts.items():
+        if token in vocab:
+            weights[vocab[token]] = 1 + np.log(count)
+    return weights * idf
+
+
+def tfidf_similarity(golden_standard: Union[str, GoldenStandard], documents: List[str]) -> np.ndarray:
+    """
+    Cosine similarity between the golden standard and each document.
+
+    Weights come from ``tfidf_model``, so a document's score doesn't depend
+    on which other documents it is scored with.
+    """
+    golden = as_golden_standard(golden_standard)
+    model = tfidf_model(golden)
+    scores = np.zeros(len(documents))
+    if not model.vocab:
+        return scores
+
+    for i, document in enumerate(documents):
+        counts = Counter(tokenize(document))
+        weights = _weigh(counts, model.vocab, model.idf)
+        unseen = sum((1 + np.log(count)) ** 2 for token, count in counts.items() if token not in model.vocab)
+        norm = np.sqrt(weights @ weights + unseen * model.unseen_idf ** 2)
+        if norm:
+            scores[i] = (weights @ model.golden) / norm
+    return scores
+
+
+def bullet_overlap(golden_standard: Union[str, GoldenStandard], documents: List[str]) -> Optional[np.ndarray]:
+    """
+    How well each document covers the golden standard's bullet points.
+
+    For every golden bullet the best Jaccard match among the document's
+    bullets is taken, and the per-document score is the mean over golden
+    bullets. All documents are scored with a single matrix product.
+
+    Returns:
+        Array of scores in [0, 1], or None if the golden standard has no bullets
+    """
+    golden_bullets = as_golden_standard(golden_standard).bullets
+    if not golden_bullets:
+        return None
+
+    document_bullets = [bullet_tokens(d) for d in documents]
+    flat = [b for bullets in document_bullets for b in bullets]
+    if not flat:
+        return np.zeros(len(documents))
+
+    vocab = _vocabulary(golden_bullets + flat)
+
+    def _matrix(bullets: List[List[str]]) -> np.ndarray:
+        matrix = np.zeros((len(bullets), len(vocab)))
+        for row, tokens in enumerate(bullets):
+            matrix[row, [vocab[t] for t in tokens]] = 1
+        return matrix
+
+    golden_matrix = _matrix(golden_bullets)
+    document_matrix = _matrix(flat)
+
+    intersection = golden_matrix @ document_matrix.T
+    union = golden_matrix.sum(axis=1)[:, None] + document_matrix.sum(axis=1)[None, :] - intersection
+    jaccard = intersection / np.maximum(union, 1)
+
+    # Best match per golden bullet within each document's slice of columns
+    counts = np.array([len(b) for b in document_bullets])
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has_bullets = counts > 0
+    best = np.zeros((len(golden_bullets), len(documents)))
+    best[:, has_bullets] = np.maximum.reduceat(jaccard, offsets[has_bullets], axis=1)
+    return best.mean(axis=0)
+
+
+def heading_coverage(
+    golden_standard: Union[str, GoldenStandard],
+    documents: List[str],
+    threshold: float = 0.5
+) -> Optional[np.ndarray]:
+    """
+    Fraction of the golden standard's sections that each document has a heading for.
+
+    Returns:
+        Array of scores in [0, 1], or None if the golden standard has no headings
+    """
+    golden = as_golden_standard(golden_standard).heading_keywords
+    if not golden:
+        return None
+
+    scores = np.zeros(len(documents))
+    for i, document in enumerate(documents):
+        headings = [heading_keywords(s.heading) for s in iter_sections(document) if s.heading]
+        covered = sum(
+            1 for keywords in golden
+            if any(heading_similarity(keywords, h) >= threshold for h in headings)
+        )
+        scores[i] = covered / len(golden)
+    return scores
+
+
+def score_documents(golden_standard: Union[str, GoldenStandard], documents: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Compute every similarity signal, plus their weighted combination, for a batch.
+
+    Signals that don't apply to the golden standard (no headings or no
+    bullets) are left out and the remaining weights renormalized.
+
+    Returns:
+        Dict mapping signal name (and ``"score"``) to per-document arrays
+    """
+    golden_standard = as_golden_standard(golden_standard)
+    candidates = {
+        "headings": heading_coverage(golden_standard, documents),
+        "tfidf": tfidf_similarity(golden_standard, documents),
+        "bullets": bullet_overlap(golden_standard, documents),
+    }
+    signals = {name: values for name, values in candidates.items() if values is not None}
+
+    score = np.zeros(len(documents))
+    for name, values in signals.items():
+        score += WEIGHTS[name] * values
+    signals["score"] = score / sum(WEIGHTS[name] for name in signals)
+    return signals
+
+
+def screen_documents(
+    golden_standard: Union[str, GoldenStandard],
+    documents: Iterable[Tuple[str, str]],
+    pass_threshold: float,
+    fail_threshold: float,
+    window: int = 64
+) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]]]]:
+    """
+    Decide obvious Pass/Fail documents locally, without an LLM call.
+
+    Documents are scored ``window`` at a time so arbitrarily large batches can
+    be streamed through.
+
+    Args:
+        golden_standard: The golden standard text or a parsed GoldenStandard
+        documents: Iterable of (name, content) pairs
+        pass_threshold: Combined score at or above which a document passes
+        fail_threshold: Combined score at or below which a document fails
+        window: Number of documents scored together
+
+    Yields:
+        (name, content, result) tuples; result is an evaluation result dict
+        for decided documents and None for ones that still need the LLM
+    """
+    golden_standard = as_golden_standard(golden_standard)
+    remaining = iter(documents)
+    while True:
+        chunk = list(islice(remaining, window))
+        if not chunk:
+            return
+
+        signals = score_documents(golden_standard, [content for _, content in chunk])
+        for i, (name, content) in enumerate(chunk):
+            score = float(signals["score"][i])
+            if fail_threshold < score < pass_threshold:
+                yield name, content, None
+                continue
+
+            verdict = "Pass" if score >= pass_threshold else "Fail"
+            details = ", ".join(
+                f"{signal} {float(values[i]):.2f}" for signal, values in signals.items() if signal != "score"
+            )
+            yield name, content, {
+                "verdict": verdict,
+                "confidence": round(score if verdict == "Pass" else 1 - score, 4),
+                "explanation": f"Decided by the similarity pre-filter (score {score:.2f}: {details}).",
+                "success": True,
+                "error": None,
+                "method": "prefilter"
+            }
@@ -0,0 +1,252 @@
+import asyncio
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from config import config, LLMProvider
+
+# Connection-level failures worth retrying; matched by name so the provider
+# SDKs (openai, groq, httpx) don't all have to be imported here.
+TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+    "ConnectTimeout", "RemoteProtocolError", "TimeoutError"
+}
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status code carried by a provider SDK exception, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return error_status(error) == 429
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, server errors and dropped connections are worth another try."""
+    status = error_status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, asyncio.TimeoutError) or type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from Retry-After style headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class TokenBucket:
+    """Refills continuously at ``per_minute`` units per minute, up to one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.available = per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until ``amount`` units are available and take them (FIFO)."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+    def refund(self, amount: float):
+        """Give back units reserved but not used (e.g. estimate above actual usage)."""
+        self._refill()
+        self.available = min(self.capacity, self.available + max(0.0, amount))
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: halve on throttling, grow by ~1 per limit's worth of successes.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, throttled: bool = False):
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.minimum), self.limit / 2)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    async def raise_maximum(self, maximum: int):
+        """Let the limit reach ``maximum`` when that's above the current ceiling."""
+        async with self._condition:
+            if maximum <= self.maximum:
+                return
+            # A limit still backing off after throttling keeps growing from where it is
+            if self.limit >= self.maximum:
+                self.limit = float(maximum)
+            self.maximum = maximum
+            self._condition.notify_all()
+
+
+class ProviderLimiter:
+    """
+    Client-side rate limiting for one provider.
+
+    Every call reserves a request and its estimated tokens from per-minute
+    buckets and a slot under an adaptive concurrency limit. Rate-limit
+    responses pause all calls to the provider for the Retry-After period and
+    halve the concurrency limit; retryable failures are retried with jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 5,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0}
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: float = 0) -> AsyncIterator[None]:
+        """Reserve quota and a concurrency slot for one request."""
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+        await self.concurrency.acquire()
+        throttled = False
+        try:
+            self.stats["calls"] += 1
+            yield
+        except BaseException as e:
+            throttled = is_rate_limited(e)
+            raise
+        finally:
+            await self.concurrency.release(throttled=throttled)
+
+    async def backoff(self, attempt: int, error: BaseException):
+        """Sleep before retry ``attempt`` (0-based), honouring Retry-After when given."""
+        self.stats["retries"] += 1
+        wait = retry_after(error)
+        if is_rate_limited(error):
+            self.stats["rate_limited"] += 1
+            if wait is not None:
+                # Everyone waits, not just this caller
+                self.paused_until = max(self.paused_until, time.monotonic() + wait)
+        if wait is None:
+            # Full jitter keeps concurrent retries from synchronising
+            wait = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        await asyncio.sleep(wait)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: float = 0) -> Any:
+        """
+        Run ``fn`` under the limiter, retrying retryable failures.
+
+        Args:
+            fn: Zero-argument callable returning a fresh awaitable per attempt
+            estimated_tokens: Tokens the request is expected to consume
+
+        Returns:
+            Whatever ``fn`` returns on the first successful attempt
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(estimated_tokens):
+                    return await fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                await self.backoff(attempt, e)
+                attempt += 1
+
+    def refund_tokens(self, amount: float):
+        if self.tokens is not None:
+            self.tokens.refund(amount)
+
+
+# asyncio primitives belong to one loop, so limiters are kept per running loop
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ProviderLimiter]]" = weakref.WeakKeyDictionary()
+
+
+def get_limiter(provider: str, name: Optional[str] = None, limits: Optional[Dict[str, float]] = None) -> ProviderLimiter:
+    """
+    Return the limiter for ``provider`` on the running event loop.
+
+    Routed backends pass their ``name`` so every account/key gets its own
+    quota, and may override the provider's ``rpm``/``tpm`` with ``limits``.
+    """
+    loop = asyncio.get_running_loop()
+    limiters = _limiters.setdefault(loop, {})
+    key = name or LLMProvider(provider).value
+    if key not in limiters:
+        limits = {**config.rate_limits.get(LLMProvider(provider).value, {}), **(limits or {})}
+        limiters[key] = ProviderLimiter(
+            requests_per_minute=limits.get("rpm", 0),
+            tokens_per_minute=limits.get("tpm", 0),
+            max_concurrency=config.max_concurrency,
+            max_retries=config.llm_max_retries,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay
+        )
+    return limiters[key]
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+from config import config
+
+# Only these response headers are kept; the body is stored decoded, so
+# content-encoding and content-length no longer apply when it's replayed
+KEPT_HEADERS = ("content-type",)
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Identify a provider request by method, path and body, ignoring headers.
+
+    The JSON body (model, temperature, max tokens, messages, tools, stream
+    flag) is canonicalised so key order doesn't matter. Authorization and
+    SDK version headers are left out, so a recording replays with any API key.
+    """
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+@dataclass
+class Exchange:
+    """One recorded response and how long the provider took to send it."""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    latency: float
+
+
+class ReplayStore:
+    """
+    SQLite store of provider responses keyed by request.
+
+    Bodies are zlib-compressed. Identical requests (self-consistency samples,
+    repeated runs) keep every response in the order it was recorded, and are
+    replayed in that order, so a recording reproduces sampled variation too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS exchanges (
+                key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (key, seq)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def record(self, key: str, exchange: Exchange):
+        """Append a response for ``key`` after any recorded before it."""
+        with self._lock:
+            (seq,) = self._conn.execute("SELECT COUNT(*) FROM exchanges WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT INTO exchanges (key, seq, status, headers, body, latency, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, seq, exchange.status, json.dumps(exchange.headers),
+                    zlib.compress(exchange.body), exchange.latency, time.time()
+                )
+            )
+            self._conn.commit()
+
+    def responses(self, key: str) -> List[Exchange]:
+        """Every response recorded for ``key``, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, headers, body, latency FROM exchanges WHERE key = ? ORDER BY seq", (key,)
+            ).fetchall()
+        return [
+            Exchange(status, json.loads(headers), zlib.decompress(body), latency)
+            for status, headers, body, latency in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+async def _off_loop(method, *args):
+    # SQLite blocks; keep it from stalling every other in-flight request on the loop
+    return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+
+def _response(request: httpx.Request, exchange: Exchange) -> httpx.Response:
+    return httpx.Response(exchange.status, headers=exchange.headers, content=exchange.body, request=request)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Send requests to the provider and store every successful response.
+
+    Responses are read in full before they are handed on, so streamed
+    completions arrive all at once while recording; the stored latency is
+    the time to the last byte. Failed requests are passed through unrecorded.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, store: ReplayStore):
+        self.inner = inner
+        self.store = store
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        exchange = Exchange(
+            response.status_code,
+            {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            body,
+            time.perf_counter() - started
+        )
+        if response.is_success:
+            await _off_loop(self.store.record, request_key(request), exchange)
+        return _response(request, exchange)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Answer requests from a ReplayStore without touching the network.
+
+    Each response is delayed by its recorded latency, or by a fixed
+    ``latency`` in seconds, spread by ``jitter`` (a fraction, uniformly
+    either way) from a seeded generator. Requests that were never recorded
+    get a 404 error response, which the SDKs raise and the service doesn't retry.
+    """
+
+    def __init__(
+        self,
+        store: ReplayStore,
+        latency: Optional[float] = None,
+        jitter: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._served: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def delay(self, exchange: Exchange) -> float:
+        """How long to hold back ``exchange``."""
+        base = exchange.latency if self.latency is None else self.latency
+        if base <= 0:
+            return 0.0
+        if self.jitter:
+            spread = min(self.jitter, 1.0)
+            base *= self._random.uniform(1 - spread, 1 + spread)
+        return base
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        recorded = await _off_loop(self.store.responses, key)
+        if not recorded:
+            self.misses += 1
+            message = f"No recorded response for this request in {self.store.path}; record it first with LLM_TRANSPORT=record"
+            return httpx.Response(
+                404, json={"error": {"message": message, "type": "replay_miss"}}, request=request
+            )
+
+        # Identical requests get their recorded responses in turn, then start over
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        self.hits += 1
+        exchange = recorded[served % len(recorded)]
+        await asyncio.sleep(self.delay(exchange))
+        return _response(request, exchange)
+
+
+_stores: Dict[str, ReplayStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str) -> ReplayStore:
+    """The process-wide store for ``path``, shared by every HTTP client."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ReplayStore(path)
+        return store
+
+
+def build_transport(limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    The HTTP transport for ``config.llm_transport``, or None to use the network directly.
+
+    Args:
+        limits: Connection limits for the real transport when recording
+    """
+    if config.llm_transport == "record":
+        return RecordingTransport(httpx.AsyncHTTPTransport(limits=limits), get_store(config.replay_path))
+    if config.llm_transport == "replay":
+        return ReplayTransport(
+            get_store(config.replay_path),
+            latency=config.replay_latency,
+            jitter=config.replay_jitter,
+            seed=config.replay_seed
+        )
+    return None
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+def document_hash(content: str) -> str:
+    """Content hash that identifies a document version in the store."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def settings_key(settings: Dict[str, Any]) -> str:
+    """Canonical form of the model settings a result was produced under."""
+    return json.dumps(settings, sort_keys=True, separators=(",", ":"))
+
+
+class ResultStore:
+    """
+    SQLite history of evaluation runs and every per-document result.
+
+    Results are keyed by document hash, golden-standard hash and model
+    settings, so re-evaluating a corpus only needs LLM calls for documents
+    (or a standard, or settings) that changed since the last run. Unlike the
+    result cache, nothing expires: every run is kept for trend analysis.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                golden_hash TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+            CREATE TABLE IF NOT EXISTS evaluations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                document_hash TEXT NOT NULL,
+                golden_hash TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                verdict TEXT,
+                confidence REAL,
+                success INTEGER NOT NULL,
+                reused INTEGER NOT NULL DEFAULT 0,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS evaluations_lookup
+                ON evaluations (document_hash, golden_hash, settings, success, created_at);
+            CREATE INDEX IF NOT EXISTS evaluations_run ON evaluations (run_id);
+            CREATE INDEX IF NOT EXISTS evaluations_name ON evaluations (name, created_at);
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self, golden_hash: str, settings: Dict[str, Any]) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (id, golden_hash, settings, started_at) VALUES (?, ?, ?, ?)",
+                (run_id, golden_hash, settings_key(settings), time.time())
+            )
+            self._conn.commit()
+        return run_id
+
+    def finish_run(self, run_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+            self._conn.commit()
+
+    def lookup(self, document_hash: str, golden_hash: str, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Latest successful result for this document version, standard and settings, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM evaluations "
+                "WHERE document_hash = ? AND golden_hash = ? AND settings = ? AND success = 1 "
+                "ORDER BY created_at DESC, id DESC LIMIT 1",
+                (document_hash, golden_hash, settings_key(settings))
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row["result"])
+        result["evaluated_at"] = result.get("evaluated_at") or row["created_at"]
+        return result
+
+    def record(
+        self,
+        run_id: str,
+        name: str,
+        document_hash: str,
+        golden_hash: str,
+        settings: Dict[str, Any],
+        result: Dict[str, Any],
+        reused: bool = False
+    ):
+        """Add one document's final result to a run."""
+        success = bool(result.get("success") and result.get("verdict"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO evaluations (run_id, name, document_hash, golden_hash, settings, verdict, confidence, "
+                "success, reused, cost_usd, result, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, name, document_hash, golden_hash, settings_key(settings),
+                    result.get("verdict"), result.get("confidence"), int(success), int(reused),
+                    0.0 if reused else float(result.get("cost_usd") or 0.0),
+                    json.dumps(result), time.time()
+                )
+            )
+            self._conn.commit()
+
+    def runs(self, golden_hash: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Summaries of recent runs, newest first.
+
+        Each has the run's counts of documents, passes, fails, errors and
+        reused results, its pass rate over decided documents and its cost.
+        """
+        where, params = ("WHERE r.golden_hash = ?", [golden_hash]) if golden_hash else ("", [])
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.golden_hash, r.settings, r.started_at, r.finished_at, "
+                "COUNT(e.id) AS documents, "
+                "COALESCE(SUM(e.verdict = 'Pass' AND e.success), 0) AS passed, "
+                "COALESCE(SUM(e.verdict = 'Fail' AND e.success), 0) AS failed, "
+                "COALESCE(SUM(e.success = 0), 0) AS errors, "
+                "COALESCE(SUM(e.reused), 0) AS reused, "
+                "COALESCE(SUM(e.cost_usd), 0) AS cost_usd "
+                f"FROM runs r LEFT JOIN evaluations e ON e.run_id = r.id {where} "
+                "GROUP BY r.id ORDER BY r.started_at DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+
+        runs = []
+        for row in rows:
+            run = dict(row)
+            run["settings"] = json.loads(run["settings"])
+            decided = run["passed"] + run["failed"]
+            run["pass_rate"] = run["passed"] / decided if decided else None
+            runs.append(run)
+        return runs
+
+    def run_results(self, run_id: str) -> List[Dict[str, Any]]:
+        """Per-document results of one run, in the order they were recorded."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, document_hash, reused, result, created_at FROM evaluations "
+                "WHERE run_id = ? ORDER BY id",
+                (run_id,)
+            ).fetchall()
+        return [
+            {
+                "name": row["name"],
+                "document_hash": row["document_hash"],
+                "reused": bool(row["reused"]),
+                "created_at": row["created_at"],
+                "result": json.loads(row["result"])
+            }
+            for row in rows
+        ]
+
+    def document_history(self, name: str, golden_hash: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Verdicts a document (by name) received over time, newest first.
+
+        The document hash shows which verdicts belong to which revision.
+        """
+        where, params = ("AND golden_hash = ?", [golden_hash]) if golden_hash else ("", [])
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, document_hash, golden_hash, verdict, confidence, success, reused, created_at "
+                f"FROM evaluations WHERE name = ? {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                (name, *params, limit)
+            ).fetchall()
+        return [
+            {**dict(row), "success": bool(row["success"]), "reused": bool(row["reused"])}
+            for row in rows
+        ]
+
+
+def build_result_store(settings) -> Optional[ResultStore]:
+    """Create the result store from the config, or None when it is disabled."""
+    if not settings.result_store_enabled:
+        return None
+    return ResultStore(settings.result_store_path)
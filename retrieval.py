@@ -0,0 +1,186 @@
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from chunking import iter_sections
+from golden import GoldenStandard, Requirement, normalize_text, tokenize
+
+# Width of the hashed feature space; collisions only blur rare n-grams together
+EMBEDDING_DIM = 4096
+
+# Cosine similarity below which a passage doesn't count as evidence for a requirement
+MIN_SCORE = 0.1
+
+# Documents whose passage vectors are kept, so a document judged against
+# several standards (or re-judged) is only embedded once
+MAX_INDEXED_DOCUMENTS = 16
+
+
+def _features(text: str) -> List[str]:
+    """Word unigrams and bigrams plus character trigrams of each word."""
+    words = tokenize(text)
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def embed(texts: List[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Hashed n-gram vectors for ``texts``, one unit-length row per text.
+
+    Each feature is hashed (CRC32, so vectors are the same in every process)
+    into one of ``dim`` columns with a sign taken from the hash, which keeps
+    collisions from adding up. Texts without words get a zero row.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        features = _features(text)
+        if not features:
+            continue
+        hashes = np.array([zlib.crc32(feature.encode("utf-8")) for feature in features], dtype=np.uint64)
+        signs = np.where(hashes & np.uint64(1 << 31), -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors[row], (hashes % np.uint64(dim)).astype(np.int64), signs)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+@dataclass(frozen=True)
+class Passage:
+    """A piece of a document, small enough to quote into a prompt."""
+    index: int
+    heading: str
+    text: str
+
+
+def split_passages(document: str, max_chars: int) -> List[Passage]:
+    """
+    Split a document into passages of at most about ``max_chars`` characters.
+
+    Sections are split on blank lines and list items, and neighbouring pieces
+    of the same section are merged up to ``max_chars``, so a passage never
+    spans two sections. Pieces longer than ``max_chars`` are cut at that length.
+    """
+    passages: List[Passage] = []
+    for section in iter_sections(normalize_text(document), max_level=6):
+        pieces: List[str] = []
+        for block in section.body.split("\n\n"):
+            lines = [line for line in block.splitlines() if line.strip()]
+            if len(block) > max_chars:
+                # Long blocks (usually lists) are split into their lines
+                pieces.extend(lines)
+            elif lines:
+                pieces.append("\n".join(lines))
+
+        current = ""
+        for piece in pieces:
+            for start in range(0, len(piece), max_chars):
+                part = piece[start:start + max_chars]
+                if current and len(current) + len(part) + 1 > max_chars:
+                    passages.append(Passage(len(passages), section.heading, current))
+                    current = ""
+                current = f"{current}\n{part}" if current else part
+        if current:
+            passages.append(Passage(len(passages), section.heading, current))
+    return passages
+
+
+@dataclass
+class DocumentIndex:
+    """A document's passages and their vectors."""
+    passages: List[Passage]
+    vectors: np.ndarray
+
+
+@lru_cache(maxsize=MAX_INDEXED_DOCUMENTS)
+def index_document(document: str, max_chars: int) -> DocumentIndex:
+    """Split and embed a document, reusing the result for text seen recently."""
+    passages = split_passages(document, max_chars)
+    # The heading is embedded with the passage since it often names the topic
+    return DocumentIndex(passages, embed([f"{p.heading}\n{p.text}" for p in passages]))
+
+
+def requirement_vectors(golden: GoldenStandard) -> np.ndarray:
+    """The golden standard's requirement vectors, computed once per standard."""
+    def _build() -> np.ndarray:
+        headings = {section.id: section.heading for section in golden.sections}
+        return embed([f"{headings[r.section_id]}\n{r.text}" for r in golden.requirements])
+    return golden.derived(("requirement_vectors", EMBEDDING_DIM), _build)
+
+
+@dataclass
+class Evidence:
+    """The passages retrieved for each requirement of the golden standard."""
+    matches: List[Tuple[Requirement, List[Tuple[Passage, float]]]]
+    document_chars: int
+    passage_count: int
+
+    @property
+    def passages(self) -> List[Passage]:
+        """Every retrieved passage once, in document order."""
+        unique = {passage.index: passage for _, found in self.matches for passage, _ in found}
+        return [unique[index] for index in sorted(unique)]
+
+    @property
+    def unmatched(self) -> List[Requirement]:
+        """Requirements no passage was similar enough to."""
+        return [requirement for requirement, found in self.matches if not found]
+
+    def summary(self) -> dict:
+        """Counts for display and the result's ``retrieval`` entry."""
+        return {
+            "passages": len(self.passages),
+            "document_passages": self.passage_count,
+            "requirements": len(self.matches),
+            "unmatched": len(self.unmatched)
+        }
+
+    def render(self) -> str:
+        """The retrieved passages, each quoted once, and which requirements they were retrieved for."""
+        lines = []
+        for passage in self.passages:
+            heading = f" ({passage.heading})" if passage.heading else ""
+            lines.append(f"[P{passage.index + 1}]{heading}\n{passage.text}")
+        parts = ["\n\n".join(lines) if lines else "(no relevant passages found)"]
+
+        requirement_lines = []
+        for requirement, found in self.matches:
+            refs = ", ".join(f"P{passage.index + 1}" for passage, _ in found) or "no matching passage found"
+            requirement_lines.append(f"- {requirement.text} -> {refs}")
+        parts.append("PASSAGES PER REQUIREMENT:\n" + "\n".join(requirement_lines))
+        return "\n\n".join(parts)
+
+
+def retrieve(golden: GoldenStandard, document: str, top_k: int, max_chars: int) -> Optional[Evidence]:
+    """
+    Find the ``top_k`` document passages most similar to each requirement.
+
+    Similarities for every requirement and passage come from one matrix
+    product over the cached requirement vectors and the document's passage
+    vectors; passages below ``MIN_SCORE`` are left out.
+
+    Returns:
+        The evidence, or None if the golden standard has no requirement bullets
+    """
+    if not golden.requirements:
+        return None
+    index = index_document(document, max_chars)
+    if not index.passages:
+        return Evidence([(requirement, []) for requirement in golden.requirements], len(document), 0)
+
+    scores = requirement_vectors(golden) @ index.vectors.T
+    k = min(top_k, len(index.passages))
+    top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    matches = []
+    for row, requirement in enumerate(golden.requirements):
+        found = [
+            (index.passages[column], float(scores[row, column]))
+            for column in top[row] if scores[row, column] >= MIN_SCORE
+        ]
+        matches.append((requirement, found))
+    return Evidence(matches, len(document), len(index.passages))
@@ -0,0 +1,247 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from client_pool import client_pool
+from metrics import evaluation_metrics
+from rate_limiter import ProviderLimiter, error_status, get_limiter, is_retryable, retry_after
+
+ROUTING_STRATEGIES = ("weighted", "least_latency")
+
+# Smoothing factor for the per-backend latency average
+LATENCY_ALPHA = 0.3
+
+
+def should_fail_over(error: BaseException) -> bool:
+    """
+    Errors that another backend might not hit: throttling, outages, dropped
+    connections, and rejected keys (401/403 are specific to one account).
+    """
+    return is_retryable(error) or error_status(error) in (401, 403)
+
+
+class NoHealthyBackend(RuntimeError):
+    """Raised when every backend has failed and the retry budget is spent."""
+
+
+class Backend:
+    """One provider account and model that evaluations can be routed to, with its health."""
+
+    def __init__(
+        self,
+        name: str,
+        provider: str,
+        model: str,
+        llm: Any,
+        weight: float = 1.0,
+        limits: Optional[Dict[str, float]] = None
+    ):
+        self.name = name
+        self.provider = provider
+        self.model = model
+        self.llm = llm
+        self.weight = weight
+        self.limits = limits or {}
+
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.stats = {"calls": 0, "failures": 0}
+
+    def __repr__(self) -> str:
+        return f"Backend({self.name!r}, {self.provider}/{self.model})"
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def limiter(self) -> ProviderLimiter:
+        """This backend's own quota and concurrency limit on the running loop."""
+        return get_limiter(self.provider, self.name, self.limits)
+
+
+class Router:
+    """
+    Spread LLM calls over several backends and fail over when one goes down.
+
+    ``weighted`` picks healthy backends at random in proportion to their
+    weights; ``least_latency`` picks the one with the lowest expected wait
+    (smoothed latency times calls already in flight), trying unmeasured
+    backends first. A backend that throttles, errors or rejects its key is
+    taken out of rotation for its Retry-After period or an exponentially
+    growing cool-down, and the call moves on to the next backend.
+    """
+
+    def __init__(
+        self,
+        backends: Iterable[Backend],
+        strategy: str = "weighted",
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        seed: Optional[int] = None
+    ):
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unsupported routing strategy: {strategy}")
+        self.backends: List[Backend] = list(backends)
+        if not self.backends:
+            raise ValueError("A router needs at least one backend")
+        self.strategy = strategy
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+
+    def choose(self, exclude: Iterable[str] = ()) -> Optional[Backend]:
+        """Pick a healthy backend not in ``exclude``, or None if there isn't one."""
+        excluded = set(exclude)
+        candidates = [b for b in self.backends if b.healthy and b.name not in excluded]
+        if not candidates:
+            return None
+        if self.strategy == "least_latency":
+            return min(candidates, key=lambda b: (b.latency or 0.0) * (b.in_flight + 1))
+        return self._random.choices(candidates, weights=[b.weight for b in candidates])[0]
+
+    def record_success(self, backend: Backend, latency: float):
+        backend.failures = 0
+        backend.stats["calls"] += 1
+        if backend.latency is None:
+            backend.latency = latency
+        else:
+            backend.latency += LATENCY_ALPHA * (latency - backend.latency)
+        evaluation_metrics.backend_calls.inc(backend=backend.name, outcome="success")
+
+    def record_failure(self, backend: Backend, error: BaseException):
+        """Take a backend out of rotation for a while after a failover-worthy error."""
+        backend.failures += 1
+        backend.stats["calls"] += 1
+        backend.stats["failures"] += 1
+        cooldown = retry_after(error)
+        if cooldown is None:
+            cooldown = min(self.max_delay, self.base_delay * (2 ** (backend.failures - 1)))
+        backend.unhealthy_until = max(backend.unhealthy_until, time.monotonic() + cooldown)
+        evaluation_metrics.backend_calls.inc(backend=backend.name, outcome="failure")
+
+    def next_recovery(self) -> float:
+        """Seconds until the first unhealthy backend comes back (0 if one is healthy)."""
+        now = time.monotonic()
+        return max(0.0, min(b.unhealthy_until for b in self.backends) - now)
+
+    async def wait_for_backend(self, attempt: int, error: Optional[BaseException]):
+        """
+        Wait after every backend has been tried, or raise once retries run out.
+
+        Sleeps until the first backend recovers from its cool-down.
+        """
+        if attempt >= self.max_retries:
+            raise NoHealthyBackend(f"All LLM backends failed; last error: {error}") from error
+        await asyncio.sleep(min(self.max_delay, self.next_recovery()))
+
+    @asynccontextmanager
+    async def use(self, backend: Backend, estimated_tokens: float = 0) -> AsyncIterator[Backend]:
+        """Hold a slot on ``backend`` for one call and update its health from the outcome."""
+        async with backend.limiter.slot(estimated_tokens):
+            backend.in_flight += 1
+            started = time.perf_counter()
+            try:
+                yield backend
+            except Exception as e:
+                if should_fail_over(e):
+                    self.record_failure(backend, e)
+                raise
+            else:
+                self.record_success(backend, time.perf_counter() - started)
+            finally:
+                backend.in_flight -= 1
+
+    async def call(
+        self,
+        fn: Callable[[Backend], Awaitable[Any]],
+        estimated_tokens: float = 0
+    ) -> Tuple[Backend, Any]:
+        """
+        Run ``fn`` on a chosen backend, failing over to the others on errors.
+
+        Args:
+            fn: Called with the chosen backend; returns a fresh awaitable per attempt
+            estimated_tokens: Tokens the request is expected to consume
+
+        Returns:
+            The backend that succeeded and what ``fn`` returned
+        """
+        tried: List[str] = []
+        attempt = 0
+        error: Optional[BaseException] = None
+        while True:
+            backend = self.choose(tried)
+            if backend is None:
+                # Every backend failed this round: wait for one to recover, then try all again
+                await self.wait_for_backend(attempt, error)
+                attempt += 1
+                tried = []
+                continue
+
+            try:
+                async with self.use(backend, estimated_tokens):
+                    return backend, await fn(backend)
+            except Exception as e:
+                if not should_fail_over(e):
+                    raise
+                tried.append(backend.name)
+                error = e
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Health and latency of every backend, for display."""
+        return [
+            {
+                "backend": b.name,
+                "provider": b.provider,
+                "model": b.model,
+                "weight": b.weight,
+                "healthy": b.healthy,
+                "latency_ms": round(b.latency * 1000, 1) if b.latency is not None else None,
+                "in_flight": b.in_flight,
+                "calls": b.stats["calls"],
+                "failures": b.stats["failures"]
+            }
+            for b in self.backends
+        ]
+
+
+def build_router(
+    backends: List[Dict[str, Any]],
+    strategy: str,
+    temperature: float,
+    max_tokens: int,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0
+) -> Router:
+    """Create a router over the configured backends, with chat models from the shared pool."""
+    return Router(
+        [
+            Backend(
+                name=backend["name"],
+                provider=backend["provider"],
+                model=backend["model"],
+                llm=client_pool.get_llm(
+                    provider=backend["provider"],
+                    model=backend["model"],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    api_key=backend["api_key"]
+                ),
+                weight=backend.get("weight", 1.0),
+                limits=backend.get("limits")
+            )
+            for backend in backends
+        ],
+        strategy=strategy,
+        max_retries=max_retries,
+        base_delay=base_delay,
+        max_delay=max_delay
+    )
@@ -7,6 +7,7 @@ setup(
     name="docu-judge",
     version="0.1.0",
     packages=find_packages(),
+    py_modules=["app", "cli", "config", "llm_service", "cache", "chunking", "prefilter", "client_pool", "rate_limiter", "jobs", "fake_llm", "metrics", "parsing", "golden", "tokens", "router", "ingest", "result_store", "diffing", "retrieval", "replay"],
     install_requires=requirements,
     python_requires=">=3.8",
     author="Pritam Nikam",
@@ -22,7 +23,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'docu-judge=app:main',
+            'docu-judge=cli:main',
         ],
     },
     include_package_data=True,
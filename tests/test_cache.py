@@ -0,0 +1,163 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cache
+from cache import MemoryCache, SQLiteCache, ResultCache, make_cache_key
+
+RESULT = {
+    "verdict": "Pass",
+    "confidence": 0.9,
+    "explanation": "Meets the standard.",
+    "success": True,
+    "error": None
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "time", fake)
+    return fake
+
+
+class TestCacheKey:
+    def test_key_is_stable(self):
+        args = ("golden", "doc", "openai", "gpt-4", 0.3, "1")
+        assert make_cache_key(*args) == make_cache_key(*args)
+
+    @pytest.mark.parametrize("changed", [
+        ("other", "doc", "openai", "gpt-4", 0.3, "1"),
+        ("golden", "other", "openai", "gpt-4", 0.3, "1"),
+        ("golden", "doc", "groq", "gpt-4", 0.3, "1"),
+        ("golden", "doc", "openai", "gpt-3.5-turbo", 0.3, "1"),
+        ("golden", "doc", "openai", "gpt-4", 0.5, "1"),
+        ("golden", "doc", "openai", "gpt-4", 0.3, "2"),
+    ])
+    def test_any_input_changes_key(self, changed):
+        assert make_cache_key(*changed) != make_cache_key("golden", "doc", "openai", "gpt-4", 0.3, "1")
+
+
+class TestMemoryCache:
+    def test_evicts_least_recently_used(self):
+        memory = MemoryCache(max_entries=2)
+        memory.set("a", RESULT)
+        memory.set("b", RESULT)
+        memory.get("a")
+        memory.set("c", RESULT)
+
+        assert memory.get("a") == RESULT
+        assert memory.get("b") is None
+        assert memory.get("c") == RESULT
+
+    def test_expires_after_ttl(self, clock):
+        memory = MemoryCache(ttl=60)
+        memory.set("a", RESULT)
+
+        clock.now += 59
+        assert memory.get("a") == RESULT
+        clock.now += 2
+        assert memory.get("a") is None
+
+
+class TestSQLiteCache:
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        SQLiteCache(path).set("a", RESULT)
+
+        assert SQLiteCache(path).get("a") == RESULT
+
+    def test_expires_after_ttl(self, tmp_path, clock):
+        disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+        disk.set("a", RESULT)
+
+        clock.now += 61
+        assert disk.get("a") is None
+
+    def test_enforces_size_limit(self, tmp_path, clock):
+        disk = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+        for key in ("a", "b", "c"):
+            clock.now += 1
+            disk.set(key, RESULT)
+
+        assert disk.get("a") is None
+        assert disk.get("c") == RESULT
+
+
+class TestResultCache:
+    def test_backfills_faster_tiers_and_counts(self, tmp_path):
+        memory = MemoryCache()
+        disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        disk.set("a", RESULT)
+        tiered = ResultCache([memory, disk])
+
+        assert tiered.get("missing") is None
+        assert tiered.get("a") == RESULT
+        assert memory.get("a") == RESULT
+        assert tiered.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+    @pytest.mark.asyncio
+    async def test_async_access_runs_disk_tiers_in_executor(self, tmp_path, monkeypatch):
+        memory = MemoryCache()
+        disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        tiered = ResultCache([memory, disk])
+        loop = asyncio.get_running_loop()
+        offloaded = []
+        run_in_executor = loop.run_in_executor
+
+        def spy(executor, func, *args):
+            offloaded.append(func)
+            return run_in_executor(executor, func, *args)
+
+        monkeypatch.setattr(loop, "run_in_executor", spy)
+
+        await tiered.aset("a", RESULT)
+        memory.clear()
+        assert await tiered.aget("a") == RESULT
+        assert await tiered.aget("missing") is None
+
+        assert memory.get("a") == RESULT
+        assert offloaded == [disk.set, disk.get, disk.get]
+        assert tiered.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+class TestEvaluateDocumentCaching:
+    @pytest.mark.asyncio
+    async def test_repeat_evaluation_skips_llm(self, monkeypatch):
+        from llm_service import LLMService
+
+        response = MagicMock()
+        response.content = "VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Good"
+        llm = MagicMock()
+        calls = []
+
+        async def ainvoke(messages):
+            calls.append(messages)
+            return response
+
+        llm.ainvoke = ainvoke
+        service = LLMService()
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", ResultCache([MemoryCache()]))
+
+        first = await service.evaluate_document("golden", "cached document")
+        second = await service.evaluate_document("golden", "cached document")
+
+        assert len(calls) == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["verdict"] == "Pass"
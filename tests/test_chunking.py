@@ -0,0 +1,73 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chunking import iter_sections, match_sections, heading_keywords
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+
+def read_example(name: str) -> str:
+    with open(os.path.join(EXAMPLES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestIterSections:
+    def test_splits_on_level_two_headings(self):
+        sections = list(iter_sections(read_example("golden_standard.md")))
+
+        assert [s.heading for s in sections] == [
+            "Project Requirements", "Core Features", "Security Requirements", "Performance", "Documentation"
+        ]
+        assert sections[0].body == ""
+        assert "- Rate limiting" in sections[2].body
+
+    def test_accepts_line_iterables(self):
+        path = os.path.join(EXAMPLES_DIR, "golden_standard.md")
+        with open(path, encoding="utf-8") as f:
+            streamed = list(iter_sections(f))
+
+        assert streamed == list(iter_sections(read_example("golden_standard.md")))
+
+    def test_keeps_deeper_headings_and_code_blocks_in_section(self):
+        text = "## API\nintro\n### Auth\ntoken\n```\n## not a heading\n```\n## Next\nbody"
+        sections = list(iter_sections(text))
+
+        assert [s.heading for s in sections] == ["API", "Next"]
+        assert "### Auth" in sections[0].body
+        assert "## not a heading" in sections[0].body
+
+    def test_keeps_preamble(self):
+        sections = list(iter_sections("preamble text\n## Heading\nbody"))
+
+        assert sections[0].heading == ""
+        assert sections[0].body == "preamble text"
+
+
+class TestMatchSections:
+    def test_heading_keywords_ignore_filler(self):
+        assert heading_keywords("Security Requirements") == heading_keywords("Security")
+
+    def test_matches_example_documents(self):
+        golden = list(iter_sections(read_example("golden_standard.md")))
+        document = list(iter_sections(read_example("document1.md")))
+
+        pairs = {g.heading: [d.heading for d in docs] for g, docs in match_sections(golden, document)}
+
+        assert pairs == {
+            "Core Features": ["Main Features"],
+            "Security Requirements": ["Security"],
+            "Performance": ["Performance Targets"],
+            "Documentation": ["Documentation"],
+        }
+
+    def test_unmatched_golden_section_falls_back_to_unclaimed(self):
+        golden = list(iter_sections("## Security\n- hashing\n## Licensing\n- MIT"))
+        document = list(iter_sections("## Security\n- hashed\n## Legal\n- MIT licensed"))
+
+        pairs = {g.heading: [d.heading for d in docs] for g, docs in match_sections(golden, document)}
+
+        assert pairs == {"Security": ["Security"], "Licensing": ["Legal"]}
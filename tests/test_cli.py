@@ -0,0 +1,149 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cli
+from llm_service import llm_service
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        response = MagicMock()
+        response.content = "VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Good"
+        return response
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = CountingLLM()
+    monkeypatch.setitem(llm_service.__dict__, "llm", fake)
+    monkeypatch.setattr(llm_service, "cache", None)
+    return fake
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    golden = tmp_path / "golden.md"
+    golden.write_text("# Standard\n- Item 1\n")
+    docs = tmp_path / "docs"
+    (docs / "nested").mkdir(parents=True)
+    (docs / "a.md").write_text("# A\n- Item 1\n")
+    (docs / "b.txt").write_text("# B\n- Item 2\n")
+    (docs / "nested" / "c.md").write_text("# C\n- Item 1\n")
+    (docs / "empty.md").write_text("")
+    (docs / "image.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+class TestDocumentDiscovery:
+    def test_walks_directories_and_globs(self, corpus):
+        docs = str(corpus / "docs")
+
+        from_dir = list(cli.iter_document_paths([docs]))
+        from_glob = list(cli.iter_document_paths([os.path.join(docs, "**", "*.md")]))
+
+        assert [os.path.relpath(p, docs) for p in from_dir] == [
+            "a.md", "b.txt", "empty.md", os.path.join("nested", "c.md")
+        ]
+        assert {os.path.basename(p) for p in from_glob} == {"a.md", "empty.md", "c.md"}
+
+    def test_reads_latin1_files(self, tmp_path):
+        path = tmp_path / "latin.md"
+        path.write_bytes("café".encode("latin-1"))
+
+        assert cli.read_text(str(path)) == "café"
+
+
+class TestMain:
+    def test_writes_jsonl_and_resumes(self, corpus, llm):
+        output = str(corpus / "results.jsonl")
+        argv = [str(corpus / "golden.md"), str(corpus / "docs"), "-o", output, "-q"]
+
+        assert cli.main(argv) == 0
+        with open(output) as f:
+            rows = [json.loads(line) for line in f]
+        assert len(rows) == 3
+        assert {row["verdict"] for row in rows} == {"Pass"}
+        assert llm.calls == 3
+
+        # A second run finds every document already done
+        assert cli.main(argv) == 0
+        assert llm.calls == 3
+
+    def test_resume_skips_truncated_last_line(self, corpus, llm):
+        output = corpus / "results.jsonl"
+        done = str(corpus / "docs" / "a.md")
+        row = {"document": done, "verdict": "Pass", "success": True}
+        # A run killed mid-write leaves a partial row without a newline
+        output.write_text(json.dumps(row) + "\n" + '{"document": "' + str(corpus / "docs" / "b.txt"))
+
+        assert cli.completed_documents(str(output), "jsonl") == {done}
+        assert cli.main([str(corpus / "golden.md"), str(corpus / "docs"), "-o", str(output), "-q"]) == 0
+
+        assert llm.calls == 2
+        lines = output.read_text().splitlines()
+        assert len(lines) == 4
+        assert [json.loads(line)["success"] for line in lines[2:]] == [True, True]
+
+    def test_resume_retries_failed_documents(self, corpus, llm):
+        output = corpus / "results.csv"
+        done = str(corpus / "docs" / "a.md")
+        failed = str(corpus / "docs" / "b.txt")
+        output.write_text(
+            "document,verdict,confidence,explanation,method,cached,success,error\n"
+            f"{done},Pass,0.9,Good,llm,False,True,\n"
+            f"{failed},Error,0.0,boom,llm,False,False,boom\n"
+        )
+
+        assert cli.main([str(corpus / "golden.md"), str(corpus / "docs"), "-o", str(output), "-q"]) == 0
+
+        assert llm.calls == 2
+        assert cli.completed_documents(str(output), "csv") == {
+            done, failed, str(corpus / "docs" / "nested" / "c.md")
+        }
+
+    def test_skips_oversized_documents(self, corpus, llm, monkeypatch):
+        from config import config
+        monkeypatch.setattr(config, "max_document_bytes", 50)
+        (corpus / "docs" / "big.md").write_text("# Big\n" + "x" * 100)
+        output = str(corpus / "results.jsonl")
+
+        assert cli.main([str(corpus / "golden.md"), str(corpus / "docs"), "-o", output, "-q"]) == 0
+
+        with open(output) as f:
+            assert not any("big.md" in line for line in f)
+        assert llm.calls == 3
+
+    @pytest.mark.parametrize("argv, model", [
+        (["--provider", "groq"], "mixtral-8x7b-32768"),
+        (["--provider", "openai"], "gpt-3.5-turbo"),
+        (["--provider", "groq", "--model", "llama3-8b-8192"], "llama3-8b-8192"),
+    ])
+    def test_provider_without_model_uses_a_model_of_that_provider(self, corpus, monkeypatch, argv, model):
+        from config import config
+        monkeypatch.setattr(config, "llm_provider", "openai")
+        monkeypatch.setattr(config, "llm_model", "gpt-3.5-turbo")
+        update_config = MagicMock()
+        monkeypatch.setattr(llm_service, "update_config", update_config)
+
+        assert cli.main([str(corpus / "golden.md"), str(corpus / "docs"), "--estimate", *argv]) == 0
+
+        assert update_config.call_args.kwargs["model"] == model
+
+    @pytest.mark.parametrize("value", ["0", "-2"])
+    def test_rejects_non_positive_max_concurrency(self, corpus, llm, capsys, value):
+        with pytest.raises(SystemExit) as exit_info:
+            cli.main([str(corpus / "golden.md"), str(corpus / "docs"), "--max-concurrency", value])
+
+        assert exit_info.value.code == 2
+        assert "--max-concurrency must be at least 1" in capsys.readouterr().err
+        assert llm.calls == 0
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client_pool import AsyncRunner, ClientPool
+from config import LLMProvider
+
+
+@pytest.fixture(scope="module")
+def runner():
+    return AsyncRunner()
+
+
+class TestAsyncRunner:
+    def test_reuses_one_loop_across_calls(self, runner):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert runner.run(current_loop()) is runner.run(current_loop()) is runner.loop
+
+    def test_iterate_yields_items_in_calling_thread(self, runner):
+        async def numbers():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield i, threading.current_thread().name
+
+        items = list(runner.iterate(numbers()))
+
+        assert [i for i, _ in items] == [0, 1, 2]
+        assert all(name == "docu-judge-loop" for _, name in items)
+
+    def test_iterate_propagates_errors(self, runner):
+        async def failing():
+            yield 1
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(runner.iterate(failing()))
+
+    def test_closing_early_cancels_producer(self, runner):
+        finished = threading.Event()
+
+        async def endless():
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield 1
+            finally:
+                finished.set()
+
+        items = runner.iterate(endless())
+        next(items)
+        items.close()
+
+        assert finished.wait(timeout=2)
+
+
+class TestClientPool:
+    def test_reuses_clients_for_identical_settings(self):
+        pool = ClientPool()
+
+        first = pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.3, 2000, "sk-test")
+        second = pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.3, 2000, "sk-test")
+
+        assert first is second
+
+    def test_shares_connection_pool_per_provider_and_key(self):
+        pool = ClientPool()
+
+        pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.3, 2000, "sk-test")
+        pool.get_llm(LLMProvider.OPENAI, "gpt-3.5-turbo", 0.3, 2000, "sk-test")
+        pool.get_llm(LLMProvider.GROQ, "mixtral-8x7b-32768", 0.3, 2000, "gsk-test")
+
+        assert len(pool._http_clients) == 2
+        assert pool.get_http_client(LLMProvider.OPENAI, "sk-test") is pool.get_http_client("openai", "sk-test")
+
+    def test_evicts_least_recently_used_clients(self):
+        pool = ClientPool(max_clients=2)
+
+        first = pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.1, 2000, "sk-test")
+        pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.2, 2000, "sk-test")
+        pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.3, 2000, "sk-test")
+
+        assert pool.get_llm(LLMProvider.OPENAI, "gpt-4", 0.1, 2000, "sk-test") is not first
+
+    def test_rejects_unknown_provider(self):
+        with pytest.raises(ValueError):
+            ClientPool().get_llm("anthropic", "model", 0.3, 2000, "key")
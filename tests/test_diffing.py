@@ -0,0 +1,153 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import config
+from diffing import diff_document
+from fake_llm import FakeChatModel
+from golden import GoldenStandard
+from llm_service import LLMService
+
+GOLDEN = """# Service Spec
+
+## Security Requirements
+- All traffic must use TLS 1.2 or later
+- Passwords are hashed with bcrypt
+- Sessions expire after 15 minutes
+
+## Logging
+- Logs are retained for 30 days
+- Logs never contain passwords
+
+## Operations
+Deployments happen on weekdays.
+- Backups run nightly
+"""
+
+REVISION = """# Service Spec
+
+## Security
+- All traffic must use TLS 1.3 or later
+- Passwords are hashed with bcrypt
+
+## Logging
+- Logs never contain passwords
+- logs are retained for 30 days
+- Logs are shipped to the SIEM
+
+## Operations
+Deployments happen on any day.
+- Backups run nightly
+
+## Roadmap
+Single sign-on is planned for Q3.
+"""
+
+
+class TestDiffDocument:
+    def test_sections_and_bullets(self):
+        diff = diff_document(GoldenStandard(GOLDEN), REVISION)
+        security, logging, operations = (diff.section(h) for h in ("Security Requirements", "Logging", "Operations"))
+
+        assert security.document_headings == ["Security"]
+        assert security.changed == [("All traffic must use TLS 1.2 or later", "All traffic must use TLS 1.3 or later")]
+        assert security.missing == ["Sessions expire after 15 minutes"]
+        assert security.unchanged == 1
+        # Reordering and case don't count as changes
+        assert (logging.missing, logging.changed, logging.extra) == ([], [], ["Logs are shipped to the SIEM"])
+        assert operations.prose == ["- Deployments happen on weekdays.", "+ Deployments happen on any day."]
+        assert [s.heading for s in diff.extra_sections] == ["Roadmap"]
+        assert diff.coverage == 1.0
+        assert diff.summary() == {
+            "missing": 1, "changed": 1, "added": 1,
+            "missing_sections": 0, "extra_sections": 1, "unchanged_sections": 1
+        }
+
+    def test_render_lists_only_differences(self):
+        rendered = diff_document(GoldenStandard(GOLDEN), REVISION).render()
+
+        assert "MISSING: Sessions expire after 15 minutes" in rendered
+        assert '"Security"' in rendered
+        assert "Roadmap - NOT IN THE GOLDEN STANDARD\nSingle sign-on is planned for Q3." in rendered
+        assert "Passwords are hashed with bcrypt" not in rendered
+        assert "UNCHANGED SECTIONS: Service Spec" in rendered
+
+    def test_missing_sections_and_coverage(self):
+        diff = diff_document(GoldenStandard(GOLDEN), "## Logging\n- Logs are retained for 30 days")
+
+        assert diff.section("Security Requirements").absent
+        assert diff.section("Security Requirements").missing[0] == "All traffic must use TLS 1.2 or later"
+        assert diff.coverage == pytest.approx(1 / 3)
+        assert diff.summary()["missing_sections"] == 3  # the title section as well
+
+    def test_identical_ignores_whitespace(self):
+        diff = diff_document(GoldenStandard(GOLDEN), GOLDEN.replace("\n", "  \r\n"))
+        assert diff.identical
+        assert diff.render() == "UNCHANGED SECTIONS: Service Spec; Security Requirements; Logging; Operations"
+
+
+class RecordingFakeLLM(FakeChatModel):
+    def __init__(self):
+        super().__init__(latency=0, seed=0)
+        self.prompts = []
+
+    def _respond(self, messages):
+        self.prompts.append("\n".join(m.content for m in messages))
+        return "VERDICT: Fail\nCONFIDENCE: 0.9\nEXPLANATION: A requirement was dropped."
+
+
+class TestDiffMode:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", RecordingFakeLLM())
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setattr(config, "diff_mode", True)
+        monkeypatch.setattr(config, "diff_min_coverage", 0.5)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_revision_is_judged_from_its_diff(self, service):
+        # A long, mostly compliant revision
+        unchanged = "".join(f"\n## Area {i}\n- Component {i} is monitored\n- Component {i} has an owner\n" for i in range(20))
+        golden, revision = GOLDEN + unchanged, REVISION + unchanged
+
+        result = await service.evaluate_document(golden, revision)
+
+        prompt = service.llm.prompts[0]
+        assert "MISSING: Sessions expire after 15 minutes" in prompt
+        assert "Passwords are hashed with bcrypt" not in prompt
+        assert "Component 3 is monitored" not in prompt
+        full_prompt = service._build_messages(GoldenStandard(golden), revision)
+        assert len(prompt) < sum(len(m.content) for m in full_prompt) / 2
+        assert (result["verdict"], result["method"]) == ("Fail", "diff")
+        assert result["diff"]["missing"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_revision_passes_without_a_call(self, service):
+        result = await service.evaluate_document(GOLDEN, GOLDEN + "\n")
+
+        assert service.llm.prompts == []
+        assert (result["verdict"], result["confidence"], result["method"]) == ("Pass", 1.0, "diff")
+
+    @pytest.mark.asyncio
+    async def test_unrelated_document_is_evaluated_in_full(self, service):
+        document = "# Marketing Plan\n\n## Channels\n- Social media"
+        result = await service.evaluate_document(GOLDEN, document)
+
+        assert "GOLDEN STANDARD:" in service.llm.prompts[0]
+        assert "Social media" in service.llm.prompts[0]
+        assert result.get("method", "llm") == "llm"
+
+    @pytest.mark.asyncio
+    async def test_off_by_default(self, service, monkeypatch):
+        monkeypatch.setattr(config, "diff_mode", False)
+        result = await service.evaluate_document(GOLDEN, REVISION)
+
+        assert "GOLDEN STANDARD:" in service.llm.prompts[0]
+        assert "diff" not in result
@@ -0,0 +1,65 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.schema import HumanMessage
+
+from benchmarks.bench_llm_service import percentile, run_scenario
+from fake_llm import FakeChatModel, FakeLLMError
+from llm_service import LLMService
+
+
+class TestFakeChatModel:
+    def test_latency_distributions_have_requested_mean(self):
+        for distribution in ("constant", "uniform", "exponential", "lognormal"):
+            model = FakeChatModel(latency=0.1, distribution=distribution, seed=1)
+            samples = [model.sample_latency() for _ in range(5000)]
+            assert sum(samples) / len(samples) == pytest.approx(0.1, rel=0.1)
+
+    def test_rejects_unknown_distribution(self):
+        with pytest.raises(ValueError):
+            FakeChatModel(distribution="pareto")
+
+    @pytest.mark.asyncio
+    async def test_response_parses_and_reports_usage(self):
+        model = FakeChatModel(latency=0, output_tokens=42, seed=0)
+        response = await model.ainvoke([HumanMessage(content="x" * 400)])
+
+        result = LLMService()._parse_response(response.content)
+        assert result["verdict"] in ("Pass", "Fail")
+        assert response.response_metadata["token_usage"]["prompt_tokens"] == 100
+        assert response.response_metadata["token_usage"]["completion_tokens"] == 42
+
+    @pytest.mark.asyncio
+    async def test_errors_carry_status_code(self):
+        model = FakeChatModel(latency=0, error_rate=1.0, error_status=429)
+        with pytest.raises(FakeLLMError) as exc_info:
+            await model.ainvoke([HumanMessage(content="doc")])
+        assert exc_info.value.status_code == 429
+        assert model.errors == 1
+
+
+class TestBenchmark:
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 95) == 0.0
+
+    @pytest.mark.parametrize("mode", ["batch", "document", "stream"])
+    def test_scenario_reports_metrics(self, mode):
+        scenario = run_scenario({
+            "mode": mode, "documents": 8, "latency": 0, "distribution": "constant", "jitter": 0,
+            "error_rate": 0, "error_status": 500, "output_tokens": 10, "doc_chars": 500,
+            "max_concurrency": 4, "documents_per_call": 1, "max_retries": 0, "retry_base_delay": 0,
+            "cache": False, "prefilter": False, "seed": 0
+        })
+
+        assert scenario["llm_calls"] == 8
+        assert scenario["errors"] == 0
+        assert scenario["docs_per_sec"] > 0
+        assert set(scenario["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+        assert scenario["peak_rss_mb"] > 0
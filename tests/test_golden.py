@@ -0,0 +1,89 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from golden import GoldenStandard, as_golden_standard, load_golden_standard, normalize_text
+from llm_service import LLMService
+from prefilter import score_documents
+
+GOLDEN = """# Product Spec
+
+Intro text.
+
+## Security Requirements
+- All traffic must use TLS
+- Passwords are hashed with bcrypt
+
+## Logging
+- Logs are retained for 30 days
+- Logs are retained for 30 days
+"""
+
+
+class TestGoldenStandard:
+    def test_sections_and_requirements(self):
+        golden = GoldenStandard(GOLDEN)
+
+        assert [s.id for s in golden.sections] == ["product-spec", "security-requirements", "logging"]
+        assert [r.text for r in golden.section("security-requirements").requirements] == [
+            "All traffic must use TLS", "Passwords are hashed with bcrypt"
+        ]
+        assert len(golden.requirements) == 4
+        assert golden.token_count > 0
+        assert all(s.token_count > 0 for s in golden.sections)
+
+    def test_requirement_ids_are_stable_and_unique(self):
+        golden = GoldenStandard(GOLDEN)
+        edited = GoldenStandard(GOLDEN.replace(
+            "- All traffic must use TLS", "- Sessions expire after 15 minutes\n- All traffic must use TLS"
+        ))
+
+        ids = [r.id for r in golden.requirements]
+        assert len(set(ids)) == len(ids)
+        # Adding a requirement doesn't renumber the others
+        assert set(ids) <= {r.id for r in edited.requirements}
+
+    def test_normalized_text_ignores_whitespace_noise(self):
+        noisy = GOLDEN.replace("\n", "  \r\n").replace("Intro text.", "Intro text.\n\n\n")
+        assert normalize_text(noisy) == normalize_text(GOLDEN)
+        assert GoldenStandard(noisy).content_hash == GoldenStandard(GOLDEN).content_hash
+
+    def test_load_reuses_parsed_object(self):
+        golden = load_golden_standard(GOLDEN)
+        assert load_golden_standard(GOLDEN + "\n\n") is golden
+        assert as_golden_standard(golden) is golden
+        assert load_golden_standard(GOLDEN + "\n- extra") is not golden
+
+    def test_derived_values_are_built_once(self):
+        golden = GoldenStandard(GOLDEN)
+        calls = []
+        for _ in range(3):
+            golden.derived("key", lambda: calls.append(1) or len(calls))
+        assert calls == [1]
+
+
+class TestSharedUse:
+    def test_prefilter_scores_match_for_text_and_parsed(self):
+        documents = [GOLDEN, "## Logging\n- Logs are retained for 30 days", "unrelated"]
+        from_text = score_documents(GOLDEN, documents)["score"]
+        from_parsed = score_documents(load_golden_standard(GOLDEN), documents)["score"]
+        assert list(from_text) == pytest.approx(list(from_parsed))
+
+    def test_prompt_prefix_is_built_once_per_standard(self):
+        service = LLMService()
+        golden = GoldenStandard(GOLDEN)
+
+        first = service._build_messages(golden, "doc one")[0]
+        second = service._build_messages(golden, "doc two")[0]
+
+        assert first is second
+        assert golden.text in first.content
+
+    def test_cache_key_uses_content_not_formatting(self):
+        service = LLMService()
+        assert service._cache_key(GoldenStandard(GOLDEN), "doc") == service._cache_key(
+            GoldenStandard(GOLDEN.replace("\n", "\r\n")), "doc"
+        )
@@ -0,0 +1,88 @@
+import io
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ingest import DocumentTooLarge, iter_uploads, read_path, read_stream, read_upload
+
+
+class Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile that refuses whole-payload copies."""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+    def getvalue(self):
+        raise AssertionError("uploads must be read incrementally")
+
+
+class TestEncodingDetection:
+    @pytest.mark.parametrize("data,encoding", [
+        ("# Café ✓".encode("utf-8"), "utf-8"),
+        (b"\xef\xbb\xbf" + "# Café".encode("utf-8"), "utf-8-sig"),
+        ("# Café".encode("utf-16"), "utf-16"),
+        ("# Café".encode("latin-1"), "latin-1"),
+    ])
+    def test_detects_encoding(self, data, encoding):
+        document = read_stream(io.BytesIO(data), "doc.md")
+        assert document.encoding == encoding
+        assert document.text.startswith("# Caf")
+        assert "﻿" not in document.text
+
+    def test_multibyte_characters_split_across_chunks(self):
+        text = "é✓" * 1000
+        document = read_stream(io.BytesIO(text.encode("utf-8")), "doc.md", chunk_size=7)
+        assert document.text == text
+
+    def test_late_non_utf8_bytes_fall_back_to_latin1(self):
+        data = b"a" * 100 + "café".encode("latin-1")
+        document = read_stream(io.BytesIO(data), "doc.md", chunk_size=16)
+        assert (document.encoding, document.text) == ("latin-1", "a" * 100 + "café")
+
+
+class TestSizeLimits:
+    def test_known_size_is_rejected_before_reading(self):
+        upload = Upload("big.md", b"x" * 100)
+        with pytest.raises(DocumentTooLarge, match="100 bytes"):
+            read_upload(upload, max_bytes=50)
+        assert upload.reads == 0
+
+    def test_unknown_size_is_rejected_while_reading(self):
+        with pytest.raises(DocumentTooLarge):
+            read_stream(io.BytesIO(b"x" * 100), "stream", max_bytes=50, chunk_size=8)
+
+    def test_exactly_at_limit_is_accepted(self):
+        assert read_stream(io.BytesIO(b"x" * 50), "stream", max_bytes=50, chunk_size=8).text == "x" * 50
+
+    def test_truncate_keeps_whole_characters(self, tmp_path):
+        path = tmp_path / "doc.md"
+        path.write_bytes("ab✓cd".encode("utf-8"))
+
+        document = read_path(str(path), max_bytes=4, policy="truncate")
+
+        assert (document.text, document.truncated, document.size_bytes) == ("ab", True, 7)
+
+
+class TestIterUploads:
+    def test_reads_lazily_and_reports_skipped(self):
+        uploads = [
+            Upload("a.md", b"# A"), Upload("empty.md", b"  \n"), Upload("big.md", b"x" * 100), Upload("b.md", b"# B")
+        ]
+        skipped = []
+
+        documents = iter_uploads(uploads, max_bytes=50, skipped=skipped)
+        assert next(documents) == ("a.md", "# A")
+        assert uploads[3].reads == 0
+
+        assert list(documents) == [("b.md", "# B")]
+        assert [name for name, _ in skipped] == ["empty.md", "big.md"]
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from client_pool import AsyncRunner
+from config import config
+from jobs import JobManager, JobStore, job_fingerprint
+from llm_service import LLMService
+
+SETTINGS = {"provider": "groq", "model": "llama3-8b-8192", "temperature": 0.1, "max_tokens": 1000}
+
+
+class FakeService:
+    """Stands in for LLMService: records calls and evaluates documents after a gate opens."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.configs = []
+        self.evaluated = []
+
+    def with_settings(self, settings):
+        self.configs.append(settings)
+        return self
+
+    async def evaluate_batch(self, golden_standard, documents, max_concurrency=None, documents_per_call=None):
+        for name, content in documents:
+            while not self.gate.is_set():
+                await asyncio.sleep(0.01)
+            self.evaluated.append(name)
+            if content == "broken":
+                yield name, {"verdict": "Error", "confidence": 0.0, "explanation": "", "success": False, "error": "boom"}
+            else:
+                yield name, {"verdict": "Pass", "confidence": 0.9, "explanation": "ok", "success": True, "error": None}
+
+
+@pytest.fixture(scope="module")
+def runner():
+    return AsyncRunner()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+class TestJobManager:
+    def test_runs_job_and_persists_results(self, store, runner):
+        service = FakeService()
+        service.gate.set()
+        manager = JobManager(store, service, workers=1, runner=runner)
+
+        job_id = manager.submit("golden", [("a.md", "fine"), ("b.md", "broken")], SETTINGS)
+        job = manager.wait(job_id, timeout=5)
+
+        assert job["status"] == "completed"
+        assert (job["total"], job["completed"], job["failed"]) == (2, 2, 1)
+        results = store.results(job_id)
+        assert [name for name, _ in results] == ["a.md", "b.md"]
+        assert results[0][1]["verdict"] == "Pass"
+        assert results[1][1]["error"] == "boom"
+        assert service.configs[0]["model"] == "llama3-8b-8192"
+
+    def test_duplicate_submission_reuses_active_job(self, store, runner):
+        service = FakeService()
+        manager = JobManager(store, service, workers=1, runner=runner)
+        documents = [("a.md", "fine")]
+
+        first = manager.submit("golden", documents, SETTINGS)
+        assert manager.submit("golden", documents, SETTINGS) == first
+        assert manager.submit("golden", documents, {**SETTINGS, "model": "other"}) != first
+
+        service.gate.set()
+        manager.wait(first, timeout=5)
+        # Once finished, the same inputs start a fresh job
+        assert manager.submit("golden", documents, SETTINGS) != first
+
+    def test_resumes_unfinished_jobs_on_restart(self, tmp_path, runner):
+        path = str(tmp_path / "jobs.sqlite3")
+        store = JobStore(path)
+        documents = [("a.md", "fine"), ("b.md", "fine")]
+        job_id = store.create_job(job_fingerprint("golden", documents, SETTINGS), "golden", documents, SETTINGS)
+        store.set_status(job_id, "running")
+        store.record_result(job_id, 0, {"verdict": "Pass", "confidence": 0.9, "success": True})
+
+        service = FakeService()
+        service.gate.set()
+        manager = JobManager(JobStore(path), service, workers=1, runner=runner)
+        job = manager.wait(job_id, timeout=5)
+
+        assert job["status"] == "completed"
+        # Only the document without a stored result is evaluated again
+        assert service.evaluated == ["b.md"]
+        assert job["completed"] == 2
+
+    def test_job_store_is_used_off_the_runner_loop(self, store, runner, monkeypatch):
+        threads = []
+        for method in ("golden_standard", "pending_documents", "record_result"):
+            def spy(*args, _method=getattr(store, method)):
+                threads.append(threading.get_ident())
+                return _method(*args)
+            monkeypatch.setattr(store, method, spy)
+
+        async def loop_thread():
+            return threading.get_ident()
+
+        service = FakeService()
+        service.gate.set()
+        manager = JobManager(store, service, workers=1, runner=runner)
+        manager.wait(manager.submit("golden", [("a.md", "fine"), ("b.md", "fine")], SETTINGS), timeout=5)
+
+        assert len(threads) == 4
+        assert runner.run(loop_thread()) not in threads
+
+    def test_failed_batch_marks_job_failed(self, store, runner):
+        class BrokenService(FakeService):
+            async def evaluate_batch(self, *args, **kwargs):
+                raise RuntimeError("provider down")
+                yield
+
+        manager = JobManager(store, BrokenService(), workers=1, runner=runner)
+        job = manager.wait(manager.submit("golden", [("a.md", "x")], SETTINGS), timeout=5)
+
+        assert job["status"] == "failed"
+        assert job["error"] == "provider down"
+
+    def test_duplicate_names_keep_separate_results(self, store, runner):
+        service = FakeService()
+        service.gate.set()
+        manager = JobManager(store, service, workers=1, runner=runner)
+
+        job = manager.wait(manager.submit("golden", [("a.md", "fine"), ("a.md", "broken")], SETTINGS), timeout=5)
+
+        assert (job["completed"], job["failed"]) == (2, 1)
+        assert [(name, result["success"]) for name, result in store.results(job["id"])] == [("a.md", True), ("a.md", False)]
+
+
+class TestJobSettings:
+    def test_job_service_keeps_its_own_settings(self, monkeypatch):
+        monkeypatch.setattr(config, "diff_mode", False)
+        monkeypatch.setattr(config, "consistency_samples", 1)
+        monkeypatch.setattr(config, "retrieval_enabled", False)
+        shared = LLMService()
+
+        service = shared.with_settings({**SETTINGS, "diff_mode": True, "consistency_samples": 3})
+        # The UI changing the shared settings afterwards doesn't reach the job
+        monkeypatch.setattr(config, "diff_mode", False)
+        monkeypatch.setattr(config, "retrieval_enabled", True)
+
+        assert service is not shared
+        assert (service.config.diff_mode, service.config.consistency_samples) == (True, 3)
+        assert service.config.retrieval_enabled is False
+        assert service.current_config["model"] == "llama3-8b-8192"
+        assert service.cache is shared.cache
+        assert shared.current_config is not service.current_config
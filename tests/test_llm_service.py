@@ -1,3 +1,6 @@
+import asyncio
+import gc
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import os
@@ -121,3 +124,540 @@ class TestLLMService:
             # Assert
             assert result["verdict"] == expected_verdict
             assert result["confidence"] == expected_confidence
+
+
+class SlowLLM:
+    """Fake chat model that answers after a fixed delay and tracks concurrency."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+    
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        response = MagicMock()
+        response.content = MOCK_RESPONSE
+        return response
+
+
+class TestEvaluateBatch:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setitem(service.__dict__, "llm", SlowLLM(delay=0.05))
+        monkeypatch.setattr(service, "cache", None)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_within_limit(self, service):
+        documents = [(f"doc{i}.md", TEST_DOCUMENT) for i in range(10)]
+        
+        start = time.perf_counter()
+        results = [r async for r in service.evaluate_batch(TEST_GOLDEN_STANDARD, documents, max_concurrency=5)]
+        elapsed = time.perf_counter() - start
+        
+        assert sorted(name for name, _ in results) == sorted(name for name, _ in documents)
+        assert all(result["verdict"] == "Pass" for _, result in results)
+        assert service.llm.max_in_flight == 5
+        # Two waves of 5 rather than 10 sequential round-trips
+        assert elapsed < 10 * service.llm.delay * 0.6
+    
+    @pytest.mark.asyncio
+    async def test_pulls_documents_lazily(self, service):
+        pulled = []
+        
+        def documents():
+            for i in range(6):
+                pulled.append(i)
+                yield f"doc{i}.md", TEST_DOCUMENT
+        
+        batch = service.evaluate_batch(TEST_GOLDEN_STANDARD, documents(), max_concurrency=2)
+        await batch.__anext__()
+        assert len(pulled) <= 3
+        await batch.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_concurrency(self, service):
+        with pytest.raises(ValueError):
+            async for _ in service.evaluate_batch(TEST_GOLDEN_STANDARD, [("a.md", "x")], max_concurrency=-1):
+                pass
+
+
+class TestEvaluateMatrix:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setitem(service.__dict__, "llm", SlowLLM(delay=0.05))
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setattr(service, "store", None)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_all_pairs_share_one_pool(self, service):
+        standards = [(f"standard{i}", TEST_GOLDEN_STANDARD + f"\n- Requirement {i}") for i in range(5)]
+        documents = [(f"doc{i}.md", TEST_DOCUMENT) for i in range(2)]
+        
+        # A full collection inside the timed section would outlast a wave of calls
+        gc.collect()
+        start = time.perf_counter()
+        results = [
+            r async for r in service.evaluate_matrix(standards, iter(documents), max_concurrency=5, documents_per_call=1)
+        ]
+        elapsed = time.perf_counter() - start
+        
+        assert sorted((s, d) for s, d, _ in results) == sorted((s, d) for s, _ in standards for d, _ in documents)
+        assert service.llm.calls == 10
+        assert service.llm.max_in_flight == 5
+        # Two waves of 5 pairs rather than one half-full wave per standard
+        assert elapsed < 5 * service.llm.delay * 0.7
+    
+    @pytest.mark.asyncio
+    async def test_standards_are_interleaved(self, service):
+        standards = [("first", TEST_GOLDEN_STANDARD), ("second", TEST_GOLDEN_STANDARD + "\n- Another requirement")]
+        documents = [(f"doc{i}.md", TEST_DOCUMENT) for i in range(4)]
+        
+        matrix = service.evaluate_matrix(standards, documents, max_concurrency=2, documents_per_call=1)
+        first_two = [(await matrix.__anext__())[0] for _ in range(2)]
+        await matrix.aclose()
+        
+        assert sorted(first_two) == ["first", "second"]
+    
+    @pytest.mark.asyncio
+    async def test_zero_concurrency_is_rejected_rather_than_defaulted(self, service):
+        for run in (
+            service.evaluate_matrix([("spec", TEST_GOLDEN_STANDARD)], [("a.md", "x")], max_concurrency=0),
+            service.evaluate_batch(TEST_GOLDEN_STANDARD, [("a.md", "x")], max_concurrency=0)
+        ):
+            with pytest.raises(ValueError):
+                await run.__anext__()
+
+
+class RecordingLLM:
+    """Fake chat model that records the messages it receives."""
+    
+    def __init__(self, content: str, token_usage=None):
+        self.content = content
+        self.token_usage = token_usage or {}
+        self.calls = []
+    
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        response = MagicMock()
+        response.content = self.content
+        response.response_metadata = {"token_usage": self.token_usage}
+        return response
+
+
+class TestPromptPrefix:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_golden_standard_is_in_shared_prefix(self, service, monkeypatch):
+        llm = RecordingLLM(MOCK_RESPONSE)
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        
+        await service.evaluate_document(TEST_GOLDEN_STANDARD, "first document")
+        await service.evaluate_document(TEST_GOLDEN_STANDARD, "second document")
+        
+        first, second = llm.calls
+        assert first[0].content == second[0].content
+        assert TEST_GOLDEN_STANDARD in first[0].content
+        assert TEST_GOLDEN_STANDARD not in first[1].content
+        assert "first document" in first[1].content
+    
+    @pytest.mark.asyncio
+    async def test_usage_reports_cached_prefix_tokens(self, service, monkeypatch):
+        llm = RecordingLLM(MOCK_RESPONSE, token_usage={
+            "prompt_tokens": 1200,
+            "completion_tokens": 40,
+            "prompt_tokens_details": {"cached_tokens": 1024}
+        })
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert result["usage"]["input_tokens"] == 1200
+        assert result["usage"]["cached_input_tokens"] == 1024
+    
+    @pytest.mark.asyncio
+    async def test_multi_document_call_returns_per_document_verdicts(self, service, monkeypatch):
+        llm = RecordingLLM(
+            "DOCUMENT: 1\nVERDICT: Pass\nCONFIDENCE: 0.8\nEXPLANATION: Fine\n\n"
+            "DOCUMENT: 2\nVERDICT: Fail\nCONFIDENCE: 0.7\nEXPLANATION: Missing items",
+            token_usage={"prompt_tokens": 300, "completion_tokens": 60}
+        )
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        
+        results = await service.evaluate_documents_together(
+            TEST_GOLDEN_STANDARD, [("a.md", "doc a"), ("b.md", "doc b")]
+        )
+        
+        assert len(llm.calls) == 1
+        assert [name for name, _ in results] == ["a.md", "b.md"]
+        assert results[0][1]["verdict"] == "Pass"
+        assert results[1][1]["verdict"] == "Fail"
+        assert results[1][1]["confidence"] == 0.7
+        assert sum(r["usage"]["input_tokens"] for _, r in results) == 300
+        assert sum(r["usage"]["saved_input_tokens"] for _, r in results) > 0
+    
+    @pytest.mark.asyncio
+    async def test_multi_document_call_flags_missing_verdicts(self, service, monkeypatch):
+        llm = RecordingLLM("DOCUMENT: 1\nVERDICT: Pass\nCONFIDENCE: 0.8\nEXPLANATION: Fine")
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        
+        results = await service.evaluate_documents_together(
+            TEST_GOLDEN_STANDARD, [("a.md", "doc a"), ("b.md", "doc b")]
+        )
+        
+        assert results[0][1]["success"] is True
+        assert results[1][1]["success"] is False
+    
+    @pytest.mark.asyncio
+    async def test_batch_groups_short_documents(self, service, monkeypatch):
+        llm = RecordingLLM(
+            "DOCUMENT: 1\nVERDICT: Pass\nCONFIDENCE: 0.8\nEXPLANATION: Fine\n"
+            "DOCUMENT: 2\nVERDICT: Pass\nCONFIDENCE: 0.8\nEXPLANATION: Fine\n"
+            "DOCUMENT: 3\nVERDICT: Pass\nCONFIDENCE: 0.8\nEXPLANATION: Fine"
+        )
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        documents = [(f"doc{i}.md", f"short document {i}") for i in range(6)]
+        
+        results = [r async for r in service.evaluate_batch(
+            TEST_GOLDEN_STANDARD, documents, documents_per_call=3
+        )]
+        
+        assert len(results) == 6
+        assert len(llm.calls) == 2
+
+
+class SectionLLM:
+    """Fake chat model that fails any golden-standard section mentioning ``failing``."""
+    
+    def __init__(self, failing: str):
+        self.failing = failing
+        self.calls = []
+    
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        verdict = "Fail" if self.failing in messages[0].content else "Pass"
+        response = MagicMock()
+        response.content = f"VERDICT: {verdict}\nCONFIDENCE: 0.8\nEXPLANATION: {verdict}ed"
+        return response
+
+
+class TestChunkedEvaluation:
+    @pytest.mark.asyncio
+    async def test_evaluates_sections_and_reduces(self, monkeypatch):
+        service = LLMService()
+        llm = SectionLLM(failing="## Performance")
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", None)
+        
+        golden = "# Spec\n## Security\n- Password hashing\n## Performance\n- Page load < 2s"
+        document = "# Doc\n## Security\n- Passwords hashed\n## Performance Targets\n- Fast pages"
+        
+        result = await service.evaluate_document_chunked(golden, document)
+        
+        assert len(llm.calls) == 2
+        assert result["verdict"] == "Fail"
+        assert result["confidence"] == 0.8
+        assert [s["section"] for s in result["sections"]] == ["Security", "Performance"]
+        # Each call only carries its own section of both texts
+        security_call = next(c for c in llm.calls if "## Security" in c[0].content)
+        assert "Page load" not in security_call[0].content
+        assert "Fast pages" not in security_call[1].content
+    
+    @pytest.mark.asyncio
+    async def test_missing_section_fails_without_llm_call(self, monkeypatch):
+        service = LLMService()
+        llm = SectionLLM(failing="nothing")
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", None)
+        
+        result = await service.evaluate_document_chunked("## Security\n- hashing", "## Security\n")
+        
+        assert llm.calls == []
+        assert result["verdict"] == "Fail"
+    
+    @pytest.mark.asyncio
+    async def test_large_documents_are_chunked_automatically(self, monkeypatch):
+        service = LLMService()
+        llm = SectionLLM(failing="nothing")
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setattr("config.config.chunk_threshold_chars", 10)
+        
+        result = await service.evaluate_document("## A\n- one\n## B\n- two", "## A\n- one\n## B\n- two")
+        
+        assert len(llm.calls) == 2
+        assert result["verdict"] == "Pass"
+
+
+class TestPrefilteredBatch:
+    @pytest.mark.asyncio
+    async def test_clear_cut_documents_skip_the_llm(self, monkeypatch):
+        service = LLMService()
+        llm = RecordingLLM(MOCK_RESPONSE)
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setattr("config.config.prefilter_enabled", True)
+        
+        golden = "## Security\n- Password hashing\n- Input validation\n## Performance\n- Page load under two seconds"
+        documents = [
+            ("copy.md", golden),
+            ("cake.md", "Lemon cake: whisk flour, sugar and eggs, then bake."),
+            ("partial.md", "## Security\n- Passwords are stored hashed\n## Deployment\n- Docker image"),
+        ]
+        
+        results = dict([r async for r in service.evaluate_batch(golden, documents)])
+        
+        assert results["copy.md"]["verdict"] == "Pass"
+        assert results["copy.md"]["method"] == "prefilter"
+        assert results["cake.md"]["verdict"] == "Fail"
+        assert results["cake.md"]["method"] == "prefilter"
+        assert "method" not in results["partial.md"]
+        assert len(llm.calls) == 1
+
+
+class StreamingLLM:
+    """Fake chat model that streams a response in small chunks."""
+    
+    def __init__(self, content: str, chunk_size: int = 7):
+        self.content = content
+        self.chunk_size = chunk_size
+    
+    async def astream(self, messages):
+        from langchain_core.messages import AIMessageChunk
+        for i in range(0, len(self.content), self.chunk_size):
+            await asyncio.sleep(0)
+            yield AIMessageChunk(content=self.content[i:i + self.chunk_size])
+
+
+class TestStreaming:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setitem(service.__dict__, "llm", StreamingLLM(MOCK_RESPONSE))
+        monkeypatch.setattr(service, "cache", None)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_verdict_arrives_before_final_result(self, service):
+        updates = [u async for u in service.stream_evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)]
+        
+        partials = [u for u in updates if u.get("partial")]
+        final = updates[-1]
+        assert partials[0]["verdict"] == "Pass"
+        assert partials[-1]["confidence"] == 0.9
+        assert "partial" not in final
+        assert final["verdict"] == "Pass"
+        assert final["confidence"] == 0.9
+        assert "meets all the requirements" in final["explanation"]
+    
+    @pytest.mark.asyncio
+    async def test_usage_is_estimated_when_chunks_carry_none(self, service, monkeypatch):
+        monkeypatch.setitem(service.current_config, "model", "gpt-4")
+        updates = [u async for u in service.stream_evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)]
+        
+        final = updates[-1]
+        assert final["usage_estimated"] is True
+        assert final["usage"]["input_tokens"] > final["usage"]["output_tokens"] > 0
+        assert final["cost_usd"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_batch_yields_partials_before_final_results(self, service):
+        documents = [("a.md", TEST_DOCUMENT), ("b.md", TEST_DOCUMENT)]
+        
+        items = [r async for r in service.evaluate_batch(
+            TEST_GOLDEN_STANDARD, documents, include_partials=True
+        )]
+        
+        for name in ("a.md", "b.md"):
+            updates = [result for n, result in items if n == name]
+            assert updates[0]["partial"] is True
+            assert updates[0]["verdict"] == "Pass"
+            assert "partial" not in updates[-1]
+            assert sum(1 for u in updates if not u.get("partial")) == 1
+
+
+class TestCascade:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from config import config
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.current_config, "model", "gpt-4")
+        monkeypatch.setitem(service.current_config, "cascade_model", "gpt-3.5-turbo")
+        monkeypatch.setattr(config, "cascade_threshold", 0.8)
+        return service
+    
+    def use_models(self, monkeypatch, service, cheap: str, strong: str = MOCK_RESPONSE):
+        usage = {"prompt_tokens": 1000, "completion_tokens": 100}
+        cheap_llm, strong_llm = RecordingLLM(cheap, usage), RecordingLLM(strong, usage)
+        monkeypatch.setitem(service.__dict__, "cascade_llm", cheap_llm)
+        monkeypatch.setitem(service.__dict__, "llm", strong_llm)
+        return cheap_llm, strong_llm
+    
+    @pytest.mark.asyncio
+    async def test_confident_first_pass_is_kept(self, service, monkeypatch):
+        cheap, strong = self.use_models(
+            monkeypatch, service, "VERDICT: Fail\nCONFIDENCE: 0.95\nEXPLANATION: Missing items"
+        )
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert (len(cheap.calls), len(strong.calls)) == (1, 0)
+        assert (result["verdict"], result["model"], result["escalated"]) == ("Fail", "gpt-3.5-turbo", False)
+        assert len(result["cascade"]) == 1
+        assert result["cost_usd"] == pytest.approx((1000 * 0.5 + 100 * 1.5) / 1_000_000)
+    
+    @pytest.mark.asyncio
+    async def test_low_confidence_is_escalated_and_both_results_kept(self, service, monkeypatch):
+        cheap, strong = self.use_models(
+            monkeypatch, service, "VERDICT: Fail\nCONFIDENCE: 0.6\nEXPLANATION: Unsure"
+        )
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert (len(cheap.calls), len(strong.calls)) == (1, 1)
+        assert (result["verdict"], result["confidence"], result["model"]) == ("Pass", 0.9, "gpt-4")
+        assert result["escalated"] is True
+        assert result["escalation_reason"] == "low confidence"
+        assert [(s["model"], s["verdict"]) for s in result["cascade"]] == [("gpt-3.5-turbo", "Fail"), ("gpt-4", "Pass")]
+        assert result["usage"]["input_tokens"] == 2000
+        assert result["cost_usd"] == pytest.approx(sum(s["cost_usd"] for s in result["cascade"]))
+    
+    @pytest.mark.asyncio
+    async def test_missing_verdict_is_escalated(self, service, monkeypatch):
+        self.use_models(monkeypatch, service, "I am not sure about this one.")
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert result["success"] is True
+        assert result["escalation_reason"] == "no clear verdict"
+    
+    @pytest.mark.asyncio
+    async def test_multi_document_call_escalates_only_unsure_documents(self, service, monkeypatch):
+        cheap, strong = self.use_models(
+            monkeypatch, service,
+            "DOCUMENT: 1\nVERDICT: Pass\nCONFIDENCE: 0.95\nEXPLANATION: Fine\n\n"
+            "DOCUMENT: 2\nVERDICT: Fail\nCONFIDENCE: 0.5\nEXPLANATION: Unsure"
+        )
+        
+        results = dict(await service.evaluate_documents_together(
+            TEST_GOLDEN_STANDARD, [("a.md", "doc a"), ("b.md", "doc b")]
+        ))
+        
+        assert (len(cheap.calls), len(strong.calls)) == (1, 1)
+        assert "doc b" in strong.calls[0][1].content
+        assert results["a.md"]["escalated"] is False
+        assert (results["b.md"]["escalated"], results["b.md"]["verdict"]) == (True, "Pass")
+    
+    def test_cascade_settings_are_part_of_the_cache_key(self, service, monkeypatch):
+        from golden import load_golden_standard
+        golden = load_golden_standard(TEST_GOLDEN_STANDARD)
+        monkeypatch.setitem(service.__dict__, "cascade_llm", RecordingLLM(MOCK_RESPONSE))
+        cascaded = service._cache_key(golden, TEST_DOCUMENT)
+        
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        assert service._cache_key(golden, TEST_DOCUMENT) != cascaded
+
+
+class ScriptedLLM:
+    """Fake chat model that gives the scripted responses in turn, each after ``delays[i]`` seconds."""
+    
+    def __init__(self, responses, delays=None):
+        self.responses = list(responses)
+        self.delays = list(delays or [0] * len(self.responses))
+        self.calls = 0
+        self.finished = 0
+    
+    async def ainvoke(self, messages):
+        index = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.delays[index])
+        self.finished += 1
+        response = MagicMock()
+        response.content = self.responses[index]
+        response.response_metadata = {"token_usage": {"prompt_tokens": 1000, "completion_tokens": 100}}
+        return response
+
+
+def verdict(name: str, confidence: float) -> str:
+    return f"VERDICT: {name}\nCONFIDENCE: {confidence}\nEXPLANATION: {name} at {confidence}"
+
+
+class TestSelfConsistency:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from config import config
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setitem(service.current_config, "model", "gpt-4")
+        monkeypatch.setattr(config, "consistency_samples", 5)
+        monkeypatch.setattr(config, "consistency_threshold", 0.9)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_confident_first_sample_costs_one_call(self, service, monkeypatch):
+        monkeypatch.setitem(service.__dict__, "llm", ScriptedLLM([verdict("Pass", 0.95)]))
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert service.llm.calls == 1
+        assert (result["verdict"], result["confidence"]) == ("Pass", 0.95)
+        assert (result["samples"], result["agreement"], result["votes"]) == (1, 1.0, {"Pass": 1})
+    
+    @pytest.mark.asyncio
+    async def test_stops_once_a_majority_agrees(self, service, monkeypatch):
+        # The first sample is unsure; two of the parallel samples agree with it quickly
+        monkeypatch.setitem(service.__dict__, "llm", ScriptedLLM(
+            [verdict("Fail", 0.6), verdict("Fail", 0.8), verdict("Pass", 0.7), verdict("Fail", 0.7), verdict("Pass", 0.9)],
+            [0, 0.01, 0.02, 0.03, 1.0]
+        ))
+        
+        started = time.perf_counter()
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        assert time.perf_counter() - started < 0.5
+        assert service.llm.calls == 5 and service.llm.finished == 4
+        assert result["verdict"] == "Fail"
+        assert (result["samples"], result["votes"], result["agreement"]) == (4, {"Fail": 3, "Pass": 1}, 0.75)
+        assert result["confidence"] == pytest.approx(0.7 * 0.75)
+        assert result["explanation"] == "Fail at 0.8"
+        assert result["usage"]["input_tokens"] == 4000
+    
+    @pytest.mark.asyncio
+    async def test_split_vote_and_unparsed_samples(self, service, monkeypatch):
+        from config import config
+        monkeypatch.setattr(config, "consistency_samples", 3)
+        monkeypatch.setitem(service.__dict__, "llm", ScriptedLLM(["no verdict here", verdict("Pass", 0.6), verdict("Fail", 0.9)]))
+        
+        result = await service.evaluate_document(TEST_GOLDEN_STANDARD, TEST_DOCUMENT)
+        
+        # A tie goes to the more confident verdict; the unparsed sample doesn't vote
+        assert (result["verdict"], result["samples"], result["agreement"]) == ("Fail", 3, 0.5)
+        assert result["confidence"] == pytest.approx(0.45)
+    
+    def test_sampling_settings_are_part_of_the_cache_key(self, service, monkeypatch):
+        from config import config
+        from golden import load_golden_standard
+        golden = load_golden_standard(TEST_GOLDEN_STANDARD)
+        voted = service._cache_key(golden, TEST_DOCUMENT)
+        
+        monkeypatch.setattr(config, "consistency_samples", 1)
+        assert service._cache_key(golden, TEST_DOCUMENT) != voted
@@ -0,0 +1,124 @@
+import urllib.request
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_llm import FakeChatModel
+from llm_service import LLMService
+from metrics import Counter, EvaluationMetrics, Histogram, estimate_cost, evaluation_metrics, start_metrics_server
+
+
+class TestPrimitives:
+    def test_counter_by_labels(self):
+        counter = Counter("requests_total", "Requests", ("model",))
+        counter.inc(model="a")
+        counter.inc(2, model="a")
+        counter.inc(model="b")
+
+        assert counter.value(model="a") == 3
+        assert 'requests_total{model="b"} 1' in counter.render()
+        with pytest.raises(ValueError):
+            counter.inc(-1, model="a")
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency", (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = histogram.render()
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert "latency_seconds_count 4" in lines
+        assert "latency_seconds_sum 5.65" in lines
+
+    def test_estimate_cost(self):
+        usage = {"input_tokens": 1_000_000, "output_tokens": 500_000}
+        assert estimate_cost("gpt-4", usage) == pytest.approx(60.0)
+        assert estimate_cost("gpt-4", usage, {"gpt-4": [1, 2]}) == pytest.approx(2.0)
+        assert estimate_cost("unknown-model", usage) == 0.0
+
+
+class TestEvaluationMetrics:
+    def test_records_fresh_and_cached_results(self):
+        metrics = EvaluationMetrics()
+        result = {
+            "verdict": "Pass", "success": True, "cached": False, "cost_usd": 0.01,
+            "usage": {"input_tokens": 100, "output_tokens": 20},
+            "timings": {"queue_wait_ms": 5, "llm_latency_ms": 800, "parse_ms": 0.1}
+        }
+        metrics.record(result, model="gpt-4")
+        metrics.record({**result, "cached": True}, model="gpt-4")
+
+        assert metrics.evaluations.value(model="gpt-4", method="llm", outcome="pass") == 2
+        assert metrics.cache_hits.value(model="gpt-4") == 1
+        # Cached results don't count tokens, cost or latency again
+        assert metrics.tokens.value(model="gpt-4", kind="input") == 100
+        assert metrics.cost.value(model="gpt-4") == pytest.approx(0.01)
+        assert metrics.llm_latency.count(model="gpt-4") == 1
+
+    def test_cascade_calls_are_counted_per_model(self):
+        metrics = EvaluationMetrics()
+        first = {"verdict": "Fail", "success": True, "usage": {"input_tokens": 100}, "cost_usd": 0.001}
+        second = {"verdict": "Pass", "success": True, "usage": {"input_tokens": 100}, "cost_usd": 0.01}
+        metrics.record({
+            **second, "cached": False, "model": "gpt-4",
+            "cascade": [{"model": "gpt-3.5-turbo", **first}, {"model": "gpt-4", **second}]
+        }, model="gpt-4")
+
+        assert metrics.cascade.value(model="gpt-3.5-turbo", escalated="true") == 1
+        assert metrics.tokens.value(model="gpt-3.5-turbo", kind="input") == 100
+        assert metrics.cost.value(model="gpt-4") == pytest.approx(0.01)
+
+    def test_voted_results_count_their_samples(self):
+        metrics = EvaluationMetrics()
+        metrics.record({
+            "verdict": "Pass", "success": True, "cached": False, "usage": {"input_tokens": 300},
+            "samples": 3, "votes": {"Pass": 2, "Fail": 1}, "agreement": 0.667
+        }, model="gpt-4")
+
+        assert metrics.consistency.value(model="gpt-4", samples="3") == 1
+        assert metrics.tokens.value(model="gpt-4", kind="input") == 300
+
+    def test_endpoint_serves_prometheus_text(self):
+        server = start_metrics_server(0, host="127.0.0.1")
+        evaluation_metrics.evaluations.inc(model="endpoint-test", method="llm", outcome="pass")
+
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+
+        assert "# TYPE docujudge_llm_latency_seconds histogram" in body
+        assert 'docujudge_evaluations_total{model="endpoint-test",method="llm",outcome="pass"}' in body
+
+
+class TestInstrumentedResults:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setitem(service.__dict__, "llm", FakeChatModel(latency=0.01, distribution="constant", output_tokens=30))
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.current_config, "model", "gpt-4")
+        return service
+
+    @pytest.mark.asyncio
+    async def test_result_has_timings_tokens_and_cost(self, service):
+        result = await service.evaluate_document("# Golden\n- requirement", "x" * 400)
+
+        assert set(result["timings"]) == {"queue_wait_ms", "llm_latency_ms", "parse_ms"}
+        assert result["timings"]["llm_latency_ms"] >= 10
+        assert result["usage"]["output_tokens"] == 30
+        assert result["cost_usd"] == pytest.approx(estimate_cost("gpt-4", result["usage"]))
+
+    @pytest.mark.asyncio
+    async def test_multi_document_results_split_cost(self, service):
+        results = await service.evaluate_documents_together(
+            "# Golden\n- requirement", [("a.md", "first"), ("b.md", "second")]
+        )
+
+        costs = [result["cost_usd"] for _, result in results]
+        assert costs[0] == pytest.approx(costs[1])
+        assert all("llm_latency_ms" in result["timings"] for _, result in results)
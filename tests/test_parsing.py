@@ -0,0 +1,148 @@
+import json
+import httpx
+import openai
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_openai import ChatOpenAI
+
+from config import config
+from llm_service import LLMService
+from parsing import (
+    PARSE_ERROR, normalize_confidence, normalize_verdict, parse_evaluation,
+    parse_multi_evaluation, validate_evaluation
+)
+
+
+class TestParseEvaluation:
+    @pytest.mark.parametrize("content,verdict,confidence", [
+        ("VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Good", "Pass", 0.9),
+        ("**Verdict:** FAIL\n**Confidence:** 85%\n**Explanation:** Missing items", "Fail", 0.85),
+        ("1. Verdict - passed\n2. Confidence - 8/10\n3. Explanation - fine", "Pass", 0.8),
+        ("verdict = Fail\nconfidence = high\nreasoning = nope", "Fail", 0.85),
+        ('{"verdict": "pass", "confidence": 0.7, "explanation": "ok"}', "Pass", 0.7),
+        ('```json\n{"Verdict": "Fail", "Confidence": "60%", "Explanation": "x"}\n```', "Fail", 0.6),
+        ("INVALID FORMAT", "", 0.0),
+    ])
+    def test_formats(self, content, verdict, confidence):
+        result = parse_evaluation(content)
+        assert result["verdict"] == verdict
+        assert result["confidence"] == pytest.approx(confidence)
+
+    def test_keeps_multi_line_explanation(self):
+        result = parse_evaluation(
+            "VERDICT: Fail\nCONFIDENCE: 0.8\nEXPLANATION: Two gaps:\n- no auth section\n- no logging\n"
+        )
+        assert result["explanation"] == "Two gaps:\n- no auth section\n- no logging"
+
+    def test_explanation_before_verdict(self):
+        result = parse_evaluation("Explanation: Covers everything.\nVerdict: Pass\nConfidence: 0.95")
+        assert (result["verdict"], result["confidence"], result["explanation"]) == ("Pass", 0.95, "Covers everything.")
+
+    def test_multi_document_headers(self):
+        results = parse_multi_evaluation(
+            "**Document 1**\nVERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: a\n\nDOCUMENT: 2\nVERDICT: Fail\nCONFIDENCE: 0.4\nEXPLANATION: b"
+        )
+        assert results[1]["verdict"] == "Pass"
+        assert (results[2]["verdict"], results[2]["explanation"]) == ("Fail", "b")
+
+
+class TestNormalization:
+    @pytest.mark.parametrize("value,expected", [
+        ("Pass", "Pass"), ("**FAIL**", "Fail"), ("The document passes.", "Pass"), ("[Pass/Fail]", ""), (None, ""),
+    ])
+    def test_verdict(self, value, expected):
+        assert normalize_verdict(value) == expected
+
+    @pytest.mark.parametrize("value,expected", [
+        (0.9, 0.9), (90, 0.9), ("0.75", 0.75), ("75 %", 0.75), ("7/10", 0.7), ("85", 0.85), ("very low", 0.1), ("?", 0.0),
+    ])
+    def test_confidence(self, value, expected):
+        assert normalize_confidence(value) == pytest.approx(expected)
+
+    def test_missing_verdict_is_a_failed_result(self):
+        result = validate_evaluation(parse_evaluation("I think it is fine"))
+        assert result["success"] is False
+        assert result["error"] == PARSE_ERROR
+
+
+def chat_completion(message):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150}
+    }
+
+
+def mocked_chat_model(message, requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json=chat_completion(message))
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ChatOpenAI(
+        model_name="gpt-4",
+        api_key="sk-test",
+        max_retries=0,
+        async_client=openai.AsyncOpenAI(api_key="sk-test", http_client=http_client, max_retries=0).chat.completions
+    )
+
+
+class TestStructuredOutput:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_function_calling(self, service, monkeypatch):
+        requests = []
+        arguments = json.dumps({"verdict": "Fail", "confidence": 0.8, "explanation": "Missing:\n- logging"})
+        monkeypatch.setitem(service.__dict__, "llm", mocked_chat_model({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": "Evaluation", "arguments": arguments}}]
+        }, requests))
+        monkeypatch.setattr(config, "output_mode", "function_calling")
+
+        result = await service.evaluate_document("# Golden", "# Document")
+
+        assert requests[0]["tools"][0]["function"]["name"] == "Evaluation"
+        assert (result["verdict"], result["confidence"], result["explanation"]) == ("Fail", 0.8, "Missing:\n- logging")
+        assert result["usage"]["input_tokens"] == 120
+
+    @pytest.mark.asyncio
+    async def test_json_mode(self, service, monkeypatch):
+        requests = []
+        monkeypatch.setitem(service.__dict__, "llm", mocked_chat_model({
+            "role": "assistant",
+            "content": '{"verdict": "Pass", "confidence": 0.9, "explanation": "All covered"}'
+        }, requests))
+        monkeypatch.setattr(config, "output_mode", "json_mode")
+
+        result = await service.evaluate_document("# Golden", "# Document")
+
+        assert requests[0]["response_format"] == {"type": "json_object"}
+        assert "JSON object" in requests[0]["messages"][0]["content"]
+        assert (result["verdict"], result["confidence"]) == ("Pass", 0.9)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_text_when_schema_is_not_followed(self, service, monkeypatch):
+        monkeypatch.setitem(service.__dict__, "llm", mocked_chat_model({
+            "role": "assistant",
+            "content": "Verdict: **Pass**\nConfidence: 95%\nExplanation: fine"
+        }, []))
+        monkeypatch.setattr(config, "output_mode", "json_mode")
+
+        result = await service.evaluate_document("# Golden", "# Document")
+
+        assert result["success"] is True
+        assert (result["verdict"], result["confidence"]) == ("Pass", 0.95)
@@ -0,0 +1,68 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from golden import load_golden_standard
+from prefilter import score_documents, screen_documents, bullet_overlap, tfidf_model
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+
+def read_example(name: str) -> str:
+    with open(os.path.join(EXAMPLES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+GOLDEN = read_example("golden_standard.md")
+OFF_TOPIC = "Lemon cake: whisk flour, sugar and eggs, then bake for forty minutes."
+
+
+class TestScoreDocuments:
+    def test_identical_document_scores_highest(self):
+        scores = score_documents(GOLDEN, [GOLDEN, read_example("document1.md"), OFF_TOPIC])["score"]
+
+        assert scores[0] == pytest.approx(1.0)
+        assert scores[0] > scores[1] > scores[2]
+        assert scores[2] < 0.1
+
+    def test_skips_signals_the_golden_standard_lacks(self):
+        signals = score_documents("plain prose without structure", ["plain prose without structure"])
+
+        assert set(signals) == {"tfidf", "score"}
+        assert signals["score"][0] == pytest.approx(1.0)
+
+    def test_tfidf_scores_do_not_depend_on_the_batch(self):
+        golden = load_golden_standard(GOLDEN)
+        document = read_example("document1.md")
+
+        alone = score_documents(golden, [document])["tfidf"][0]
+        batched = score_documents(golden, [OFF_TOPIC, document, GOLDEN])["tfidf"][1]
+
+        assert alone == pytest.approx(batched)
+        assert tfidf_model(golden) is tfidf_model(golden)
+
+    def test_bullet_overlap_handles_documents_without_bullets(self):
+        scores = bullet_overlap("- alpha beta\n- gamma", ["- alpha beta", "no bullets here", "- gamma"])
+
+        assert scores[0] == pytest.approx(0.5)
+        assert scores[1] == 0
+        assert scores[2] == pytest.approx(0.5)
+
+
+class TestScreenDocuments:
+    def test_only_ambiguous_documents_are_left_undecided(self):
+        documents = [("copy.md", GOLDEN), ("doc1.md", read_example("document1.md")), ("cake.md", OFF_TOPIC)]
+
+        screened = {
+            name: decision
+            for name, _, decision in screen_documents(GOLDEN, documents, pass_threshold=0.9, fail_threshold=0.1, window=2)
+        }
+
+        assert screened["copy.md"]["verdict"] == "Pass"
+        assert screened["copy.md"]["method"] == "prefilter"
+        assert screened["doc1.md"] is None
+        assert screened["cake.md"]["verdict"] == "Fail"
+        assert screened["cake.md"]["confidence"] > 0.9
@@ -0,0 +1,221 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rate_limiter import (
+    AdaptiveConcurrency, ProviderLimiter, TokenBucket, is_retryable, retry_after
+)
+
+
+class FakeAPIError(Exception):
+    """Stand-in for provider SDK errors, which carry a status code and response."""
+
+    def __init__(self, status_code: int, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock()
+        self.response.headers = headers or {}
+
+
+class TestErrorClassification:
+    @pytest.mark.parametrize("error,expected", [
+        (FakeAPIError(429), True),
+        (FakeAPIError(503), True),
+        (FakeAPIError(400), False),
+        (FakeAPIError(401), False),
+        (asyncio.TimeoutError(), True),
+        (ValueError("bad"), False),
+    ])
+    def test_is_retryable(self, error, expected):
+        assert is_retryable(error) is expected
+
+    def test_retry_after_seconds_and_milliseconds(self):
+        assert retry_after(FakeAPIError(429, {"retry-after": "2"})) == 2.0
+        assert retry_after(FakeAPIError(429, {"retry-after-ms": "250"})) == 0.25
+        assert retry_after(FakeAPIError(429)) is None
+
+    def test_retry_after_http_date(self):
+        headers = {"retry-after": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 30))}
+
+        assert 25 < retry_after(FakeAPIError(429, headers)) <= 30
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_waits_for_refill_when_exhausted(self):
+        bucket = TokenBucket(per_minute=600)  # 10 per second
+        await bucket.acquire(600)
+
+        start = time.monotonic()
+        await bucket.acquire(1)
+
+        assert time.monotonic() - start >= 0.08
+
+    @pytest.mark.asyncio
+    async def test_refund_returns_unused_capacity(self):
+        bucket = TokenBucket(per_minute=600)
+        await bucket.acquire(600)
+        bucket.refund(300)
+
+        start = time.monotonic()
+        await bucket.acquire(300)
+
+        assert time.monotonic() - start < 0.05
+
+
+class TestAdaptiveConcurrency:
+    @pytest.mark.asyncio
+    async def test_halves_on_throttle_and_recovers(self):
+        gate = AdaptiveConcurrency(maximum=8)
+
+        await gate.acquire()
+        await gate.release(throttled=True)
+        assert gate.limit == 4
+
+        for _ in range(40):
+            await gate.acquire()
+            await gate.release()
+        assert gate.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_raising_the_maximum_keeps_a_throttled_limit(self):
+        gate = AdaptiveConcurrency(maximum=4)
+        await gate.raise_maximum(8)
+        assert (gate.maximum, gate.limit) == (8, 8)
+
+        await gate.acquire()
+        await gate.release(throttled=True)
+        await gate.raise_maximum(16)
+        await gate.raise_maximum(2)
+        assert (gate.maximum, gate.limit) == (16, 4)
+
+
+class TestProviderLimiter:
+    @pytest.mark.asyncio
+    async def test_retries_rate_limits_honouring_retry_after(self):
+        limiter = ProviderLimiter(max_concurrency=4, base_delay=0.001)
+        attempts = []
+
+        async def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise FakeAPIError(429, {"retry-after": "0.05"})
+            return "ok"
+
+        assert await limiter.call(flaky) == "ok"
+        assert attempts[1] - attempts[0] >= 0.05
+        assert limiter.concurrency.limit < 4
+        assert limiter.stats["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        limiter = ProviderLimiter(base_delay=0.001)
+        attempts = []
+
+        async def bad_request():
+            attempts.append(1)
+            raise FakeAPIError(400)
+
+        with pytest.raises(FakeAPIError):
+            await limiter.call(bad_request)
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        limiter = ProviderLimiter(max_retries=2, base_delay=0.001)
+        attempts = []
+
+        async def unavailable():
+            attempts.append(1)
+            raise FakeAPIError(503)
+
+        with pytest.raises(FakeAPIError):
+            await limiter.call(unavailable)
+        assert len(attempts) == 3
+
+    @pytest.mark.asyncio
+    async def test_limits_requests_per_minute(self):
+        limiter = ProviderLimiter(requests_per_minute=600)  # 10 per second, burst of 600
+        limiter.requests.available = 0
+
+        async def ok():
+            return True
+
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.call(ok) for _ in range(3)))
+
+        assert time.monotonic() - start >= 0.25
+
+
+class TestEvaluateDocumentRetries:
+    @pytest.mark.asyncio
+    async def test_rate_limited_call_is_retried_not_reported_as_error(self, monkeypatch):
+        from llm_service import LLMService
+
+        class RateLimitedOnce:
+            def __init__(self):
+                self.calls = 0
+
+            async def ainvoke(self, messages):
+                self.calls += 1
+                if self.calls == 1:
+                    raise FakeAPIError(429, {"retry-after": "0.01"})
+                response = MagicMock()
+                response.content = "VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Good"
+                return response
+
+        service = LLMService()
+        llm = RateLimitedOnce()
+        monkeypatch.setitem(service.__dict__, "llm", llm)
+        monkeypatch.setattr(service, "cache", None)
+
+        result = await service.evaluate_document("golden", "document")
+
+        assert llm.calls == 2
+        assert result["success"] is True
+        assert result["verdict"] == "Pass"
+
+
+class TestBatchConcurrency:
+    @pytest.mark.asyncio
+    async def test_later_batch_on_the_same_loop_gets_its_own_limit(self, monkeypatch):
+        from config import config
+        from llm_service import LLMService
+
+        class SlowLLM:
+            def __init__(self):
+                self.in_flight = 0
+                self.max_in_flight = 0
+
+            async def ainvoke(self, messages):
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.02)
+                self.in_flight -= 1
+                response = MagicMock()
+                response.content = "VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Good"
+                return response
+
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setattr(service, "store", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setattr(config, "prefilter_enabled", False)
+
+        peaks = []
+        for limit, count in ((2, 4), (8, 8)):
+            llm = SlowLLM()
+            monkeypatch.setitem(service.__dict__, "llm", llm)
+            monkeypatch.setattr(config, "max_concurrency", limit)
+            documents = [(f"doc{i}.md", f"document {i}") for i in range(count)]
+            async for _ in service.evaluate_batch("golden", documents, max_concurrency=limit, documents_per_call=1):
+                pass
+            peaks.append(llm.max_in_flight)
+
+        assert peaks == [2, 8]
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+import pytest
+import os
+import sys
+
+import httpx
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import config
+from llm_service import LLMService
+from replay import Exchange, RecordingTransport, ReplayStore, ReplayTransport, request_key
+
+URL = "https://api.openai.com/v1/chat/completions"
+
+
+def completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+class Provider:
+    """A MockTransport handler standing in for the provider's API."""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        content = f"VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Call {len(self.requests)}."
+        return httpx.Response(self.status, json=completion(content))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReplayStore(str(tmp_path / "replay.sqlite3"))
+    yield store
+    store.close()
+
+
+async def post(transport: httpx.AsyncBaseTransport, body: dict, **headers) -> httpx.Response:
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.post(URL, json=body, headers=headers)
+
+
+class TestReplayTransport:
+    def test_request_key_ignores_headers_and_key_order(self):
+        first = httpx.Request("POST", URL, content=b'{"model": "gpt-4", "temperature": 0.1}',
+                              headers={"Authorization": "Bearer sk-a"})
+        second = httpx.Request("POST", URL, content=b'{"temperature":0.1,"model":"gpt-4"}',
+                               headers={"Authorization": "Bearer sk-b"})
+        other = httpx.Request("POST", URL, content=b'{"model": "gpt-4", "temperature": 0.2}')
+
+        assert request_key(first) == request_key(second)
+        assert request_key(first) != request_key(other)
+
+    def test_store_keeps_responses_in_recorded_order(self, store):
+        store.record("k", Exchange(200, {"content-type": "application/json"}, b"first" * 100, 0.5))
+        store.record("k", Exchange(200, {}, b"second", 0.25))
+
+        responses = store.responses("k")
+        assert [r.body for r in responses] == [b"first" * 100, b"second"]
+        assert responses[0].latency == 0.5
+        assert store.responses("missing") == []
+        assert len(store) == 2
+
+    @pytest.mark.asyncio
+    async def test_records_successes_and_replays_them_offline(self, store):
+        provider = Provider()
+        recorded = await post(RecordingTransport(httpx.MockTransport(provider), store), {"n": 1})
+        await post(RecordingTransport(httpx.MockTransport(provider), store), {"n": 1})
+        assert recorded.json()["choices"][0]["message"]["content"].endswith("Call 1.")
+        assert len(store) == 2
+
+        replay = ReplayTransport(store, latency=0)
+        contents = [(await post(replay, {"n": 1})).json()["choices"][0]["message"]["content"] for _ in range(3)]
+
+        # Identical requests get the recorded responses in turn, then start over
+        assert [c[-7:] for c in contents] == ["Call 1.", "Call 2.", "Call 1."]
+        assert len(provider.requests) == 2
+        assert replay.hits == 3
+
+    @pytest.mark.asyncio
+    async def test_store_access_runs_in_executor(self, store, monkeypatch):
+        loop = asyncio.get_running_loop()
+        offloaded = []
+        run_in_executor = loop.run_in_executor
+
+        def spy(executor, func, *args):
+            offloaded.append(func)
+            return run_in_executor(executor, func, *args)
+
+        monkeypatch.setattr(loop, "run_in_executor", spy)
+        await post(RecordingTransport(httpx.MockTransport(Provider()), store), {"n": 1})
+        await post(ReplayTransport(store, latency=0), {"n": 1})
+
+        assert offloaded == [store.record, store.responses]
+
+    @pytest.mark.asyncio
+    async def test_failed_responses_are_not_recorded(self, store):
+        response = await post(RecordingTransport(httpx.MockTransport(Provider(status=500)), store), {"n": 1})
+
+        assert response.status_code == 500
+        assert len(store) == 0
+
+    @pytest.mark.asyncio
+    async def test_unrecorded_request_is_a_not_found_error(self, store):
+        replay = ReplayTransport(store)
+        response = await post(replay, {"n": 2})
+
+        assert response.status_code == 404
+        assert "No recorded response" in response.json()["error"]["message"]
+        assert replay.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_replays_with_recorded_or_fixed_latency(self, store):
+        key = request_key(httpx.Request("POST", URL, json={"n": 1}))
+        store.record(key, Exchange(200, {}, b"{}", 0.05))
+
+        start = time.perf_counter()
+        await post(ReplayTransport(store), {"n": 1})
+        assert time.perf_counter() - start >= 0.05
+
+        assert ReplayTransport(store, latency=0).delay(store.responses(key)[0]) == 0
+        draws = [ReplayTransport(store, latency=1.0, jitter=0.5, seed=3) for _ in range(2)]
+        delays = [[t.delay(store.responses(key)[0]) for _ in range(5)] for t in draws]
+        assert delays[0] == delays[1]
+        assert all(0.5 <= d <= 1.5 for d in delays[0])
+
+
+class TestReplayedService:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setattr(service, "current_config", dict(service.current_config))
+        yield service
+        # The service is a singleton; don't leave clients for this test's transports behind
+        for name in ("llm", "cascade_llm", "router"):
+            service.__dict__.pop(name, None)
+
+    @pytest.mark.asyncio
+    async def test_recorded_run_replays_without_network_or_key(self, service, tmp_path, monkeypatch):
+        provider = Provider()
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", lambda limits: httpx.MockTransport(provider))
+        monkeypatch.setattr(config, "replay_path", str(tmp_path / "run.sqlite3"))
+        monkeypatch.setattr(config, "replay_latency", 0.0)
+        monkeypatch.setattr(config, "output_mode", "text")
+        monkeypatch.setattr(config, "llm_backends", [])
+
+        golden, document = "# Spec\n- Uses TLS", "# Service\n- Uses TLS 1.3"
+        results = []
+        for transport, api_key in (("record", "sk-record-test"), ("replay", None)):
+            monkeypatch.setattr(config, "llm_transport", transport)
+            service.update_config("openai", "gpt-4", 0.1, 100, api_key)
+            results.append(await service.evaluate_document(golden, document))
+
+        assert len(provider.requests) == 1
+        assert json.loads(provider.requests[0].content)["model"] == "gpt-4"
+        recorded, replayed = results
+        assert recorded["success"] and replayed["success"]
+        assert (replayed["verdict"], replayed["explanation"]) == (recorded["verdict"], recorded["explanation"])
+        assert replayed["usage"] == recorded["usage"]
@@ -0,0 +1,169 @@
+import pytest
+import os
+import sys
+import threading
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_llm import FakeChatModel
+from golden import GoldenStandard
+from llm_service import LLMService
+from result_store import ResultStore, document_hash
+
+GOLDEN = "# Spec\n- All traffic must use TLS\n- Logs are retained for 30 days"
+SETTINGS = {"provider": "openai", "model": "gpt-4", "temperature": 0.0, "prompt_version": "3"}
+
+
+def result(verdict: str, cost: float = 0.01, success: bool = True):
+    return {"verdict": verdict, "confidence": 0.9, "explanation": "", "success": success, "error": None, "cost_usd": cost}
+
+
+class TestResultStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        return ResultStore(str(tmp_path / "results" / "store.sqlite3"))
+
+    def test_lookup_matches_document_standard_and_settings(self, store):
+        run = store.start_run("g1", SETTINGS)
+        store.record(run, "a.md", document_hash("a"), "g1", SETTINGS, result("Pass"))
+
+        assert store.lookup(document_hash("a"), "g1", SETTINGS)["verdict"] == "Pass"
+        assert store.lookup(document_hash("a (edited)"), "g1", SETTINGS) is None
+        assert store.lookup(document_hash("a"), "g2", SETTINGS) is None
+        assert store.lookup(document_hash("a"), "g1", {**SETTINGS, "model": "gpt-3.5-turbo"}) is None
+        # Key order doesn't matter
+        assert store.lookup(document_hash("a"), "g1", dict(reversed(list(SETTINGS.items())))) is not None
+
+    def test_lookup_returns_latest_success(self, store):
+        first = store.start_run("g1", SETTINGS)
+        store.record(first, "a.md", "h", "g1", SETTINGS, result("Fail"))
+        second = store.start_run("g1", SETTINGS)
+        store.record(second, "a.md", "h", "g1", SETTINGS, result("Pass"))
+        store.record(second, "a.md", "h", "g1", SETTINGS, {**result("Error"), "success": False})
+
+        stored = store.lookup("h", "g1", SETTINGS)
+        assert stored["verdict"] == "Pass"
+        assert stored["evaluated_at"] > 0
+
+    def test_run_summaries(self, store):
+        first = store.start_run("g1", SETTINGS)
+        store.record(first, "a.md", "ha", "g1", SETTINGS, result("Pass"))
+        store.record(first, "b.md", "hb", "g1", SETTINGS, result("Fail"))
+        store.finish_run(first)
+        second = store.start_run("g1", SETTINGS)
+        store.record(second, "a.md", "ha", "g1", SETTINGS, result("Pass"), reused=True)
+        store.record(second, "b.md", "hb2", "g1", SETTINGS, result("Pass"))
+        store.record(second, "c.md", "hc", "g1", SETTINGS, result("Error", success=False))
+        store.start_run("g2", SETTINGS)
+
+        runs = store.runs(golden_hash="g1")
+
+        assert [run["id"] for run in runs] == [second, first]
+        assert (runs[0]["documents"], runs[0]["passed"], runs[0]["errors"], runs[0]["reused"]) == (3, 2, 1, 1)
+        assert runs[0]["pass_rate"] == 1.0
+        assert runs[0]["cost_usd"] == pytest.approx(0.02)  # reused results cost nothing
+        assert runs[1]["pass_rate"] == 0.5
+        assert runs[1]["finished_at"] is not None
+        assert runs[0]["settings"] == SETTINGS
+        assert len(store.runs()) == 3
+        assert [r["name"] for r in store.run_results(second)] == ["a.md", "b.md", "c.md"]
+
+    def test_document_history(self, store):
+        for content, verdict in (("v1", "Fail"), ("v2", "Pass")):
+            run = store.start_run("g1", SETTINGS)
+            store.record(run, "a.md", document_hash(content), "g1", SETTINGS, result(verdict))
+
+        history = store.document_history("a.md")
+
+        assert [h["verdict"] for h in history] == ["Pass", "Fail"]
+        assert history[0]["document_hash"] == document_hash("v2")
+        assert store.document_history("a.md", golden_hash="other") == []
+
+
+class TestIncrementalEvaluation:
+    @pytest.fixture
+    def service(self, monkeypatch, tmp_path):
+        from config import config
+        service = LLMService()
+        fake = FakeChatModel(latency=0, seed=1)
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", fake)
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setattr(service, "store", ResultStore(str(tmp_path / "store.sqlite3")))
+        monkeypatch.setattr(config, "prefilter_enabled", False)
+        return service
+
+    async def run(self, service, documents, golden=GOLDEN, **kwargs):
+        return {
+            name: result
+            async for name, result in service.evaluate_batch(
+                GoldenStandard(golden), documents, documents_per_call=1, **kwargs
+            )
+        }
+
+    @pytest.mark.asyncio
+    async def test_only_changed_documents_are_evaluated_again(self, service):
+        corpus = [("a.md", "doc a"), ("b.md", "doc b"), ("c.md", "doc c")]
+        first = await self.run(service, corpus)
+        assert service.llm.calls == 3
+
+        second = await self.run(service, [("a.md", "doc a"), ("b.md", "doc b, revised"), ("c.md", "doc c")])
+
+        assert service.llm.calls == 4
+        assert {name: r.get("method", "llm") for name, r in second.items()} == {"a.md": "store", "b.md": "llm", "c.md": "store"}
+        assert second["a.md"]["verdict"] == first["a.md"]["verdict"]
+        assert second["a.md"]["cached"] is True
+
+        runs = service.store.runs()
+        assert [(run["documents"], run["reused"]) for run in runs] == [(3, 2), (3, 0)]
+        assert all(run["finished_at"] is not None for run in runs)
+
+    @pytest.mark.asyncio
+    async def test_changed_settings_or_standard_evaluate_everything(self, service, monkeypatch):
+        corpus = [("a.md", "doc a"), ("b.md", "doc b")]
+        await self.run(service, corpus)
+
+        monkeypatch.setitem(service.current_config, "model", "some-other-model")
+        await self.run(service, corpus)
+        assert service.llm.calls == 4
+
+        await self.run(service, corpus, golden=GOLDEN + "\n- Sessions expire after 15 minutes")
+        assert service.llm.calls == 6
+
+        await self.run(service, corpus, reuse_stored=False)
+        assert service.llm.calls == 8
+
+        results = await self.run(service, corpus)
+        assert service.llm.calls == 8
+        assert all(r["method"] == "store" for r in results.values())
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_reused(self, service, monkeypatch):
+        monkeypatch.setattr(service.llm, "error_rate", 1.0)
+        monkeypatch.setattr(service.llm, "error_status", 400)
+        await self.run(service, [("a.md", "doc a")])
+
+        monkeypatch.setattr(service.llm, "error_rate", 0.0)
+        results = await self.run(service, [("a.md", "doc a")])
+
+        assert results["a.md"].get("method", "llm") == "llm"
+        assert service.store.runs()[1]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_store_is_read_and_written_off_the_event_loop(self, service, monkeypatch):
+        store = service.store
+        threads = []
+        for method in ("lookup", "record"):
+            def spy(*args, _method=getattr(store, method), **kwargs):
+                threads.append(threading.get_ident())
+                return _method(*args, **kwargs)
+            monkeypatch.setattr(store, method, spy)
+
+        corpus = [("a.md", "doc a"), ("b.md", "doc b")]
+        await self.run(service, corpus)
+        await self.run(service, corpus)
+
+        assert len(threads) == 8
+        assert threading.get_ident() not in threads
@@ -0,0 +1,130 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import config
+from fake_llm import FakeChatModel
+from golden import GoldenStandard
+from llm_service import LLMService
+from retrieval import embed, requirement_vectors, retrieve, split_passages
+
+GOLDEN = """# Service Spec
+
+## Security
+- All traffic must use TLS 1.2 or later
+- Passwords are hashed with bcrypt
+
+## Logging
+- Logs are retained for 30 days
+- Quantum teleportation is audited weekly
+"""
+
+FILLER = "".join(
+    f"\n## Appendix {i}\nThe office kitchen is restocked on Mondays and the plants are watered by facilities.\n"
+    for i in range(60)
+)
+
+DOCUMENT = f"""# Our Service
+{FILLER}
+## Security
+Every connection uses TLS 1.3, which is newer than TLS 1.2.
+
+User passwords are hashed with bcrypt before they are stored.
+
+## Operations
+Application logs are retained for 30 days and then deleted.
+"""
+
+
+class TestRetrieval:
+    def test_embeddings_are_unit_length_and_deterministic(self):
+        vectors = embed(["passwords are hashed", "passwords are hashed", ""])
+
+        assert vectors[0] @ vectors[1] == pytest.approx(1.0)
+        assert vectors[0] @ vectors[0] == pytest.approx(1.0)
+        assert not vectors[2].any()
+
+    def test_split_passages_stays_within_sections(self):
+        passages = split_passages("# A\nfirst\n\nsecond\n\n# B\n" + "- item\n" * 50, max_chars=60)
+
+        assert [p.heading for p in passages[:1]] == ["A"]
+        assert passages[0].text == "first\nsecond"
+        assert all(len(p.text) <= 60 for p in passages)
+        assert {p.heading for p in passages[1:]} == {"B"}
+        assert [p.index for p in passages] == list(range(len(passages)))
+
+    def test_retrieves_relevant_passages_per_requirement(self):
+        golden = GoldenStandard(GOLDEN)
+        evidence = retrieve(golden, DOCUMENT, top_k=1, max_chars=200)
+        found = {requirement.text: [p.text for p, _ in passages] for requirement, passages in evidence.matches}
+
+        assert "TLS 1.3" in found["All traffic must use TLS 1.2 or later"][0]
+        assert "bcrypt" in found["Passwords are hashed with bcrypt"][0]
+        assert "30 days" in found["Logs are retained for 30 days"][0]
+        assert evidence.summary()["passages"] <= len(golden.requirements)
+        assert evidence.passage_count > 60
+
+        rendered = evidence.render()
+        assert "kitchen" not in rendered
+        assert "- Passwords are hashed with bcrypt -> P" in rendered
+
+    def test_requirement_vectors_are_cached_per_standard(self):
+        golden = GoldenStandard(GOLDEN)
+        assert requirement_vectors(golden) is requirement_vectors(golden)
+
+    def test_standard_without_requirements(self):
+        assert retrieve(GoldenStandard("# Spec\nJust prose."), DOCUMENT, 3, 800) is None
+
+
+class RecordingFakeLLM(FakeChatModel):
+    def __init__(self):
+        super().__init__(latency=0, seed=0)
+        self.prompts = []
+
+    def _respond(self, messages):
+        self.prompts.append("\n".join(m.content for m in messages))
+        return "VERDICT: Pass\nCONFIDENCE: 0.9\nEXPLANATION: Every requirement has a matching passage."
+
+
+class TestRetrievalMode:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", RecordingFakeLLM())
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setattr(config, "retrieval_enabled", True)
+        monkeypatch.setattr(config, "retrieval_top_k", 2)
+        monkeypatch.setattr(config, "retrieval_passage_chars", 200)
+        monkeypatch.setattr(config, "retrieval_min_chars", 1000)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_long_document_is_judged_from_passages(self, service):
+        result = await service.evaluate_document(GOLDEN, DOCUMENT)
+
+        prompt = service.llm.prompts[0]
+        assert "GOLDEN STANDARD:" in prompt
+        assert "hashed with bcrypt before they are stored" in prompt
+        assert len(prompt) < len(DOCUMENT)
+        assert (result["verdict"], result["method"]) == ("Pass", "retrieval")
+        assert result["retrieval"]["requirements"] == 4
+
+    @pytest.mark.asyncio
+    async def test_short_documents_are_sent_in_full(self, service):
+        document = "## Security\n- TLS 1.2\n- bcrypt"
+        result = await service.evaluate_document(GOLDEN, document)
+
+        assert f"DOCUMENT TO EVALUATE:\n{document}" in service.llm.prompts[0]
+        assert "retrieval" not in result
+
+    def test_retrieval_settings_are_part_of_the_cache_key(self, service, monkeypatch):
+        golden = GoldenStandard(GOLDEN)
+        with_retrieval = service._cache_key(golden, DOCUMENT)
+
+        monkeypatch.setattr(config, "retrieval_enabled", False)
+        assert service._cache_key(golden, DOCUMENT) != with_retrieval
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.schema import HumanMessage
+
+from fake_llm import FakeChatModel, FakeLLMError
+from llm_service import LLMService
+from router import Backend, NoHealthyBackend, Router
+
+GOLDEN = "# Standard\n- Item 1\n- Item 2"
+MESSAGES = [HumanMessage(content="DOCUMENT TO EVALUATE:\n# Document")]
+
+
+def backend(name: str, error_rate: float = 0.0, error_status: int = 503, weight: float = 1.0) -> Backend:
+    llm = FakeChatModel(latency=0.001, distribution="constant", error_rate=error_rate, error_status=error_status, seed=1)
+    return Backend(name, "openai", f"model-{name}", llm, weight=weight)
+
+
+class TestRouter:
+    def test_weighted_choice_follows_weights(self):
+        router = Router([backend("a", weight=3), backend("b", weight=1)], seed=7)
+        picks = [router.choose().name for _ in range(2000)]
+        assert 0.7 < picks.count("a") / len(picks) < 0.8
+
+    def test_least_latency_prefers_fast_and_unmeasured_backends(self):
+        fast, slow, new = backend("fast"), backend("slow"), backend("new")
+        router = Router([fast, slow, new], strategy="least_latency")
+        router.record_success(fast, 0.2)
+        router.record_success(slow, 2.0)
+
+        assert router.choose().name == "new"
+        assert router.choose(exclude=["new"]).name == "fast"
+        # A busy backend's expected wait grows with its queue
+        fast.in_flight = 20
+        assert router.choose(exclude=["new"]).name == "slow"
+
+    @pytest.mark.asyncio
+    async def test_fails_over_and_benches_the_failing_backend(self):
+        down, up = backend("down", error_rate=1.0), backend("up")
+        router = Router([down, up], strategy="least_latency", base_delay=30)
+
+        async def ask(b):
+            return await b.llm.ainvoke(MESSAGES)
+
+        served = [(await router.call(ask))[0].name for _ in range(3)]
+
+        assert served == ["up", "up", "up"]
+        assert down.llm.calls == 1
+        assert not down.healthy
+        assert down.stats == {"calls": 1, "failures": 1}
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retries(self):
+        router = Router([backend("a", error_rate=1.0), backend("b", error_rate=1.0)], max_retries=1, base_delay=0.01)
+
+        with pytest.raises(NoHealthyBackend):
+            await router.call(lambda b: b.llm.ainvoke(MESSAGES))
+
+    @pytest.mark.asyncio
+    async def test_request_errors_are_not_failed_over(self):
+        bad = backend("a", error_rate=1.0, error_status=400)
+        router = Router([bad, backend("b")], strategy="least_latency")
+
+        with pytest.raises(FakeLLMError):
+            await router.call(lambda b: b.llm.ainvoke(MESSAGES))
+        assert bad.healthy
+
+
+class TestRoutedService:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", FakeChatModel(latency=0.001))
+        monkeypatch.setitem(service.__dict__, "router", Router(
+            [backend("down", error_rate=1.0), backend("up")], strategy="least_latency", base_delay=30
+        ))
+        return service
+
+    @pytest.mark.asyncio
+    async def test_evaluation_fails_over_to_healthy_backend(self, service):
+        result = await service.evaluate_document(GOLDEN, "# Document")
+
+        assert result["success"] is True
+        assert (result["backend"], result["model"]) == ("up", "model-up")
+
+    @pytest.mark.asyncio
+    async def test_streaming_fails_over_before_output(self, service):
+        updates = [u async for u in service.stream_evaluate_document(GOLDEN, "# Document")]
+
+        assert updates[-1]["success"] is True
+        assert updates[-1]["backend"] == "up"
+
+    @pytest.mark.asyncio
+    async def test_batch_spreads_over_backends(self, service, monkeypatch):
+        monkeypatch.setitem(service.__dict__, "router", Router([backend("a"), backend("b")], seed=3))
+
+        results = [r async for _, r in service.evaluate_batch(
+            GOLDEN, [(f"{i}.md", f"# Document {i}") for i in range(20)]
+        )]
+
+        assert {r["backend"] for r in results} == {"a", "b"}
+
+
+class TestBackendConfig:
+    def test_backends_resolve_keys_and_defaults(self, monkeypatch):
+        from config import config
+        monkeypatch.setenv("OPENAI_API_KEY_2", "sk-second")
+
+        backends = config._load_backends(
+            '[{"provider": "openai", "model": "gpt-4", "weight": 2},'
+            ' {"provider": "openai", "model": "gpt-4", "api_key_env": "OPENAI_API_KEY_2", "rpm": 100}]'
+        )
+
+        assert [b["api_key"] for b in backends] == [os.environ["OPENAI_API_KEY"], "sk-second"]
+        assert backends[0]["weight"] == 2.0
+        assert backends[1]["limits"] == {"rpm": 100.0}
+        assert backends[0]["name"] != backends[1]["name"]
+
+    def test_missing_key_is_rejected(self):
+        from config import config
+        with pytest.raises(ValueError, match="NO_SUCH_KEY"):
+            config._load_backends('[{"provider": "groq", "model": "x", "api_key_env": "NO_SUCH_KEY"}]')
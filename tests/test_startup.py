@@ -0,0 +1,70 @@
+import json
+import subprocess
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from llm_service import LLMService
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROVIDER_MODULES = ("openai", "groq", "httpx", "langchain_openai", "langchain_groq", "langchain_core", "numpy")
+
+
+def loaded_after_import(modules: str, **env) -> list:
+    """Import ``modules`` in a fresh interpreter and return which provider modules that loaded."""
+    environment = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "GROQ_API_KEY")}
+    environment.update(env)
+    output = subprocess.run(
+        [
+            sys.executable, "-c",
+            f"import sys, json; import {modules}; "
+            f"print(json.dumps([m for m in {PROVIDER_MODULES!r} if m in sys.modules]))"
+        ],
+        cwd=ROOT, env=environment, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestColdStart:
+    def test_import_loads_no_provider_sdks_and_needs_no_keys(self):
+        assert loaded_after_import("config, llm_service, cli, jobs") == []
+
+    def test_first_client_loads_only_its_provider(self):
+        loaded = loaded_after_import("llm_service; llm_service.llm_service.llm", OPENAI_API_KEY="sk-test")
+        assert "langchain_openai" in loaded
+        assert "langchain_groq" not in loaded and "groq" not in loaded
+
+
+class TestDeferredClients:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setattr(service, "current_config", dict(service.current_config))
+        return service
+
+    def test_update_config_defers_client_creation(self, service, monkeypatch):
+        created = []
+        monkeypatch.setattr(service, "_initialize_llm", lambda: created.append(1) or "llm")
+
+        service.update_config("openai", "gpt-3.5-turbo", 0.1, 100, "sk-test")
+        assert created == []
+        assert service.llm == "llm"
+        assert service.llm == "llm"
+        assert created == [1]
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key_is_an_error_result(self, service):
+        service.update_config("openai", "gpt-4", 0.1, 100, None)
+
+        result = await service.evaluate_document("# Golden\n- a", "# Document\n- a")
+
+        assert result["success"] is False
+        assert "API key not configured" in result["error"]
@@ -0,0 +1,146 @@
+import pytest
+import os
+import sys
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tokens
+from config import config
+from fake_llm import FakeChatModel
+from llm_service import LLMService
+from tokens import compress_text, context_window, estimate_tokens
+
+GOLDEN = """# Spec
+
+## Security
+- All traffic must use TLS
+
+## Logging
+- Logs are retained for 30 days
+"""
+
+
+class TestTokenCounting:
+    def test_heuristic(self, monkeypatch):
+        monkeypatch.setattr(config, "tokenizer", "heuristic")
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abc") == 1
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_uses_the_models_encoder_when_available(self, monkeypatch):
+        monkeypatch.setattr(config, "tokenizer", "auto")
+        monkeypatch.setattr(tokens, "_encoder", lambda model: (lambda text: len(text.split())))
+        tokens._count.cache_clear()
+        try:
+            assert estimate_tokens("one two three", model="gpt-4") == 3
+        finally:
+            tokens._count.cache_clear()
+
+    def test_context_windows(self, monkeypatch):
+        assert context_window("llama3-8b-8192") == 8192
+        assert context_window("some-new-model") is None
+        monkeypatch.setattr(config, "model_context_windows", {"some-new-model": 128000, "gpt-4": 32768})
+        assert context_window("some-new-model") == 128000
+        assert context_window("gpt-4") == 32768
+
+    def test_compress_text(self):
+        text = (
+            "# Title\n<!-- internal note -->\nSee [the docs](https://example.com/docs)  and   ![logo](logo.png).\n"
+            "---\n| a | b |\n|---|---|\n| 1 | 2 |\n"
+            "Company Confidential\n- item\nCompany Confidential\n- item\nCompany Confidential\n- item\n"
+        )
+
+        assert compress_text(text) == (
+            "# Title\n\nSee the docs and logo.\n| a | b |\n| 1 | 2 |\n"
+            "Company Confidential\n- item\n- item\n- item"
+        )
+
+
+class TestBudgeting:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        monkeypatch.setattr(service, "cache", None)
+        monkeypatch.setitem(service.__dict__, "llm", FakeChatModel(latency=0, seed=0))
+        monkeypatch.setitem(service.__dict__, "cascade_llm", None)
+        monkeypatch.setitem(service.__dict__, "router", None)
+        monkeypatch.setitem(service.current_config, "model", "gpt-4")
+        monkeypatch.setitem(service.current_config, "max_tokens", 100)
+        monkeypatch.setattr(config, "tokenizer", "heuristic")
+        monkeypatch.setattr(config, "model_context_windows", {"gpt-4": 600})
+        return service
+
+    def test_strategies(self, service):
+        padded = "## Security\n" + "TLS everywhere" + " " * 2000 + "\n<!-- " + "x" * 1000 + " -->"
+        long = "## Security\n" + "TLS is used for every connection. " * 100
+
+        assert service.plan_document(GOLDEN, "## Security\n- TLS").strategy == "as-is"
+        compressed = service.plan_document(GOLDEN, padded)
+        assert compressed.strategy == "compress"
+        assert compressed.document == "## Security\nTLS everywhere"
+        assert service.plan_document(GOLDEN, long).strategy == "chunk"
+        assert service.plan_document("- One requirement", long).strategy == "reject"
+
+    def test_unknown_model_is_not_limited(self, service, monkeypatch):
+        monkeypatch.setitem(service.current_config, "model", "some-new-model")
+        assert service.plan_document("- One requirement", "x " * 10000).strategy == "as-is"
+
+    @pytest.mark.asyncio
+    async def test_oversized_document_is_rejected_without_a_call(self, service):
+        result = await service.evaluate_document("- One requirement", "TLS is used. " * 1000)
+
+        assert service.llm.calls == 0
+        assert result["success"] is False
+        assert "context window" in result["error"]
+        assert result["budget"]["strategy"] == "reject"
+
+    @pytest.mark.asyncio
+    async def test_streamed_evaluation_follows_the_same_plan(self, service):
+        updates = [u async for u in service.stream_evaluate_document("- One requirement", "TLS is used. " * 1000)]
+
+        assert service.llm.calls == 0
+        assert len(updates) == 1
+        assert updates[0]["budget"]["strategy"] == "reject"
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_fails_before_the_call(self, service, monkeypatch):
+        # Even when the plan is bypassed, nothing over the window is sent
+        monkeypatch.setattr(service, "plan_document", lambda golden, document: tokens.TokenBudget("as-is", 0, 0, None, document))
+        result = await service.evaluate_document("- One requirement", "TLS is used. " * 1000)
+
+        assert service.llm.calls == 0
+        assert "context window" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_compressed_document_is_evaluated(self, service):
+        result = await service.evaluate_document(GOLDEN, "## Security\nTLS everywhere" + " " * 3000)
+
+        assert service.llm.calls == 1
+        assert result["budget"]["strategy"] == "compress"
+
+    @pytest.mark.asyncio
+    async def test_groups_are_closed_before_they_overflow_the_window(self, service, monkeypatch):
+        monkeypatch.setattr(service, "store", None)
+        monkeypatch.setattr(config, "prefilter_enabled", False)
+        monkeypatch.setattr(config, "multi_doc_max_chars", 4000)
+        documents = [(f"doc{i}.md", "## Security\n" + "TLS is used for every connection. " * 12) for i in range(6)]
+
+        results = [result async for _, result in service.evaluate_batch(GOLDEN, documents, documents_per_call=6)]
+        projection = service.project_batch(GOLDEN, iter(documents), documents_per_call=6)
+
+        assert all(result["success"] for result in results)
+        assert 1 < service.llm.calls == projection["calls"] < 6
+        assert projection["strategies"] == {"as-is": 6}
+        assert projection["output_tokens"] == 6 * tokens.EXPECTED_OUTPUT_TOKENS
+
+    def test_project_batch(self, service):
+        documents = [("a.md", "## Security\n- TLS"), ("b.md", "## Logging\n- 30 days"), ("c.md", "x " * 10000)]
+        projection = service.project_batch("- One requirement", documents)
+
+        assert projection["documents"] == 3
+        assert projection["strategies"] == {"as-is": 2, "reject": 1}
+        assert projection["output_tokens"] == 2 * tokens.EXPECTED_OUTPUT_TOKENS
+        assert projection["cost_usd"] == pytest.approx(
+            (projection["input_tokens"] * 30 + projection["output_tokens"] * 60) / 1_000_000
+        )
@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from config import config
+
+# Context windows (prompt plus output tokens) of the models the app offers;
+# override or extend with MODEL_CONTEXT_WINDOWS
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "mixtral-8x7b-32768": 32768,
+    "llama3-8b-8192": 8192,
+}
+
+# Typical length of a verdict, confidence and short explanation, for cost projections
+EXPECTED_OUTPUT_TOKENS = 150
+
+# Encoding used for models tiktoken doesn't know (Groq's open models, newer names)
+FALLBACK_ENCODING = "cl100k_base"
+
+HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+LINK_PATTERN = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+RULE_PATTERN = re.compile(r"^\s*(?:[-*_]\s*){3,}$|^\s*\|?(?:\s*:?-{3,}:?\s*\|)+\s*:?-*:?\s*\|?\s*$")
+SPACES_PATTERN = re.compile(r"(?<=\S)[ \t]{2,}")
+
+
+@lru_cache(maxsize=None)
+def _encoder(model: str) -> Optional[Callable[[str], int]]:
+    """
+    A token counter for ``model`` backed by tiktoken, or None if it can't be used.
+
+    tiktoken is optional and downloads its encodings on first use, so any
+    failure (not installed, offline) falls back to the heuristic; the
+    outcome is remembered so it's only tried once per model.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of ``text`` for ``model`` (the configured model by default).
+
+    Uses the model's tiktoken encoding when tiktoken is available and
+    ``config.tokenizer`` allows it, and ~4 characters per token otherwise.
+    """
+    if not text:
+        return 0
+    if config.tokenizer != "heuristic" and _encoder(model or config.llm_model) is not None:
+        return _count(text, model or config.llm_model)
+    return max(1, len(text) // 4)
+
+
+@lru_cache(maxsize=32)
+def _count(text: str, model: str) -> int:
+    # The same prompt prefix and document are counted when planning and again before each call
+    encoder = _encoder(model)
+    return encoder(text) if encoder is not None else max(1, len(text) // 4)
+
+
+def context_window(model: str) -> Optional[int]:
+    """The model's context window in tokens, or None if it isn't known."""
+    window = config.model_context_windows.get(model) or MODEL_CONTEXT_WINDOWS.get(model)
+    return int(window) if window else None
+
+
+def compress_text(text: str) -> str:
+    """
+    Drop formatting a judge doesn't need: comments, link targets, rules and repeated whitespace.
+
+    HTML comments, horizontal rules and table separator rows are removed,
+    images and links keep only their text, runs of spaces inside lines are
+    collapsed, and lines (other than list items and headings) repeated three
+    or more times, such as page headers and footers, are kept only once.
+    """
+    text = HTML_COMMENT_PATTERN.sub("", text)
+    text = IMAGE_PATTERN.sub(lambda m: m.group(1), text)
+    text = LINK_PATTERN.sub(lambda m: m.group(1), text)
+
+    lines = [SPACES_PATTERN.sub(" ", line.rstrip()) for line in text.splitlines()]
+    counts: Dict[str, int] = {}
+    for line in lines:
+        counts[line.strip()] = counts.get(line.strip(), 0) + 1
+
+    kept = []
+    seen = set()
+    for line in lines:
+        key = line.strip()
+        if RULE_PATTERN.match(line):
+            continue
+        if key and counts[key] >= 3 and not key.startswith(("#", "-", "*", "+")) and not key[0].isdigit():
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+class ContextWindowExceeded(ValueError):
+    """A request that can't fit the model's context window, raised instead of sending it."""
+
+    def __init__(self, tokens: int, window: int):
+        super().__init__(f"Request needs ~{tokens:,} tokens, over the model's {window:,}-token context window")
+        self.tokens = tokens
+        self.window = window
+
+
+@dataclass
+class TokenBudget:
+    """
+    How a document will be sent, decided from its token count before any call.
+
+    ``strategy`` is one of ``as-is``, ``compress`` (sent with boilerplate
+    removed), ``chunk`` (judged section by section) or ``reject`` (can't fit
+    the model's context window). ``input_tokens`` are those of the prompt
+    that will be sent; for chunked documents, of the whole document prompt.
+    """
+    strategy: str
+    input_tokens: int
+    output_tokens: int
+    context_window: Optional[int]
+    document: str
+
+    @property
+    def fits(self) -> bool:
+        return self.context_window is None or self.input_tokens + self.output_tokens <= self.context_window
+
+    def exceeded(self) -> ContextWindowExceeded:
+        """The error reported instead of sending a ``reject`` budget's request."""
+        # Only a known context window can be exceeded
+        return ContextWindowExceeded(self.input_tokens + self.output_tokens, self.context_window or 0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "input_tokens": self.input_tokens,
+            "context_window": self.context_window
+        }